@@ -5,6 +5,7 @@ from fastapi import APIRouter
 from app.api.api_v1.endpoints.users import router as users_router
 from app.api.api_v1.endpoints.games import router as games_router
 from app.api.api_v1.endpoints.bets import router as bets_router # <--- NOVO: Importa o router de apostas
+from app.api.api_v1.endpoints.exports import router as exports_router
 
 
 api_router = APIRouter()
@@ -14,4 +15,7 @@ api_router.include_router(users_router, prefix="/users", tags=["users"])
 api_router.include_router(games_router, prefix="/games", tags=["games"])
 
 # <--- NOVO: Inclua o router de apostas
-api_router.include_router(bets_router, prefix="/bets", tags=["bets"])
\ No newline at end of file
+api_router.include_router(bets_router, prefix="/bets", tags=["bets"])
+
+# Exportações (planilhas geradas em streaming, apenas para administradores)
+api_router.include_router(exports_router, prefix="/exports", tags=["exports"])
@@ -3,12 +3,17 @@
 from typing import List, Annotated
 from datetime import datetime, timezone # Mantenha datetime e timezone
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Row, select
+from sqlalchemy.exc import IntegrityError
 
-from app.core.security import get_current_active_user
-from app.core.database import get_session
+from app.core.security import get_current_active_user, get_current_active_principal
+from app.core.database import get_session, get_async_session
+from app.core.config import settings
+from app.core.pagination import PageLimit, PageCursor, set_next_page_headers
+from app.core.serialization import encode_rows, json_response
 
 from app.schemas.bet import BetsSubmissionRequest, BetRead
 from app.models.bet import Bet
@@ -16,32 +21,34 @@ from app.models.game import Game
 from app.models.user import User
 from app.models.game import GameStatus
 
-from app.crud.bet import create_bet, get_user_bets_by_round, get_user_bet_for_game # get_user_bet_for_game
+from app.crud.bet import create_bets_bulk, upsert_bets, get_user_bet_game_ids, get_user_bets_page_async, get_user_bets_by_round_async
 
 router = APIRouter()
 
-@router.post("/", response_model=List[BetRead], status_code=status.HTTP_201_CREATED)
-async def create_user_bets(
-    bets_request: BetsSubmissionRequest,
-    current_user: Annotated[User, Depends(get_current_active_user)],
-    session: Session = Depends(get_session)
-):
+def _reject_duplicate_games(game_ids: List[int]) -> None:
     """
-    Registra múltiplas apostas para o usuário logado em uma transação única.
+    Recusa envios com o mesmo jogo mais de uma vez: cada jogo recebe uma única aposta por envio.
     """
-    if not bets_request.bets:
+    seen, repeated = set(), []
+    for game_id in game_ids:
+        if game_id in seen and game_id not in repeated:
+            repeated.append(game_id)
+        seen.add(game_id)
+    if repeated:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Nenhuma aposta fornecida."
+            detail=f"Jogo(s) repetido(s) no envio: {', '.join(map(str, repeated))}. Envie uma única aposta por jogo."
         )
 
-    created_bets = []
-    game_ids = [bet.game_id for bet in bets_request.bets]
-
-    # 1. Verificar se todos os jogos existem e se nenhum deles já começou/terminou
+def _get_open_games(game_ids: List[int], session: Session) -> List[Row]:
+    """
+    Carrega os jogos apostados (só as colunas usadas na validação) e verifica se todos
+    existem e se nenhum deles já começou/terminou. `game_ids` não deve ter repetições
+    (ver _reject_duplicate_games).
+    """
     games_in_db = session.execute(
-        select(Game).where(Game.id.in_(game_ids))
-    ).scalars().all()
+        select(Game.id, Game.home_team, Game.away_team, Game.game_datetime, Game.status).where(Game.id.in_(game_ids))
+    ).all()
 
     if len(games_in_db) != len(game_ids):
         raise HTTPException(
@@ -50,7 +57,6 @@ async def create_user_bets(
         )
 
     now_utc = datetime.now(timezone.utc)
-
     for game in games_in_db:
         # <<< MUDANÇA CRÍTICA AQUI >>>
         # Torna game.game_datetime "aware" (com fuso horário UTC) para comparação
@@ -62,44 +68,104 @@ async def create_user_bets(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Não é possível apostar no jogo '{game.home_team} x {game.away_team}' (ID: {game.id}) pois ele já começou ou terminou."
             )
+    return games_in_db
+
+@router.post("/", response_model=List[BetRead], status_code=status.HTTP_201_CREATED)
+def create_user_bets(
+    bets_request: BetsSubmissionRequest,
+    current_user: Annotated[User, Depends(get_current_active_user)],
+    session: Session = Depends(get_session)
+):
+    """
+    Registra múltiplas apostas para o usuário logado em uma transação única.
+    """
+    if not bets_request.bets:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Nenhuma aposta fornecida."
+        )
+
+    game_ids = [bet.game_id for bet in bets_request.bets]
+    _reject_duplicate_games(game_ids)
+
+    # 1. Verificar se todos os jogos existem e se nenhum deles já começou/terminou
+    games_in_db = _get_open_games(game_ids, session)
 
-        existing_bet = get_user_bet_for_game(current_user.id, game.id, session)
-        if existing_bet:
+    # 2. Apostas já existentes para esses jogos: uma única consulta
+    already_bet = get_user_bet_game_ids(current_user.id, game_ids, session)
+    for game in games_in_db:
+        if game.id in already_bet:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Você já fez uma aposta para o jogo '{game.home_team} x {game.away_team}' (ID: {game.id})."
             )
 
-    for bet_data in bets_request.bets:
-        new_bet_obj = create_bet(bet_data, current_user.id, session)
-        created_bets.append(new_bet_obj)
-
-    return created_bets
+    # 3. Um INSERT com todas as apostas e um único commit.
+    # A chave única (user_id, game_id) barra envios simultâneos que passaram pela verificação acima.
+    try:
+        bets = create_bets_bulk(bets_request.bets, current_user.id, session)
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Você já fez uma aposta para um ou mais desses jogos."
+        )
+    return bets
 
-@router.get("/", response_model=List[BetRead])
-async def get_user_bets(
+# --------------------------------------------------
+# ENDPOINT: Salvar Apostas da Rodada (cria ou atualiza até o início do jogo)
+# --------------------------------------------------
+@router.put("/", response_model=List[BetRead])
+def save_user_bets(
+    bets_request: BetsSubmissionRequest,
     current_user: Annotated[User, Depends(get_current_active_user)],
     session: Session = Depends(get_session)
 ):
     """
-    Retorna todas as apostas do usuário logado.
+    Salva as apostas do usuário logado: cria as que não existem e altera o placar das
+    já feitas, enquanto os jogos não começaram. Pode ser repetido com segurança.
     """
-    bets = session.execute(
-        select(Bet).where(Bet.user_id == current_user.id)
-    ).scalars().all()
+    if not bets_request.bets:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Nenhuma aposta fornecida."
+        )
+
+    game_ids = [bet.game_id for bet in bets_request.bets]
+    _reject_duplicate_games(game_ids)
+    _get_open_games(game_ids, session)
+    bets = upsert_bets(bets_request.bets, current_user.id, session)
     return bets
 
+@router.get("/", response_model=List[BetRead])
+async def get_user_bets(
+    current_user: Annotated[User, Depends(get_current_active_principal)],
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_async_session), # Principal: o usuário vê as apostas que acabou de enviar
+    limit: PageLimit = settings.DEFAULT_PAGE_SIZE,
+    cursor: PageCursor = None
+):
+    """
+    Retorna as apostas do usuário logado, paginadas por cursor
+    (próxima página nos cabeçalhos X-Next-Cursor / Link).
+    """
+    bets, next_cursor = await get_user_bets_page_async(current_user.id, limit, cursor, session)
+    set_next_page_headers(request, response, next_cursor)
+    return json_response(encode_rows(BetRead, bets), response) # Caminho rápido: sem validar linha a linha
+
 # --------------------------------------------------
 # NOVO ENDPOINT: Obter Apostas de um Usuário por Rodada
 # --------------------------------------------------
 @router.get("/my-bets-by-round/{round_number}", response_model=List[BetRead])
 async def read_user_bets_by_round(
     round_number: int,
-    current_user: Annotated[User, Depends(get_current_active_user)],
-    session: Session = Depends(get_session)
+    current_user: Annotated[User, Depends(get_current_active_principal)],
+    response: Response,
+    session: AsyncSession = Depends(get_async_session) # Principal, como GET /bets/
 ):
     """
     Retorna as apostas do usuário logado para uma rodada específica.
     """
-    bets = get_user_bets_by_round(current_user.id, round_number, session)
-    return bets
\ No newline at end of file
+    bets = await get_user_bets_by_round_async(current_user.id, round_number, session)
+    return json_response(encode_rows(BetRead, bets), response)
\ No newline at end of file
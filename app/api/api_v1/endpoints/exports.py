@@ -0,0 +1,58 @@
+# app/api/v1/endpoints/exports.py
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, Path
+from fastapi.responses import StreamingResponse
+
+from app.core.security import get_current_active_admin
+from app.core.tabular import TabularFormat, export_response
+from app.crud.export import stream_rows, column_types, round_bets_export, standings_export, season_history_export
+
+router = APIRouter()
+
+# --------------------------------------------------
+# ENDPOINTS: Exportações em Excel, CSV ou Parquet (Admin)
+# Os arquivos são gerados em streaming a partir de um cursor no servidor:
+# a memória usada não depende do número de linhas exportadas.
+# O formato é a extensão do caminho, ex: /admin/standings.csv
+# --------------------------------------------------
+@router.get("/admin/rounds/{round_number}/bets.{export_format}", response_class=StreamingResponse)
+def export_round_bets(
+    round_number: Annotated[int, Path(ge=1, le=38)],
+    export_format: TabularFormat,
+    current_admin: Annotated[Any, Depends(get_current_active_admin)]
+):
+    """
+    Exporta todas as apostas de uma rodada, com placares e pontos (apenas para administradores).
+    """
+    headers, statement = round_bets_export(round_number)
+    return export_response(
+        export_format, f"apostas_rodada_{round_number}", f"Apostas Rodada {round_number}",
+        headers, column_types(statement), stream_rows(statement)
+    )
+
+@router.get("/admin/standings.{export_format}", response_class=StreamingResponse)
+def export_standings(
+    export_format: TabularFormat,
+    current_admin: Annotated[Any, Depends(get_current_active_admin)]
+):
+    """
+    Exporta a classificação geral de todos os usuários (apenas para administradores).
+    """
+    headers, statement = standings_export()
+    return export_response(
+        export_format, "classificacao", "Classificação", headers, column_types(statement), stream_rows(statement)
+    )
+
+@router.get("/admin/season.{export_format}", response_class=StreamingResponse)
+def export_season_history(
+    export_format: TabularFormat,
+    current_admin: Annotated[Any, Depends(get_current_active_admin)]
+):
+    """
+    Exporta o histórico da temporada: todas as apostas de todos os jogos (apenas para administradores).
+    """
+    headers, statement = season_history_export()
+    return export_response(
+        export_format, "temporada", "Temporada", headers, column_types(statement), stream_rows(statement)
+    )
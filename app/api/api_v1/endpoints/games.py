@@ -1,27 +1,38 @@
 # app/api/v1/endpoints/games.py
-from typing import Annotated, List, Any
+from typing import Annotated, List, Any, Tuple
 from datetime import datetime, timezone # Adicione timezone
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Response
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Request, Response
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session # <<< MUDANÇA: Use Session do SQLAlchemy ORM
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select # <<< MUDANÇA: Use select do SQLAlchemy principal
-import openpyxl
-from io import BytesIO
 
-from app.core.database import get_session
+from app.core.database import get_session, get_async_session, get_async_read_session, read_your_writes
 # MUDANÇA: Importe get_current_active_admin e get_current_user do core.security
-from app.core.security import get_current_active_admin, get_current_user
+from app.core.security import get_current_active_admin, get_current_user, get_current_principal
 from app.models.game import Game, GameStatus
 # MUDANÇA: Importe as funções CRUD do seu arquivo app/crud/game.py (que agora está atualizado para SQLAlchemy Puro)
 from app.crud.game import (
-    create_game,
+    create_games_bulk,
     get_games_by_round,
+    get_games_by_round_async,
     update_game_result,
-    get_all_games,
-    get_all_games_for_user,
+    update_game_results_bulk,
+    get_games_page_async,
     delete_game_by_id,
     delete_games_by_round
 )
+from app.crud.scoring import rescore_season
+from app.core.config import settings
+from app.core.pagination import PageLimit, PageCursor, set_next_page_headers
+from app.core.http_cache import check_not_modified, cached_json_response
+from app.core.serialization import encode_rows
+from app.core.metrics import timed
+from app.crud.data_version import GAMES_SCOPE, round_scope
+from app.crud.export import results_template_export, column_types, stream_rows
+from app.core.tabular import (
+    TabularFormat, format_from_filename, iter_upload_rows, parse_datetime, validate_rows, format_row_errors, export_response
+)
 from app.schemas.game import GameCreate, GameRead, GameUpdateResult
 
 router = APIRouter()
@@ -30,82 +41,45 @@ router = APIRouter()
 # ENDPOINT: Upload de Planilha Excel para Jogos (Rodada agora é parâmetro de query)
 # --------------------------------------------------
 @router.post("/admin/games/upload-excel", response_model=List[GameRead])
-async def upload_games_excel(
+@router.post("/admin/games/upload", response_model=List[GameRead])
+def upload_games_excel(
     current_admin: Annotated[Any, Depends(get_current_active_admin)],
     round_number: Annotated[int, Query(..., ge=1, le=38, description="Número da rodada para os jogos da planilha.")],
     file: UploadFile = File(...),
     db: Session = Depends(get_session)
 ):
     """
-    Faz upload de uma planilha Excel (.xlsx) com jogos para uma rodada específica e os insere no banco de dados.
+    Faz upload de uma planilha Excel (.xlsx), CSV ou Parquet com jogos para uma rodada específica e os insere no banco de dados.
     A planilha deve ter as colunas: 'mandante', 'visitante', 'data_hora'.
     """
-    if not file.filename.endswith('.xlsx'):
+    upload_format = format_from_filename(file.filename)
+    if upload_format is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Formato de arquivo inválido. Por favor, envie um arquivo .xlsx"
+            detail="Formato de arquivo inválido. Por favor, envie um arquivo .xlsx, .csv ou .parquet"
+        )
+
+    def parse_row(row: tuple) -> GameCreate:
+        return GameCreate(
+            round_number=round_number,
+            home_team=str(row[0]),
+            away_team=str(row[1]),
+            game_datetime=parse_datetime(row[2])
         )
 
+    # Leitura em streaming; as linhas válidas são acumuladas e os erros de todas as linhas reportados juntos
+    errors: List[str] = []
     try:
-        workbook = openpyxl.load_workbook(file.file)
-        sheet = workbook.active
-    except Exception as e:
+        games_to_create = list(validate_rows(iter_upload_rows(file.file, upload_format), parse_row, errors))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if errors:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Erro ao ler a planilha Excel: {e}. Verifique o formato."
+            detail=format_row_errors(errors) + ". Verifique 'data_hora' (formato AAAA-MM-DD HH:MM:SS ou ISO)."
         )
 
-    games_to_create = []
-    for row_index, row in enumerate(sheet.iter_rows(min_row=2, values_only=True)):
-        if not row or all(cell is None for cell in row):
-            continue
-
-        try:
-            home_team = str(row[0])
-            away_team = str(row[1])
-            
-            game_datetime_excel = row[2]
-
-            game_datetime: datetime
-
-            if isinstance(game_datetime_excel, datetime):
-                game_datetime = game_datetime_excel.replace(tzinfo=None)
-            elif isinstance(game_datetime_excel, (int, float)):
-                from openpyxl.utils.datetime import from_excel
-                game_datetime = from_excel(game_datetime_excel).replace(tzinfo=None)
-            else:
-                dt_str = str(game_datetime_excel).strip()
-                try:
-                    game_datetime = datetime.fromisoformat(dt_str)
-                except ValueError:
-                    try:
-                        game_datetime = datetime.strptime(dt_str, '%Y-%m-%d %H:%M:%S')
-                    except ValueError:
-                        raise ValueError(f"Formato de data/hora desconhecido: '{dt_str}'")
-
-            game_create_data = GameCreate(
-                round_number=round_number,
-                home_team=home_team,
-                away_team=away_team,
-                game_datetime=game_datetime
-            )
-            games_to_create.append(game_create_data)
-        except ValueError as ve:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Erro de formato de dado na linha {row_index + 2}: {ve}. Verifique 'data_hora' (formato AAAA-MM-DD HH:MM:SS ou ISO)."
-            )
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Erro inesperado na linha {row_index + 2}: {e}."
-            )
-
-    created_games = []
-    for game_data in games_to_create:
-        created_games.append(create_game(game_data, db)) # Usar a função CRUD
-    
-    return created_games
+    return create_games_bulk(games_to_create, db) # Um INSERT e um commit para a planilha inteira
 
 # --------------------------------------------------
 # ENDPOINT: Listar Jogos por Rodada
@@ -113,28 +87,39 @@ async def upload_games_excel(
 @router.get("/games/{round_number}", response_model=List[GameRead])
 async def read_games_by_round(
     round_number: int,
-    current_user: Annotated[Any, Depends(get_current_user)], # get_current_user vem do core.security
-    db: Session = Depends(get_session)
+    current_user: Annotated[Any, Depends(get_current_principal)], # Rota de leitura: pode usar as claims do token
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_session)
 ):
     """
     Retorna todos os jogos de uma rodada específica.
+    Responde 304 se o cliente já tiver a versão atual da rodada (If-None-Match / If-Modified-Since);
+    a resposta serializada é reaproveitada do cache de respostas até a rodada mudar.
     """
-    games = get_games_by_round(round_number, db) # Usar a função CRUD
-    if not games:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Nenhum jogo encontrado para a rodada {round_number}."
-        )
-    return games
+    scope = round_scope(round_number)
+    etag = await check_not_modified(request, response, scope, db)
+
+    async def load():
+        games = await get_games_by_round_async(round_number, db) # Colunas de GameRead, sem objetos do ORM
+        if not games:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Nenhum jogo encontrado para a rodada {round_number}."
+            )
+        return encode_rows(GameRead, games)
+
+    return await cached_json_response(request, response, scope, etag, load)
 
 # --------------------------------------------------
 # ENDPOINT: Atualizar Resultado de Jogo (Admin)
 # --------------------------------------------------
 @router.put("/admin/games/{game_id}/result", response_model=GameRead)
-async def update_game_scores(
+def update_game_scores(
     game_id: int,
     game_update: GameUpdateResult,
     current_admin: Annotated[Any, Depends(get_current_active_admin)], # get_current_active_admin vem do core.security
+    response: Response,
     db: Session = Depends(get_session)
 ):
     """
@@ -143,21 +128,49 @@ async def update_game_scores(
     updated_game = update_game_result(game_id, game_update, db) # Usar a função CRUD
     if not updated_game:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Jogo não encontrado.")
+    read_your_writes(response) # O admin confere o placar e o ranking no principal
     return updated_game
 
+# --------------------------------------------------
+# ENDPOINT: Recalcular Pontuação da Temporada (Admin)
+# --------------------------------------------------
+@router.post("/admin/games/rescore-season")
+def rescore_all_games(
+    current_admin: Annotated[Any, Depends(get_current_active_admin)],
+    response: Response,
+    db: Session = Depends(get_session)
+):
+    """
+    Recalcula os pontos de todas as apostas de jogos finalizados com as regras
+    de pontuação atuais e reconstrói a pontuação dos usuários (apenas para administradores).
+    """
+    summary = rescore_season(db)
+    read_your_writes(response)
+    return summary
+
 # --------------------------------------------------
 # ENDPOINT: Listar Todos os Jogos (Admin)
 # --------------------------------------------------
 @router.get("/admin/games", response_model=List[GameRead])
 async def read_all_games_admin(
     current_admin: Annotated[Any, Depends(get_current_active_admin)], # get_current_active_admin vem do core.security
-    db: Session = Depends(get_session)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_session),
+    limit: PageLimit = settings.DEFAULT_PAGE_SIZE,
+    cursor: PageCursor = None
 ):
     """
-    Retorna a lista de todos os jogos cadastrados (apenas para administradores).
+    Retorna a lista de todos os jogos cadastrados (apenas para administradores), paginada por cursor.
     """
-    games = get_all_games(db) # Usar a função CRUD
-    return games
+    etag = await check_not_modified(request, response, GAMES_SCOPE, db)
+
+    async def load():
+        games, next_cursor = await get_games_page_async(db, limit, cursor) # Usar a função CRUD
+        set_next_page_headers(request, response, next_cursor)
+        return encode_rows(GameRead, games)
+
+    return await cached_json_response(request, response, GAMES_SCOPE, etag, load)
 
 # --------------------------------------------------
 # NOVOS ENDPOINTS: EXCLUSÃO DE JOGOS (ADMIN)
@@ -165,7 +178,7 @@ async def read_all_games_admin(
 # --------------------------------------------------
 
 @router.delete("/admin/games/{game_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_single_game(
+def delete_single_game(
     game_id: int,
     current_admin: Annotated[Any, Depends(get_current_active_admin)], # get_current_active_admin vem do core.security
     db: Session = Depends(get_session)
@@ -179,7 +192,7 @@ async def delete_single_game(
     return Response(status_code=status.HTTP_204_NO_CONTENT) # Retorna Response vazio para 204
 
 @router.delete("/admin/rounds/{round_number}", status_code=status.HTTP_200_OK)
-async def delete_round_games(
+def delete_round_games(
     round_number: int,
     current_admin: Annotated[Any, Depends(get_current_active_admin)], # get_current_active_admin vem do core.security
     db: Session = Depends(get_session)
@@ -200,130 +213,88 @@ async def delete_round_games(
 # NOVO ENDPOINT: Gerar Planilha de Resultados para Download (Admin)
 # --------------------------------------------------
 @router.get("/admin/games/download-results-template/{round_number}", response_class=StreamingResponse)
-async def download_results_template(
+def download_results_template(
     round_number: int,
     current_admin: Annotated[Any, Depends(get_current_active_admin)], # get_current_active_admin vem do core.security
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_session),
+    export_format: TabularFormat = Query(TabularFormat.XLSX, alias="format", description="xlsx, csv ou parquet.")
 ):
     """
-    Gera e retorna uma planilha Excel com os jogos de uma rodada específica,
+    Gera e retorna uma planilha (Excel, CSV ou Parquet) com os jogos de uma rodada específica,
     incluindo colunas para preencher os placares (para administradores).
     """
-    games = get_games_by_round(round_number, db) # Usar a função CRUD
-    if not games:
+    has_games = db.execute(select(Game.id).where(Game.round_number == round_number).limit(1)).first()
+    if not has_games:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Nenhum jogo encontrado para a rodada {round_number} para gerar a planilha."
         )
 
-    workbook = openpyxl.Workbook()
-    sheet = workbook.active
-    sheet.title = f"Resultados Rodada {round_number}"
-
-    headers = ["id_jogo", "rodada", "mandante", "visitante", "data_hora", "placar_mandante", "placar_visitante"]
-    sheet.append(headers)
-
-    for game in games:
-        game_datetime_str = game.game_datetime.isoformat() + 'Z' if game.game_datetime.tzinfo else game.game_datetime.isoformat()
-        
-        row_data = [
-            game.id,
-            game.round_number,
-            game.home_team,
-            game.away_team,
-            game_datetime_str,
-            None, # Coluna vazia para placar_mandante
-            None  # Coluna vazia para placar_visitante
-        ]
-        sheet.append(row_data)
-
-    excel_file = BytesIO()
-    workbook.save(excel_file)
-    excel_file.seek(0)
-
-    filename = f"resultados_rodada_{round_number}.xlsx"
-    return StreamingResponse(
-        excel_file,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    # A planilha é gerada em streaming, direto do cursor, sem montar o Workbook em memória
+    headers, statement = results_template_export(round_number)
+    return export_response(
+        export_format, f"resultados_rodada_{round_number}", f"Resultados Rodada {round_number}",
+        headers, column_types(statement), stream_rows(statement)
     )
 
 # --------------------------------------------------
 # NOVO ENDPOINT: Upload de Planilha de Resultados (Admin)
 # --------------------------------------------------
 @router.post("/admin/games/upload-results-excel", response_model=List[GameRead])
-async def upload_results_excel(
+@router.post("/admin/games/upload-results", response_model=List[GameRead])
+def upload_results_excel(
     current_admin: Annotated[Any, Depends(get_current_active_admin)],
+    response: Response,
     file: UploadFile = File(...),
     db: Session = Depends(get_session)
 ):
     """
-    Faz upload de uma planilha Excel (.xlsx) com resultados de jogos existentes (por ID)
-    e atualiza os placares no banco de dados.
+    Faz upload de uma planilha Excel (.xlsx), CSV ou Parquet com resultados de jogos
+    existentes (por ID) e atualiza os placares no banco de dados.
     A planilha deve ter as colunas: 'id_jogo', 'rodada', 'mandante', 'visitante',
     'data_hora', 'placar_mandante', 'placar_visitante'.
     """
-    if not file.filename.endswith('.xlsx'):
+    upload_format = format_from_filename(file.filename)
+    if upload_format is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Formato de arquivo inválido. Por favor, envie um arquivo .xlsx"
+            detail="Formato de arquivo inválido. Por favor, envie um arquivo .xlsx, .csv ou .parquet"
         )
 
+    def parse_row(row: tuple) -> Tuple[int, int, int]:
+        game_id = int(row[0]) # id_jogo é a primeira coluna
+        home_score = int(row[5]) if row[5] is not None else None # placar_mandante (coluna 5)
+        away_score = int(row[6]) if row[6] is not None else None # placar_visitante (coluna 6)
+        if home_score is None or away_score is None:
+            raise ValueError("Placares do mandante e visitante são obrigatórios e devem ser números inteiros.")
+        if home_score < 0 or away_score < 0:
+            raise ValueError("Placares não podem ser negativos.")
+        return game_id, home_score, away_score
+
+    errors: List[str] = []
     try:
-        workbook = openpyxl.load_workbook(file.file)
-        sheet = workbook.active
-    except Exception as e:
+        with timed("results_parse"):
+            results = {game_id: (home, away) for game_id, home, away in validate_rows(iter_upload_rows(file.file, upload_format), parse_row, errors)}
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if errors:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Erro ao ler a planilha Excel: {e}. Verifique o formato."
+            detail=format_row_errors(errors) + ". Verifique 'id_jogo', 'placar_mandante' e 'placar_visitante' (devem ser números inteiros)."
         )
 
-    updated_games = []
-    games_to_update_data = []
-
-    for row_index, row in enumerate(sheet.iter_rows(min_row=2, values_only=True)):
-        if not row or all(cell is None for cell in row):
-            continue
-
-        try:
-            game_id = int(row[0]) # id_jogo é a primeira coluna
-            home_score = int(row[5]) if row[5] is not None else None # placar_mandante (coluna 5)
-            away_score = int(row[6]) if row[6] is not None else None # placar_visitante (coluna 6)
-            
-            if home_score is None or away_score is None:
-                raise ValueError("Placares do mandante e visitante são obrigatórios e devem ser números inteiros.")
-
-            games_to_update_data.append({
-                "id": game_id,
-                "home_score": home_score,
-                "away_score": away_score,
-                "status": GameStatus.FINISHED
-            })
-        except ValueError as ve:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Erro de formato de dado na linha {row_index + 2}: {ve}. Verifique 'id_jogo', 'placar_mandante' e 'placar_visitante' (devem ser números inteiros)."
-            )
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Erro inesperado na linha {row_index + 2}: {e}. Verifique a estrutura da planilha."
-            )
-    
-    for game_data in games_to_update_data:
-        game_update_result = GameUpdateResult(
-            home_score=game_data["home_score"],
-            away_score=game_data["away_score"],
-            status=game_data["status"]
+    # Todos os placares em um UPDATE, pontuação set-based e um único commit (tudo ou nada).
+    # Duração de cada etapa (results_*) no Server-Timing e em /metrics
+    updated_games = update_game_results_bulk(results, db)
+    if updated_games is None:
+        found = set(db.execute(select(Game.id).where(Game.id.in_(list(results)))).scalars().all())
+        missing = sorted(set(results) - found)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Jogo(s) com ID {', '.join(map(str, missing))} não encontrado(s) para atualização. Nenhum resultado foi gravado."
         )
-        updated_game = update_game_result(game_data["id"], game_update_result, db) # Usar a função CRUD
-        if not updated_game:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Jogo com ID {game_data['id']} não encontrado para atualização."
-            )
-        updated_games.append(updated_game)
 
+    read_your_writes(response)
     return updated_games
 
 # --------------------------------------------------
@@ -331,16 +302,28 @@ async def upload_results_excel(
 # --------------------------------------------------
 @router.get("/all", response_model=List[GameRead]) # << MUDANÇA: Novo endpoint /all (para usuários)
 async def read_all_games_for_user(
-    current_user: Annotated[Any, Depends(get_current_user)], # <<< Não exige admin, apenas usuário logado
-    db: Session = Depends(get_session)
+    current_user: Annotated[Any, Depends(get_current_principal)], # <<< Não exige admin, apenas usuário logado
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_session),
+    limit: PageLimit = settings.DEFAULT_PAGE_SIZE,
+    cursor: PageCursor = None
 ):
     """
     Retorna a lista de todos os jogos cadastrados (para usuários comuns).
     Filtra jogos que estão agendados, finalizados ou adiados.
     Não retorna jogos cancelados.
+    Paginada por cursor: a próxima página vem nos cabeçalhos X-Next-Cursor / Link.
+    Responde 304 se o cliente já tiver a versão atual dos jogos.
     """
-    games = get_all_games_for_user(db) # <<< Usar a nova função CRUD
-    return games
+    etag = await check_not_modified(request, response, GAMES_SCOPE, db)
+
+    async def load():
+        games, next_cursor = await get_games_page_async(db, limit, cursor, include_canceled=False) # <<< Usar a nova função CRUD
+        set_next_page_headers(request, response, next_cursor)
+        return encode_rows(GameRead, games)
+
+    return await cached_json_response(request, response, GAMES_SCOPE, etag, load)
 
 # --------------------------------------------------
 # ENDPOINT: Listar Todos os Jogos (Admin) - Mantido
@@ -348,10 +331,20 @@ async def read_all_games_for_user(
 @router.get("/admin/games", response_model=List[GameRead])
 async def read_all_games_admin(
     current_admin: Annotated[Any, Depends(get_current_active_admin)],
-    db: Session = Depends(get_session)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_session),
+    limit: PageLimit = settings.DEFAULT_PAGE_SIZE,
+    cursor: PageCursor = None
 ):
     """
-    Retorna a lista de todos os jogos cadastrados (apenas para administradores).
+    Retorna a lista de todos os jogos cadastrados (apenas para administradores), paginada por cursor.
     """
-    games = get_all_games(db) # Esta função CRUD já existe e é para admin
-    return games
\ No newline at end of file
+    etag = await check_not_modified(request, response, GAMES_SCOPE, db)
+
+    async def load():
+        games, next_cursor = await get_games_page_async(db, limit, cursor) # Esta função CRUD já existe e é para admin
+        set_next_page_headers(request, response, next_cursor)
+        return encode_rows(GameRead, games)
+
+    return await cached_json_response(request, response, GAMES_SCOPE, etag, load)
\ No newline at end of file
@@ -1,29 +1,44 @@
 # app/api/v1/endpoints/users.py
-from typing import Annotated, List, Any
+from typing import Annotated, List, Any, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Response # Response importado
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Query, Path # Response importado
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from datetime import datetime, timezone # timezone importado
+from pydantic import TypeAdapter
+from datetime import date, datetime, timezone # timezone importado
 
-from app.core.security import create_access_token, verify_password, Token
-from app.core.database import get_session
-from app.core.security import get_current_user, get_current_active_admin # Funções de segurança
+from app.core.security import create_access_token, verify_password_async, password_hasher, Token
+from app.core.database import get_session, get_async_session, get_async_read_session, read_your_writes, pool_metrics
+from app.core.config import settings
+from app.core.pagination import PageLimit, PageCursor, set_next_page_headers
+from app.core.http_cache import check_not_modified, cached_json_response
+from app.core.serialization import encode_rows, json_response
+from app.crud.data_version import RANKING_SCOPE
+from app.core.security import get_current_user, get_current_user_from_db, get_current_active_admin # Funções de segurança
 # CRUD functions
 from app.crud.user import (
     create_user,
     get_user_by_username,
     get_user_by_id, # Embora não usado diretamente aqui, é bom ter se necessário
     update_user_profile,
-    update_user_password,
-    get_users_ranking
+    update_user_password_async,
+    set_user_active,
+    get_user_by_username_async,
+    get_users_ranking_async,
+    get_users_ranking_page_async,
+    get_users_page_async
 )
+from app.crud.leaderboard import get_ranking_top_async, get_ranking_page_async, get_user_rank_async
+from app.crud.standing import get_round_standings_async, get_period_standings_async
 # Models and Schemas
 from app.models.user import User, UserRole # Modelos SQLAlchemy
 from app.schemas.user import UserCreate, UserRead, UserUpdate, UserPasswordUpdate # Schemas Pydantic
+from app.schemas.leaderboard import RankingEntry, RankingPage, UserRankRead
 
 router = APIRouter()
+ranking_entries_adapter = TypeAdapter(List[RankingEntry]) # Serialização do ranking guardado no cache
 
 # --------------------------------------------------
 # Endpoint de Registro de Usuário
@@ -49,20 +64,20 @@ def register_user(user_create: UserCreate, db: Session = Depends(get_session)):
 @router.post("/token", response_model=Token)
 async def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    db: Session = Depends(get_session)
+    db: AsyncSession = Depends(get_async_session)
 ):
     """
     Realiza o login de um usuário e retorna um token de acesso JWT.
     Requer 'username' e 'password' no corpo da requisição (x-www-form-urlencoded).
     """
-    user = get_user_by_username(form_data.username, db)
+    user = await get_user_by_username_async(form_data.username, db)
     if not user or not user.is_active: # Adicionada verificação de is_active
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciais inválidas ou usuário inativo",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    if not verify_password(form_data.password, user.hashed_password):
+    if not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciais inválidas",
@@ -70,7 +85,8 @@ async def login_for_access_token(
         )
 
     access_token = create_access_token(
-        data={"sub": user.username, "role": user.role.value} # Usar .value para o Enum
+        # uid/active permitem resolver o usuário só pelo token nas rotas de leitura (TRUST_TOKEN_CLAIMS)
+        data={"sub": user.username, "role": user.role.value, "uid": user.id, "active": user.is_active} # Usar .value para o Enum
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -87,9 +103,10 @@ async def read_users_me(current_user: Annotated[User, Depends(get_current_user)]
     return current_user
 
 @router.put("/me", response_model=UserRead)
-async def update_users_me(
+def update_users_me(
     user_update: UserUpdate,
     current_user: Annotated[User, Depends(get_current_user)],
+    response: Response,
     db: Session = Depends(get_session)
 ):
     """
@@ -111,6 +128,7 @@ async def update_users_me(
             status_code=status.HTTP_404_NOT_FOUND, # Ou 500 se for um erro inesperado
             detail="Usuário não encontrado ou falha ao atualizar."
         )
+    read_your_writes(response) # O novo nome aparece já nas próximas leituras do ranking
     return updated_user
 
 # --------------------------------------------------
@@ -119,20 +137,20 @@ async def update_users_me(
 @router.put("/me/password", status_code=status.HTTP_204_NO_CONTENT)
 async def change_my_password(
     password_update: UserPasswordUpdate,
-    current_user: Annotated[User, Depends(get_current_user)],
-    db: Session = Depends(get_session)
+    current_user: Annotated[User, Depends(get_current_user_from_db)], # Hash atual, nunca do cache
+    db: AsyncSession = Depends(get_async_session)
 ):
     """
     Permite que o usuário logado altere sua senha.
     Requer a senha atual para verificação.
     """
-    if not verify_password(password_update.current_password, current_user.hashed_password):
+    if not await verify_password_async(password_update.current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Senha atual incorreta."
         )
 
-    update_user_password(current_user, password_update.new_password, db)
+    await update_user_password_async(current_user.id, password_update.new_password, db)
     return Response(status_code=status.HTTP_204_NO_CONTENT) # Response está definido
 
 
@@ -143,13 +161,113 @@ async def change_my_password(
 async def read_users_ranking(
     # Removida a dependência de current_user se o ranking for público
     # Se o ranking for protegido, adicione: current_user: Annotated[User, Depends(get_current_user)],
-    db: Session = Depends(get_session)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_session),
+    limit: PageLimit = settings.DEFAULT_PAGE_SIZE,
+    offset: int = Query(0, ge=0, description="Quantidade de posições a pular (prefira o cursor)."),
+    cursor: PageCursor = None
+):
+    """
+    Retorna a classificação dos usuários, ordenada por pontos, paginada por cursor
+    (próxima página nos cabeçalhos X-Next-Cursor / Link). Servida do cache de respostas
+    enquanto o ranking não mudar.
+    """
+    etag = await check_not_modified(request, response, RANKING_SCOPE, db)
+
+    async def load():
+        if offset and not cursor:
+            # Compatibilidade com clientes que ainda paginam por offset
+            return encode_rows(UserRead, await get_users_ranking_async(db, limit=limit, offset=offset))
+        ranking_users, next_cursor = await get_users_ranking_page_async(db, limit, cursor)
+        set_next_page_headers(request, response, next_cursor)
+        return encode_rows(UserRead, ranking_users)
+
+    return await cached_json_response(request, response, RANKING_SCOPE, etag, load)
+
+@router.get("/ranking/top", response_model=List[RankingEntry])
+async def read_ranking_top(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_session),
+    limit: int = Query(10, ge=1, le=100, description="Quantidade de primeiros colocados.")
+):
+    """
+    Retorna os primeiros colocados, com posição e rank denso (empates dividem o rank).
+    """
+    etag = await check_not_modified(request, response, RANKING_SCOPE, db)
+    async def load():
+        return ranking_entries_adapter.dump_json(await get_ranking_top_async(limit, db))
+
+    return await cached_json_response(request, response, RANKING_SCOPE, etag, load)
+
+@router.get("/ranking/pages/{page}", response_model=RankingPage)
+async def read_ranking_page(
+    page: Annotated[int, Path(ge=1)],
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_session),
+    size: int = Query(50, ge=1, le=200, description="Linhas por página.")
+):
+    """
+    Retorna uma página do ranking.
+    """
+    await check_not_modified(request, response, RANKING_SCOPE, db)
+    entries, total = await get_ranking_page_async(page, size, db) # Uma leitura do índice: página e total da mesma versão
+    return RankingPage(page=page, size=size, total=total, entries=entries)
+
+@router.get("/ranking/me", response_model=UserRankRead)
+async def read_my_rank(
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: AsyncSession = Depends(get_async_session), # Principal: leitura do próprio usuário
+    neighbours: int = Query(2, ge=0, le=20, description="Vizinhos acima e abaixo do usuário.")
+):
+    """
+    Retorna a posição do usuário logado no ranking e seus vizinhos.
+    """
+    result = await get_user_rank_async(current_user.id, neighbours, db)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuário não encontrado no ranking.")
+    me, neighbour_entries = result
+    return UserRankRead(me=me, neighbours=neighbour_entries)
+
+# --------------------------------------------------
+# ENDPOINTS: Ranking por Rodada e por Período
+# --------------------------------------------------
+@router.get("/ranking/rounds/{round_number}", response_model=RankingPage)
+async def read_round_ranking(
+    round_number: Annotated[int, Path(ge=1, le=38)],
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_session),
+    page: int = Query(1, ge=1),
+    size: int = Query(50, ge=1, le=200, description="Linhas por página.")
 ):
     """
-    Retorna a classificação de todos os usuários, ordenada por pontos.
+    Retorna a classificação de uma rodada (pontos obtidos apenas nos jogos dela).
     """
-    ranking_users = get_users_ranking(db)
-    return ranking_users
+    await check_not_modified(request, response, RANKING_SCOPE, db)
+    total, entries = await get_round_standings_async(round_number, page, size, db)
+    return RankingPage(page=page, size=size, total=total, entries=entries)
+
+@router.get("/ranking/period", response_model=RankingPage)
+async def read_period_ranking(
+    start: Annotated[date, Query(description="Data inicial (inclusive), AAAA-MM-DD.")],
+    end: Annotated[date, Query(description="Data final (inclusive), AAAA-MM-DD.")],
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_session),
+    page: int = Query(1, ge=1),
+    size: int = Query(50, ge=1, le=200, description="Linhas por página.")
+):
+    """
+    Retorna a classificação por período (ex: melhor do mês), pelos dias dos jogos (UTC).
+    """
+    if end < start:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="A data final deve ser posterior à inicial.")
+    await check_not_modified(request, response, RANKING_SCOPE, db)
+    total, entries = await get_period_standings_async(start, end, page, size, db)
+    return RankingPage(page=page, size=size, total=total, entries=entries)
 
 # --------------------------------------------------
 # ENDPOINT: ADMINISTRAÇÃO DE USUÁRIOS
@@ -158,11 +276,49 @@ async def read_users_ranking(
 @router.get("/admin/users", response_model=List[UserRead])
 async def read_all_users(
     current_admin: Annotated[User, Depends(get_current_active_admin)], # Protegido para admin
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_session),
+    limit: PageLimit = settings.DEFAULT_PAGE_SIZE,
+    cursor: PageCursor = None
+):
+    """
+    Retorna os usuários do sistema (apenas para administradores), paginados por cursor.
+    """
+    users, next_cursor = await get_users_page_async(db, limit, cursor) # Sem hashed_password
+    set_next_page_headers(request, response, next_cursor)
+    return json_response(encode_rows(UserRead, users), response)
+
+@router.put("/admin/users/{user_id}/active", response_model=UserRead)
+def update_user_active_status(
+    user_id: int,
+    current_admin: Annotated[User, Depends(get_current_active_admin)], # Protegido para admin
+    is_active: bool = Query(..., description="true para ativar, false para desativar."),
     db: Session = Depends(get_session)
 ):
     """
-    Retorna uma lista de todos os usuários no sistema (apenas para administradores).
+    Ativa ou desativa um usuário (apenas para administradores).
+    """
+    user = set_user_active(user_id, is_active, db)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuário não encontrado.")
+    return user
+
+@router.get("/admin/metrics/password-hashing")
+async def read_password_hashing_metrics(
+    current_admin: Annotated[User, Depends(get_current_active_admin)]
+):
+    """
+    Métricas do pool do bcrypt deste worker: fila, execuções e tempos de espera (apenas para administradores).
+    """
+    return password_hasher.metrics()
+
+@router.get("/admin/metrics/database-pool")
+async def read_database_pool_metrics(
+    current_admin: Annotated[User, Depends(get_current_active_admin)]
+):
+    """
+    Métricas dos pools de conexões deste worker (engine síncrono e assíncrono): conexões
+    em uso, overflow, checkouts, tempo de espera e esgotamentos (apenas para administradores).
     """
-    users_stmt = select(User) # Cria o statement
-    users = db.execute(users_stmt).scalars().all() # Executa e obtém todos os resultados
-    return users
+    return {name: metrics.metrics() for name, metrics in pool_metrics.items()}
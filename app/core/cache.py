@@ -0,0 +1,261 @@
+# app/core/cache.py
+import hashlib
+import json
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from app.core.config import settings
+
+class TTLCache:
+    """
+    Cache LRU em memória (por worker) com expiração por tempo.
+    Thread-safe: usado tanto por rotas async quanto por rotas no threadpool.
+    """
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """Remove as entradas para as quais predicate(chave, valor) é verdadeiro."""
+        with self._lock:
+            keys = [key for key, (_, value) in self._data.items() if predicate(key, value)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+# --------------------------------------------------
+# Backends do cache de respostas (app/core/http_cache.py)
+# Entradas agrupadas por namespace (ex: escopo de versão "games:round:5"), que pode
+# ser invalidado de uma vez quando os dados mudam. Cada entrada é uma resposta já
+# serializada: (corpo JSON em bytes, cabeçalhos).
+# --------------------------------------------------
+CachedResponse = Tuple[bytes, Dict[str, str]]
+
+class CacheBackend(ABC):
+    """Interface dos backends: get/set por (namespace, chave) e invalidação por namespace."""
+    @abstractmethod
+    def get(self, namespace: str, key: str) -> Optional[CachedResponse]:
+        """Resposta guardada, ou None se ausente ou expirada."""
+
+    @abstractmethod
+    def set(self, namespace: str, key: str, value: CachedResponse, ttl: Optional[float] = None) -> None:
+        """Guarda a resposta por `ttl` segundos (padrão do backend se None)."""
+
+    @abstractmethod
+    def invalidate(self, namespace: str) -> None:
+        """Remove todas as entradas do namespace."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove todas as entradas."""
+
+class NullCacheBackend(CacheBackend):
+    """Cache desligado: nunca guarda nada."""
+    def get(self, namespace: str, key: str) -> Optional[CachedResponse]:
+        return None
+
+    def set(self, namespace: str, key: str, value: CachedResponse, ttl: Optional[float] = None) -> None:
+        pass
+
+    def invalidate(self, namespace: str) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+class MemoryCacheBackend(CacheBackend):
+    """LRU em memória, por worker (cada processo do gunicorn tem o seu)."""
+    def __init__(self, maxsize: int, ttl: float):
+        self.entries = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, namespace: str, key: str) -> Optional[CachedResponse]:
+        return self.entries.get((namespace, key))
+
+    def set(self, namespace: str, key: str, value: CachedResponse, ttl: Optional[float] = None) -> None:
+        self.entries.set((namespace, key), value, ttl)
+
+    def invalidate(self, namespace: str) -> None:
+        self.entries.delete_where(lambda key, value: key[0] == namespace)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+class UnsafeCacheDirectory(Exception):
+    """O diretório do cache em arquivos não é exclusivo do usuário da aplicação."""
+
+class FileCacheBackend(CacheBackend):
+    """
+    Cache em arquivos, compartilhado entre os workers da mesma máquina (em /dev/shm fica
+    em memória). Um diretório por namespace e um arquivo por chave; gravação atômica
+    (arquivo temporário + rename) e invalidação removendo o diretório do namespace.
+    Cada arquivo tem uma linha JSON (expiração e cabeçalhos) seguida do corpo, sem pickle:
+    ler o cache nunca executa código. O diretório deve pertencer ao usuário da aplicação,
+    sem acesso de outros usuários (0700), e guarda no máximo `maxsize` entradas.
+    """
+    def __init__(self, directory: str, ttl: float, maxsize: int):
+        self.directory = directory
+        self.ttl = ttl
+        self.maxsize = maxsize
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        info = os.lstat(directory)
+        if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.geteuid() or info.st_mode & 0o077:
+            raise UnsafeCacheDirectory(
+                f"{directory} deve ser um diretório do usuário da aplicação, sem acesso de outros usuários (chmod 700)."
+            )
+
+    @staticmethod
+    def _hash(value: str) -> str:
+        return hashlib.sha256(value.encode()).hexdigest()
+
+    def _path(self, namespace: str, key: str) -> str:
+        return os.path.join(self.directory, self._hash(namespace), self._hash(key))
+
+    @staticmethod
+    def _read(path: str) -> Tuple[float, CachedResponse]:
+        with open(path, "rb") as file:
+            meta = json.loads(file.readline())
+            return meta["expires_at"], (file.read(), meta["headers"])
+
+    def get(self, namespace: str, key: str) -> Optional[CachedResponse]:
+        path = self._path(namespace, key)
+        try:
+            expires_at, value = self._read(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError):
+            return None # Arquivo corrompido ou removido durante a leitura: trata como ausente
+        if expires_at < time.time():
+            self._remove(path)
+            return None
+        return value
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _entries(self):
+        """(caminho, mtime) das entradas de todos os namespaces."""
+        for namespace in os.scandir(self.directory):
+            if namespace.name.startswith(".") or not namespace.is_dir(follow_symlinks=False):
+                continue
+            try:
+                for entry in os.scandir(namespace.path):
+                    if not entry.name.startswith("."):
+                        yield entry.path, entry.stat(follow_symlinks=False).st_mtime
+            except OSError:
+                continue # Namespace invalidado durante a listagem
+
+    def _make_room(self) -> None:
+        """Abaixo de `maxsize` entradas: remove as expiradas e, se preciso, as mais antigas."""
+        entries = list(self._entries())
+        if len(entries) < self.maxsize:
+            return
+        now = time.time()
+        alive = []
+        for path, mtime in entries:
+            try:
+                expired = self._read(path)[0] < now
+            except (OSError, ValueError, KeyError, TypeError):
+                expired = True
+            if expired:
+                self._remove(path)
+            else:
+                alive.append((mtime, path))
+        alive.sort()
+        for _, path in alive[:max(len(alive) - self.maxsize + 1, 0)]:
+            self._remove(path)
+
+    def set(self, namespace: str, key: str, value: CachedResponse, ttl: Optional[float] = None) -> None:
+        path = self._path(namespace, key)
+        folder = os.path.dirname(path)
+        body, headers = value
+        meta = {"expires_at": time.time() + (self.ttl if ttl is None else ttl), "headers": headers}
+        try:
+            self._make_room()
+            os.makedirs(folder, mode=0o700, exist_ok=True)
+            fd, temporary = tempfile.mkstemp(dir=folder, prefix=".tmp-")
+            with os.fdopen(fd, "wb") as file:
+                file.write(json.dumps(meta).encode() + b"\n")
+                file.write(body)
+            os.replace(temporary, path)
+        except OSError as e: # Namespace invalidado no meio da gravação, disco cheio...: só não guarda
+            print(f"AVISO: Falha ao gravar no cache de respostas: {e}")
+
+    def _remove_directory(self, folder: str) -> None:
+        # Renomeia antes de apagar: leitores nunca veem um namespace parcialmente removido
+        trash = os.path.join(self.directory, f".trash-{uuid.uuid4().hex}")
+        try:
+            os.rename(folder, trash)
+        except OSError:
+            return
+        shutil.rmtree(trash, ignore_errors=True)
+
+    def invalidate(self, namespace: str) -> None:
+        self._remove_directory(os.path.join(self.directory, self._hash(namespace)))
+
+    def clear(self) -> None:
+        for name in os.listdir(self.directory):
+            self._remove_directory(os.path.join(self.directory, name))
+
+def create_cache_backend(backend: str) -> CacheBackend:
+    """Backend configurado em RESPONSE_CACHE_BACKEND: "memory", "file" ou "none"."""
+    backend = backend.lower()
+    if backend == "none":
+        return NullCacheBackend()
+    if backend == "file":
+        directory = settings.RESPONSE_CACHE_DIR or os.path.join(tempfile.gettempdir(), f"bolao-response-cache-{os.geteuid()}")
+        try:
+            return FileCacheBackend(directory, ttl=settings.RESPONSE_CACHE_TTL_SECONDS, maxsize=settings.RESPONSE_CACHE_SIZE)
+        except UnsafeCacheDirectory as e:
+            print(f"AVISO: Cache de respostas em arquivos desativado: {e} Usando o cache em memória.")
+    if backend == "memory":
+        return MemoryCacheBackend(maxsize=settings.RESPONSE_CACHE_SIZE, ttl=settings.RESPONSE_CACHE_TTL_SECONDS)
+    raise ValueError(f"RESPONSE_CACHE_BACKEND inválido: '{backend}' (use memory, file ou none).")
+
+# Respostas serializadas das rotas de leitura mais acessadas
+response_cache = create_cache_backend(settings.RESPONSE_CACHE_BACKEND)
@@ -6,12 +6,61 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     
     DATABASE_URL: str = os.getenv("DATABASE_URL")
+    DATABASE_ECHO: bool = False # Loga cada comando SQL (apenas para depuração)
+
+    # Pool de conexões, por worker e por engine (síncrono e assíncrono). Conexões abertas no
+    # pior caso: workers x 2 x (DB_POOL_SIZE + DB_MAX_OVERFLOW); ver o readme.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT_SECONDS: float = 10 # Espera máxima por uma conexão livre
+    DB_POOL_RECYCLE_SECONDS: int = 1800 # Renova conexões mais antigas que isso
+    DB_POOL_PRE_PING: bool = True # Testa a conexão no checkout (evita erro após ociosidade)
+    DB_CONNECT_TIMEOUT_SECONDS: int = 10
+
+    # Réplicas de leitura (URLs separadas por vírgula; vazio = tudo no principal) e por quanto
+    # tempo as leituras de quem acabou de escrever continuam no principal
+    DATABASE_REPLICA_URLS: str = ""
+    READ_YOUR_WRITES_SECONDS: int = 10
     
     SECRET_KEY: str 
     
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES")
 
+    # Regras de pontuação (ver app/crud/scoring.py), ex: "exact_score=3,correct_winner=1"
+    SCORING_RULES: str = "exact_score=1"
+    SCORING_CUMULATIVE: bool = False
+    SCORING_ROUND_MULTIPLIERS: str = "" # ex: "37=2,38=2"
+
+    # Cache de usuários autenticados (por worker) e confiança nas claims do token em rotas de leitura
+    PRINCIPAL_CACHE_SIZE: int = 1024
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    TRUST_TOKEN_CLAIMS: bool = False
+
+    # Pool do bcrypt por worker: threads e máximo de hashes aguardando (acima disso, 503)
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+
+    # Paginação por cursor das listagens (jogos, apostas, usuários): tamanho padrão e máximo da página
+    DEFAULT_PAGE_SIZE: int = 500
+    MAX_PAGE_SIZE: int = 1000
+
+    # Tempo máximo que um worker reaproveita a versão dos dados (ETag) sem consultar o banco
+    DATA_VERSION_CACHE_SECONDS: int = 5
+
+    # Cache de respostas serializadas (jogos por rodada, ranking): "memory" (por worker),
+    # "file" (compartilhado entre os workers da máquina; ex: RESPONSE_CACHE_DIR=/dev/shm/bolao) ou "none".
+    # O diretório do "file" deve ser do usuário da aplicação, sem acesso de outros (0700).
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_DIR: str = ""
+    RESPONSE_CACHE_TTL_SECONDS: int = 60
+    RESPONSE_CACHE_SIZE: int = 256 # Máximo de respostas guardadas (por worker no "memory", no total no "file")
+
+    # Instrumentação (app/core/metrics.py): cabeçalho Server-Timing em cada resposta e token
+    # exigido em /metrics (Authorization: Bearer <token>; vazio = /metrics desativado)
+    SERVER_TIMING_ENABLED: bool = True
+    METRICS_TOKEN: str = ""
+
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
 settings = Settings()
@@ -0,0 +1,35 @@
+# app/core/cors.py
+# Origens permitidas no CORS: app móvel (Capacitor) e o frontend web (FRONTEND_URL).
+# O diagnóstico da configuração é exibido uma vez por deploy, na etapa de release,
+# e não na inicialização de cada worker.
+import os
+from typing import List, Tuple
+
+# Origens padrão para permitir o aplicativo móvel Capacitor
+MOBILE_APP_ORIGINS = [
+    "capacitor://localhost",  # Para Capacitor (iOS e Android)
+    "http://localhost"        # Para Capacitor Android (WebView)
+    # Considere adicionar "ionic://localhost" se você usar o Ionic DevApp para testes
+]
+DEFAULT_WEB_DEV_ORIGIN = "http://localhost:4200" # Fallback para desenvolvimento web
+
+def cors_origins() -> Tuple[List[str], str]:
+    """(origens permitidas, mensagem de diagnóstico da configuração)."""
+    frontend_url_env = os.getenv("FRONTEND_URL")
+    origins_to_allow = list(MOBILE_APP_ORIGINS) # Cria uma cópia para poder modificar
+
+    # Adiciona a FRONTEND_URL (para seu frontend web, se existir)
+    cleaned_frontend_url = (frontend_url_env or "").rstrip('/')
+    if cleaned_frontend_url:
+        if cleaned_frontend_url not in origins_to_allow: # Evita duplicatas
+            origins_to_allow.append(cleaned_frontend_url)
+        message = f"INFO: CORS - FRONTEND_URL ('{cleaned_frontend_url}') e origens de app móvel configuradas."
+    else:
+        if DEFAULT_WEB_DEV_ORIGIN not in origins_to_allow:
+            origins_to_allow.append(DEFAULT_WEB_DEV_ORIGIN)
+        state = "vazia" if frontend_url_env is not None else "não definida"
+        message = (
+            f"AVISO: FRONTEND_URL {state}. Configurando CORS para origens de app móvel e {DEFAULT_WEB_DEV_ORIGIN}. "
+            "Defina FRONTEND_URL para o seu ambiente de produção web (ex: Railway), se aplicável."
+        )
+    return origins_to_allow, f"{message} Lista final de origens permitidas: {origins_to_allow} (allow_credentials=True)"
@@ -1,30 +1,222 @@
 # app/core/database.py
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import itertools
+import threading
+import time
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.engine import make_url
 from sqlalchemy.engine.base import Engine
 from sqlalchemy.ext.declarative import DeclarativeMeta 
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 
 from app.core.config import settings
 
 DATABASE_URL = settings.DATABASE_URL
 
-engine: Engine = create_engine(DATABASE_URL, echo=True) 
+# --------------------------------------------------
+# Pool de conexões (por worker): tamanho, overflow, tempo de espera, reciclagem e
+# pre-ping configurados em Settings. Cada worker do gunicorn tem um pool para o engine
+# síncrono e outro para o assíncrono; ver "Dimensionamento do pool" no readme.
+# --------------------------------------------------
+class PoolMetrics:
+    """
+    Métricas de um pool de conexões deste worker: checkouts, tempo esperando uma
+    conexão livre, esgotamentos (timeout), conexões abertas e invalidadas.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            data = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+        if isinstance(self.pool, QueuePool):
+            data.update({
+                "size": self.pool.size(),
+                "checked_out": self.pool.checkedout(),
+                "checked_in": self.pool.checkedin(),
+                "overflow": max(self.pool.overflow(), 0),
+                "max_overflow": settings.DB_MAX_OVERFLOW,
+            })
+        return data
+
+pool_metrics = {"sync": PoolMetrics("sync"), "async": PoolMetrics("async")}
+
+def _metered_pool_class(pool_class, metrics: PoolMetrics):
+    """Pool que mede o tempo de espera por uma conexão livre em cada checkout."""
+    class MeteredPool(pool_class):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except exc.TimeoutError:
+                metrics.record_wait(time.perf_counter() - start, timed_out=True)
+                raise
+            metrics.record_wait(time.perf_counter() - start)
+            return connection
+    return MeteredPool
+
+def engine_options(database_url: str, metrics: PoolMetrics, pool_class=QueuePool) -> dict:
+    """Argumentos de create_engine/create_async_engine a partir de Settings."""
+    options = {"echo": settings.DATABASE_ECHO}
+    if make_url(database_url).get_backend_name() == "sqlite":
+        return options # SQLite local (testes, scripts): pool padrão do driver
+    options.update(
+        poolclass=_metered_pool_class(pool_class, metrics),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS, # Antes de o servidor/proxy derrubar conexões ociosas
+        pool_pre_ping=settings.DB_POOL_PRE_PING, # Descarta conexões mortas no checkout, sem erro na requisição
+        connect_args={"connect_timeout": settings.DB_CONNECT_TIMEOUT_SECONDS},
+    )
+    return options
+
+def _watch_pool(pool, metrics: PoolMetrics) -> None:
+    metrics.pool = pool
+
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        with metrics._lock:
+            metrics.connects += 1
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        with metrics._lock:
+            metrics.checkouts += 1
+
+    @event.listens_for(pool, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        with metrics._lock:
+            metrics.invalidations += 1
+
+engine: Engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL, pool_metrics["sync"]))
+_watch_pool(engine.pool, pool_metrics["sync"])
 
 Base: DeclarativeMeta = declarative_base()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-def create_db_and_tables():
-    from app.models.user import User
-    from app.models.game import Game
-    from app.models.bet import Bet
+# --------------------------------------------------
+# Acesso assíncrono: mesmo banco, driver assíncrono (aiomysql / aiosqlite)
+# --------------------------------------------------
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
 
-    print("Tentando executar Base.metadata.create_all(engine)...") 
-    try:
-        Base.metadata.create_all(engine) 
-        print("Base.metadata.create_all(engine) executado com sucesso.") 
-    except Exception as e:
-        print(f"ERRO durante Base.metadata.create_all: {e}")
+def get_async_database_url(database_url: str) -> str:
+    """Converte a DATABASE_URL síncrona para o driver assíncrono equivalente."""
+    url = make_url(database_url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername)).render_as_string(hide_password=False)
+
+ASYNC_DATABASE_URL = get_async_database_url(DATABASE_URL)
+async_engine: AsyncEngine = create_async_engine(
+    ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, pool_metrics["async"], AsyncAdaptedQueuePool)
+)
+_watch_pool(async_engine.sync_engine.pool, pool_metrics["async"])
+
+# expire_on_commit=False: objetos continuam legíveis após o commit sem novo acesso ao banco
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# --------------------------------------------------
+# Réplicas de leitura (DATABASE_REPLICA_URLS): rotas de leitura de dados compartilhados (jogos,
+# ranking) usam get_async_read_session, que alterna entre as réplicas; escritas, rotas de admin
+# e leituras dos dados do próprio usuário continuam no banco principal.
+# --------------------------------------------------
+REPLICA_URLS = [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+READ_PRIMARY_COOKIE = "read_primary_until" # Leituras no principal até este instante (epoch)
+
+def _create_replica_sessionmaker(index: int, database_url: str) -> async_sessionmaker:
+    metrics = pool_metrics[f"replica{index}"] = PoolMetrics(f"replica{index}")
+    replica_url = get_async_database_url(database_url)
+    replica_engine = create_async_engine(replica_url, **engine_options(replica_url, metrics, AsyncAdaptedQueuePool))
+    _watch_pool(replica_engine.sync_engine.pool, metrics)
+    # info["replica"]: quem lê pode distinguir dados da réplica (ex: cache de versões)
+    return async_sessionmaker(replica_engine, autoflush=False, expire_on_commit=False, info={"replica": True})
+
+ReplicaSessionLocals = [_create_replica_sessionmaker(index, url) for index, url in enumerate(REPLICA_URLS)]
+_replica_counter = itertools.count()
+
+def read_sessionmaker(request: Optional[Request] = None) -> async_sessionmaker:
+    """
+    Sessão para leitura: uma réplica (rodízio), ou o principal se não houver réplicas
+    ou se o cliente acabou de escrever (cookie de read-your-writes ainda válido).
+    """
+    if not ReplicaSessionLocals:
+        return AsyncSessionLocal
+    if request is not None:
+        try:
+            if float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time():
+                return AsyncSessionLocal
+        except ValueError:
+            pass # Cookie inválido: ignora
+    return ReplicaSessionLocals[next(_replica_counter) % len(ReplicaSessionLocals)]
+
+def read_your_writes(response: Response) -> None:
+    """
+    Após uma escrita que altera leituras compartilhadas (perfil, resultados do admin),
+    direciona as leituras do cliente ao principal por READ_YOUR_WRITES_SECONDS, até a
+    réplica alcançar a escrita. O cookie vale para todos os workers, mas é de outro site
+    para o frontend e o app: só volta se o cliente enviar credenciais e o navegador não
+    bloquear cookies de terceiros. Por isso é apenas uma melhoria: as leituras do próprio
+    usuário (apostas, posição no ranking) usam sempre o principal. Sem réplicas, nada a fazer.
+    """
+    if not ReplicaSessionLocals:
+        return
+    seconds = settings.READ_YOUR_WRITES_SECONDS
+    response.set_cookie(
+        READ_PRIMARY_COOKIE, f"{time.time() + seconds:.3f}",
+        max_age=seconds, httponly=True, secure=True, samesite="none" # Front-end em outro domínio
+    )
+
+# --------------------------------------------------
+# Ações executadas somente após o commit (ex: invalidação de caches)
+# --------------------------------------------------
+def run_after_commit(db: Session, callback) -> None:
+    """
+    Agenda `callback()` para depois do commit da sessão; descartado em caso de rollback.
+    Evita que um cache seja invalidado antes de a mudança estar visível no banco.
+    Aceita Session ou AsyncSession.
+    """
+    db = getattr(db, "sync_session", db)
+    db.info.setdefault("after_commit", []).append(callback)
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit_callbacks(session: Session) -> None:
+    for callback in session.info.pop("after_commit", []):
+        callback()
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_commit_callbacks(session: Session) -> None:
+    session.info.pop("after_commit", None)
 
 def get_session():
     """Fornece uma sessão de banco de dados para cada requisição da API."""
@@ -33,3 +225,20 @@ def get_session():
         yield db
     finally:
         db.close()
+
+async def get_async_session():
+    """
+    Fornece uma AsyncSession para rotas `async def`: as consultas liberam o event loop
+    enquanto aguardam o banco. Rotas com sessão síncrona devem ser declaradas com `def`
+    (o FastAPI as executa no threadpool).
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_session(request: Request):
+    """
+    Como get_async_session, para rotas somente de leitura: usa uma réplica quando
+    configurada (ver read_sessionmaker). Não use para escritas.
+    """
+    async with read_sessionmaker(request)() as db:
+        yield db
@@ -0,0 +1,80 @@
+# app/core/http_cache.py
+# Cache HTTP das rotas de leitura (GET condicional): a resposta leva ETag/Last-Modified
+# derivados da versão dos dados (ver app/crud/data_version.py) e o cliente que já tem
+# a versão atual recebe 304 sem corpo, antes de qualquer consulta aos dados em si.
+# As rotas mais acessadas também reaproveitam a resposta já serializada (cache de
+# respostas), chaveada pela URL e pela versão dos dados.
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Awaitable, Callable, Optional
+from urllib.parse import urlencode
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import response_cache
+from app.core.pagination import declared_query_params
+from app.core.serialization import json_response
+from app.crud.data_version import get_data_version_async
+
+# Cabeçalhos definidos pela rota que fazem parte da resposta guardada (paginação)
+CACHED_HEADERS = ("x-next-cursor", "link")
+
+def _etag(version: int, updated_at: Optional[datetime]) -> str:
+    stamp = int(updated_at.timestamp()) if updated_at else 0
+    return f'W/"{version}-{stamp}"'
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite devolve datas sem fuso; o banco grava sempre em UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def _not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None: # Tem precedência sobre If-Modified-Since (RFC 9110)
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags or etag[2:] in tags # Comparação fraca
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return since.tzinfo is not None and last_modified.replace(microsecond=0) <= since
+    return False
+
+async def check_not_modified(request: Request, response: Response, scope: str, db: AsyncSession) -> str:
+    """
+    Define ETag, Last-Modified e Cache-Control (revalidar sempre) na resposta com a
+    versão atual do escopo e levanta 304 se o cliente já tiver essa versão.
+    Deve ser chamada antes de buscar os dados da rota. Retorna o ETag.
+    """
+    version, updated_at = await get_data_version_async(scope, db)
+    updated_at = _as_utc(updated_at) if updated_at else None
+    headers = {"ETag": _etag(version, updated_at), "Cache-Control": "no-cache"}
+    if updated_at:
+        headers["Last-Modified"] = format_datetime(updated_at, usegmt=True)
+
+    if _not_modified(request, headers["ETag"], updated_at):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return headers["ETag"]
+
+async def cached_json_response(
+    request: Request, response: Response, scope: str, etag: str, load: Callable[[], Awaitable[bytes]]
+) -> Response:
+    """
+    Resposta JSON da rota a partir do cache de respostas (namespace = escopo de versão).
+    Na falta, `load()` busca os dados e retorna o JSON já codificado (e pode definir os
+    cabeçalhos de paginação em `response`). Como a chave inclui o ETag, uma entrada
+    nunca é servida para outra versão dos dados; parâmetros de query que a rota não
+    declara ficam fora da chave, para não multiplicar entradas da mesma resposta.
+    """
+    key = f"{request.url.path}?{urlencode(declared_query_params(request))}|{etag}"
+    cached = response_cache.get(scope, key)
+    if cached is None:
+        body = await load()
+        cached = (body, {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers})
+        response_cache.set(scope, key, cached)
+    body, headers = cached
+    response.headers.update(headers)
+    return json_response(body, response)
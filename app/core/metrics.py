@@ -0,0 +1,248 @@
+# app/core/metrics.py
+# Instrumentação por requisição: latência por rota (histograma), número de comandos SQL e
+# tempo de banco de cada requisição (eventos do SQLAlchemy) e tempo gasto no bcrypt e na
+# serialização. Exposta em /metrics (formato de texto do Prometheus) e, em cada resposta,
+# no cabeçalho Server-Timing. As métricas são por worker: cada processo do gunicorn
+# mantém e expõe as suas.
+import secrets
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+UNMATCHED_ROUTE = "sem_rota" # 404 e afins: não usa o caminho, para não criar uma série por URL
+
+# --------------------------------------------------
+# Métricas no formato do Prometheus
+# --------------------------------------------------
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in [*zip(names, values), *extra]]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value:g}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, description: str, buckets: Sequence[float], labelnames: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], list] = {} # labels -> [contagem por bucket..., soma, total]
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        index = bisect_left(self.buckets, value) # Primeiro bucket com limite >= value
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series_items = sorted((labels, list(series)) for labels, series in self._series.items())
+        for labels, series in series_items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+REQUEST_SECONDS = Histogram(
+    "bolao_http_request_duration_seconds", "Latência das requisições HTTP por rota.",
+    LATENCY_BUCKETS, ("method", "route", "status"),
+)
+REQUEST_DB_QUERIES = Histogram(
+    "bolao_http_request_db_queries", "Comandos SQL executados por requisição.",
+    QUERY_COUNT_BUCKETS, ("method", "route"),
+)
+REQUEST_DB_SECONDS = Histogram(
+    "bolao_http_request_db_seconds", "Tempo de banco por requisição.",
+    LATENCY_BUCKETS, ("method", "route"),
+)
+DB_QUERIES = Counter("bolao_db_queries_total", "Comandos SQL executados (inclusive fora de requisições).")
+DB_SECONDS = Counter("bolao_db_seconds_total", "Tempo total de execução de comandos SQL.")
+PHASE_SECONDS = Counter("bolao_phase_seconds_total", "Tempo gasto por etapa (bcrypt, serialização).", ("phase",))
+PHASE_CALLS = Counter("bolao_phase_calls_total", "Execuções por etapa (bcrypt, serialização).", ("phase",))
+
+# --------------------------------------------------
+# Tempos da requisição corrente
+# --------------------------------------------------
+class RequestTimings:
+    """
+    Tempos acumulados durante uma requisição. O mesmo objeto é visto pela rota, pelas
+    threads do threadpool e pelo pool do bcrypt (o contexto é copiado, não o objeto).
+    """
+    __slots__ = ("db_queries", "db_seconds", "phases")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.phases: Dict[str, float] = {}
+
+    def server_timing(self, total_seconds: float) -> str:
+        entries = [f"app;dur={total_seconds * 1000:.1f}",
+                   f'db;dur={self.db_seconds * 1000:.1f};desc="{self.db_queries} consulta(s)"']
+        entries += [f"{phase};dur={seconds * 1000:.1f}" for phase, seconds in self.phases.items()]
+        return ", ".join(entries)
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+def record_phase(phase: str, seconds: float) -> None:
+    """Soma `seconds` à etapa `phase` (ex: "bcrypt") na requisição corrente e nos totais."""
+    PHASE_SECONDS.inc((phase,), seconds)
+    PHASE_CALLS.inc((phase,))
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.phases[phase] = timings.phases.get(phase, 0.0) + seconds
+
+@contextmanager
+def timed(phase: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(phase, time.perf_counter() - start)
+
+# --------------------------------------------------
+# Comandos SQL (todos os engines: síncrono, assíncrono e réplicas)
+# --------------------------------------------------
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record_query(conn)
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    if exception_context.connection is not None and exception_context.execution_context is not None:
+        _record_query(exception_context.connection)
+
+def _record_query(conn) -> None:
+    started = conn.info.get("query_started_at")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    DB_QUERIES.inc()
+    DB_SECONDS.inc(amount=elapsed)
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.db_queries += 1
+        timings.db_seconds += elapsed
+
+# --------------------------------------------------
+# Middleware
+# --------------------------------------------------
+class MetricsMiddleware:
+    """
+    Middleware ASGI: mede cada requisição HTTP e, se SERVER_TIMING_ENABLED, adiciona o
+    cabeçalho Server-Timing (app, db, bcrypt, serialização) ao iniciar a resposta.
+    A rota é registrada pelo caminho declarado (ex: /api/v1/games/games/{round_number}).
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.SERVER_TIMING_ENABLED:
+                    MutableHeaders(scope=message).append("Server-Timing", timings.server_timing(time.perf_counter() - start))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_timings.reset(token)
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+            REQUEST_SECONDS.observe((method, route, str(status_code)), time.perf_counter() - start)
+            REQUEST_DB_QUERIES.observe((method, route), timings.db_queries)
+            REQUEST_DB_SECONDS.observe((method, route), timings.db_seconds)
+
+# --------------------------------------------------
+# Exposição (/metrics)
+# --------------------------------------------------
+def _gauges(prefix: str, label: str, values: Dict[str, dict]) -> List[str]:
+    """Métricas numéricas já existentes (pool do banco, bcrypt) como gauges."""
+    lines = []
+    keys = sorted({key for metrics in values.values() for key, value in metrics.items() if isinstance(value, (int, float))})
+    for key in keys:
+        name = f"{prefix}_{key}"
+        lines.append(f"# TYPE {name} gauge")
+        for source, metrics in sorted(values.items()):
+            if isinstance(metrics.get(key), (int, float)):
+                lines.append(f'{name}{{{label}="{source}"}} {metrics[key]:g}')
+    return lines
+
+def render_metrics() -> str:
+    from app.core.database import pool_metrics
+    from app.core.security import password_hasher
+
+    lines = []
+    for metric in (REQUEST_SECONDS, REQUEST_DB_QUERIES, REQUEST_DB_SECONDS, DB_QUERIES, DB_SECONDS, PHASE_SECONDS, PHASE_CALLS):
+        lines += metric.render()
+    lines += _gauges("bolao_db_pool", "pool", {name: metrics.metrics() for name, metrics in pool_metrics.items()})
+    lines += _gauges("bolao_password_hash", "pool", {"bcrypt": password_hasher.metrics()})
+    return "\n".join(lines) + "\n"
+
+def metrics_endpoint(request: Request) -> Response:
+    """
+    Métricas deste worker no formato de texto do Prometheus. Exige
+    `Authorization: Bearer <METRICS_TOKEN>`; sem METRICS_TOKEN definido, a rota não existe (404).
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    authorization = request.headers.get("authorization", "")
+    if not secrets.compare_digest(authorization.encode(), f"Bearer {settings.METRICS_TOKEN}".encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token de métricas inválido.")
+    return Response(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,99 @@
+# app/core/pagination.py
+# Paginação por cursor (keyset): cada página continua a partir da chave de ordenação do
+# último item da anterior (WHERE chave > último ... ORDER BY chave LIMIT n), com custo
+# constante qualquer que seja a página, ao contrário de OFFSET.
+import base64
+import json
+from datetime import datetime
+from typing import Annotated, Any, List, Optional, Sequence, Tuple
+from urllib.parse import urlencode
+
+from fastapi import HTTPException, Query, Request, Response, status
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+
+# Parâmetros de query comuns às listagens paginadas
+PageLimit = Annotated[int, Query(ge=1, le=settings.MAX_PAGE_SIZE, description="Itens por página.")]
+PageCursor = Annotated[Optional[str], Query(description="Cursor da próxima página (cabeçalho X-Next-Cursor).")]
+
+class Keyset:
+    """
+    Ordenação única de uma listagem, como pares (coluna, decrescente). A última coluna
+    deve ser única (ex: id) para que nenhum item se repita ou se perca entre páginas.
+    """
+    def __init__(self, *columns: Tuple[Any, bool]):
+        self.columns = columns
+
+    def order_by(self) -> list:
+        return [column.desc() if descending else column.asc() for column, descending in self.columns]
+
+    def after(self, values: Sequence[Any]):
+        """
+        Condição "vem depois de `values`". Com todas as colunas na mesma direção, uma
+        comparação de linha, (a, b) > (x, y), que o banco resolve como busca no índice
+        composto; com direções mistas, coluna a coluna (OR de prefixos iguais).
+        """
+        directions = {descending for _, descending in self.columns}
+        if len(directions) == 1:
+            columns = [column for column, _ in self.columns]
+            if len(columns) == 1:
+                row, bound = columns[0], values[0]
+            else: # types: valores do cursor convertidos como os das colunas (ex: datas no SQLite)
+                row, bound = tuple_(*columns), tuple_(*values, types=[column.type for column in columns])
+            return row < bound if directions.pop() else row > bound
+        clauses = []
+        for index, (column, descending) in enumerate(self.columns):
+            equal_prefix = [prefix == value for (prefix, _), value in zip(self.columns[:index], values)]
+            clauses.append(and_(*equal_prefix, column < values[index] if descending else column > values[index]))
+        return or_(*clauses)
+
+    def apply(self, statement: Select, cursor: Optional[str], limit: int) -> Select:
+        """Ordena, aplica o cursor e busca limit + 1 linhas (a extra indica se há próxima página)."""
+        if cursor:
+            values = decode_cursor(cursor)
+            if len(values) != len(self.columns):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido.")
+            statement = statement.where(self.after(values))
+        return statement.order_by(*self.order_by()).limit(limit + 1)
+
+    def page(self, items: List[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+        """Separa a página (até `limit` itens) e o cursor da próxima (None se for a última)."""
+        if len(items) <= limit:
+            return list(items), None
+        items = list(items[:limit])
+        last = items[-1]
+        return items, encode_cursor([getattr(last, column.key) for column, _ in self.columns])
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Cursor opaco (base64 de JSON) com os valores da chave de ordenação."""
+    payload = [{"dt": value.isoformat()} if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return [datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value for value in payload]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido.")
+
+def declared_query_params(request: Request) -> List[Tuple[str, str]]:
+    """
+    Parâmetros de query que a rota declara, em ordem alfabética; os demais são ignorados
+    (não mudam a resposta e não devem gerar chaves de cache nem links diferentes).
+    """
+    route = request.scope.get("route")
+    names = {param.alias for param in route.dependant.query_params} if route is not None else set()
+    return sorted((name, value) for name, value in request.query_params.multi_items() if name in names)
+
+def set_next_page_headers(request: Request, response: Response, next_cursor: Optional[str]) -> None:
+    """
+    Informa a próxima página sem mudar o corpo da resposta (que continua sendo a lista):
+    X-Next-Cursor com o cursor e Link rel="next" com a URL pronta.
+    """
+    if next_cursor:
+        params = [(name, value) for name, value in declared_query_params(request) if name != "cursor"]
+        url = request.url.replace(query=urlencode(params + [("cursor", next_cursor)]))
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{url}>; rel="next"'
@@ -1,28 +1,134 @@
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime, timedelta, timezone
 from typing import Optional, List # Adicionado List
 
-from passlib.context import CryptContext
 from jose import JWTError, jwt
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select 
 
-from app.core.database import get_session 
+from app.core.database import get_async_session
+from app.core.cache import TTLCache
+from app.core.metrics import record_phase
 from app.models.user import User, UserRole 
 
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+@lru_cache
+def _pwd_context():
+    # passlib/bcrypt carregados no primeiro login/cadastro, não na inicialização do worker
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/users/token")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return _pwd_context().hash(password)
+
+# --------------------------------------------------
+# Pool dedicado para o bcrypt
+# --------------------------------------------------
+class PasswordHasher:
+    """
+    Executa hash/verificação de senha (bcrypt, ~200ms de CPU cada) em um pool de threads
+    próprio, com limite de concorrência e de fila. O bcrypt libera o GIL, então as threads
+    rodam em paralelo sem travar o event loop nem ocupar o threadpool das rotas.
+    Quando a fila está cheia, a requisição é recusada com 503 em vez de acumular latência.
+    """
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self.pending = 0 # Na fila ou em execução
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.busy_seconds_total = 0.0
+
+    def _submit(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_queue:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Servidor ocupado. Tente novamente em instantes.",
+                    headers={"Retry-After": "1"},
+                )
+            self.pending += 1
+        # Executa no contexto de quem chamou, para o tempo entrar nas métricas da requisição
+        context = contextvars.copy_context()
+        try:
+            future = self._executor.submit(context.run, self._run, time.perf_counter(), fn, *args)
+        except BaseException:
+            self._done(None)
+            raise
+        # Também quando o job é cancelado ainda na fila (cliente desconectou): _run não roda
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    def _run(self, enqueued_at: float, fn, *args):
+        started = time.perf_counter()
+        with self._lock:
+            self.running += 1
+            self.wait_seconds_total += started - enqueued_at
+            self.wait_seconds_max = max(self.wait_seconds_max, started - enqueued_at)
+        try:
+            return fn(*args)
+        finally:
+            busy = time.perf_counter() - started
+            record_phase("bcrypt", busy)
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+                self.busy_seconds_total += busy
+
+    async def run(self, fn, *args):
+        """Para rotas `async def`: aguarda o resultado sem bloquear o event loop."""
+        return await asyncio.wrap_future(self._submit(fn, *args))
+
+    def run_blocking(self, fn, *args):
+        """Para código síncrono (rotas `def`, scripts): respeita o mesmo limite de concorrência."""
+        return self._submit(fn, *args).result()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "pending": self.pending,
+                "running": self.running,
+                "queued": self.pending - self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "busy_seconds_total": round(self.busy_seconds_total, 6),
+            }
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_QUEUE)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hasher.run(get_password_hash, password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
@@ -43,16 +149,32 @@ class TokenData(BaseModel):
     username: Optional[str] = None
 
 
-# *** ORDEM CRÍTICA DAS FUNÇÕES DE DEPENDÊNCIA ***
-# 1. get_current_user: A mais básica, decodifica o token para obter o usuário.
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    session: Session = Depends(get_session)
-) -> User:
-    """
-    Decodifica o token JWT, verifica sua validade e retorna o objeto User correspondente.
-    Levanta HTTPException se o token for inválido ou o usuário não for encontrado.
-    """
+# --------------------------------------------------
+# Cache de usuários autenticados (por worker)
+# Evita o SELECT do usuário a cada requisição autenticada de leitura. As funções CRUD
+# que alteram o usuário invalidam a entrada após o commit; nos demais workers a entrada
+# expira em PRINCIPAL_CACHE_TTL_SECONDS. Por isso as verificações de acesso (usuário
+# ativo, admin) e a troca de senha leem o usuário do banco, e o hash da senha nunca
+# entra no cache.
+# --------------------------------------------------
+principal_cache = TTLCache(maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+def _principal_snapshot(user: User) -> dict:
+    return {column.key: getattr(user, column.key) for column in User.__table__.columns if column.key != "hashed_password"}
+
+def invalidate_principal(user_id: int) -> None:
+    """Remove do cache o usuário informado (perfil, senha ou status alterados)."""
+    principal_cache.delete_where(lambda username, snapshot: snapshot["id"] == user_id)
+
+def invalidate_principals(user_ids: Optional[List[int]] = None) -> None:
+    """Remove do cache os usuários informados, ou todos se user_ids for None."""
+    if user_ids is None:
+        principal_cache.clear()
+        return
+    user_ids = set(user_ids)
+    principal_cache.delete_where(lambda username, snapshot: snapshot["id"] in user_ids)
+
+def _decode_token(token: str) -> dict:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Não foi possível validar as credenciais",
@@ -60,21 +182,72 @@ async def get_current_user(
     )
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
+        if payload.get("sub") is None:
             raise credentials_exception
-        token_data = TokenData(username=username)
+        return payload
     except JWTError:
         raise credentials_exception
 
-    user = session.execute(select(User).where(User.username == token_data.username)).scalars().first()
+async def _load_user(username: str, session: AsyncSession) -> User:
+    """Usuário lido do banco (e atualizado no cache); 401 se não existir mais."""
+    user = (await session.execute(select(User).where(User.username == username))).scalars().first()
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Não foi possível validar as credenciais",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    principal_cache.set(username, _principal_snapshot(user))
     return user
 
+# *** ORDEM CRÍTICA DAS FUNÇÕES DE DEPENDÊNCIA ***
+# 1. get_current_user: A mais básica, decodifica o token para obter o usuário.
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    session: AsyncSession = Depends(get_async_session)
+) -> User:
+    """
+    Decodifica o token JWT, verifica sua validade e retorna o objeto User correspondente.
+    Levanta HTTPException se o token for inválido ou o usuário não for encontrado.
+    Usuários já resolvidos vêm do cache, sem consulta ao banco (e sem hashed_password).
+    """
+    token_data = TokenData(username=_decode_token(token)["sub"])
+
+    snapshot = principal_cache.get(token_data.username)
+    if snapshot is not None:
+        return User(**snapshot) # Objeto transiente: usar apenas para leitura / pelo id
+    return await _load_user(token_data.username, session)
+
+# 1a. get_current_user_from_db: sempre consulta o banco.
+async def get_current_user_from_db(
+    token: str = Depends(oauth2_scheme),
+    session: AsyncSession = Depends(get_async_session)
+) -> User:
+    """
+    Como get_current_user, mas sem cache: o usuário vem da sessão da requisição, com
+    status, papel e hash da senha atuais. Base das verificações de acesso.
+    """
+    return await _load_user(TokenData(username=_decode_token(token)["sub"]).username, session)
+
+# 1b. get_current_principal: para rotas somente leitura.
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    session: AsyncSession = Depends(get_async_session)
+) -> User:
+    """
+    Com TRUST_TOKEN_CLAIMS ativo, monta o usuário a partir das claims do token
+    (uid, role, active), sem acessar banco nem cache. Caso contrário, ou para tokens
+    antigos sem essas claims, equivale a get_current_user.
+    """
+    if settings.TRUST_TOKEN_CLAIMS:
+        payload = _decode_token(token)
+        if {"uid", "role", "active"} <= payload.keys():
+            return User(id=payload["uid"], username=payload["sub"], role=UserRole(payload["role"]), is_active=payload["active"])
+    return await get_current_user(token, session)
+
 # 2. get_current_active_user: Depende de get_current_user e verifica se o usuário está ativo.
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_from_db)
 ) -> User:
     if not current_user.is_active: 
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Usuário inativo")
@@ -87,3 +260,11 @@ async def get_current_active_admin(
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Não autorizado: Requer privilégios de administrador")
     return current_user
+
+# 2b. get_current_active_principal: get_current_principal + verificação de usuário ativo.
+async def get_current_active_principal(
+    current_user: User = Depends(get_current_principal)
+) -> User:
+    if not current_user.is_active:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Usuário inativo")
+    return current_user
@@ -0,0 +1,64 @@
+# app/core/serialization.py
+# Caminho rápido de serialização das listagens de leitura: em vez de carregar objetos
+# do ORM e validá-los um a um no response_model (from_attributes), a consulta busca só
+# as colunas do schema, como tuplas, e as linhas vão direto para bytes JSON. A saída é
+# a mesma do response_model (mesmos campos, na mesma ordem e formato).
+import enum
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Iterable, List, Sequence, Type
+
+from fastapi import Response
+from pydantic import BaseModel
+
+from app.core.metrics import timed
+
+try: # Dependência opcional: sem ela usa o json da biblioteca padrão (mais lento)
+    import orjson
+except ImportError:
+    orjson = None
+
+def schema_columns(model: Any, schema: Type[BaseModel]) -> List[Any]:
+    """Colunas do modelo correspondentes aos campos do schema de leitura, na ordem do schema."""
+    return [getattr(model, name) for name in schema.model_fields]
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        if value.tzinfo is not None and value.utcoffset() == timezone.utc.utcoffset(None):
+            return value.isoformat().replace("+00:00", "Z") # Mesmo formato do Pydantic
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Tipo não serializável em JSON: {type(value).__name__}")
+
+def _dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_UTC_Z)
+    return json.dumps(value, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+def dumps(value: Any) -> bytes:
+    """JSON compacto em bytes (orjson, se disponível)."""
+    with timed("serialization"):
+        return _dumps(value)
+
+def encode_rows(schema: Type[BaseModel], rows: Iterable[Sequence[Any]]) -> bytes:
+    """
+    Lista de objetos JSON a partir de linhas (tuplas) com as colunas de schema_columns(schema),
+    equivalente a List[schema] no response_model, sem validar linha a linha. Colunas
+    extras depois das do schema (ex: chave do cursor) são ignoradas.
+    """
+    fields = tuple(schema.model_fields)
+    with timed("serialization"):
+        return _dumps([dict(zip(fields, row)) for row in rows])
+
+def json_response(body: bytes, response: Response) -> Response:
+    """
+    Resposta com o JSON já codificado, sem passar pelo response_model da rota.
+    Mantém os cabeçalhos já definidos em `response` (paginação, ETag).
+    """
+    return Response(content=body, media_type="application/json", headers=dict(response.headers))
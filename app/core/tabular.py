@@ -0,0 +1,262 @@
+# app/core/tabular.py
+# Importação/exportação de dados tabulares em Excel (.xlsx), CSV e Parquet (colunar).
+# Leitura: linhas lidas em streaming e validadas uma a uma, acumulando os erros de todas
+# as linhas em vez de parar no primeiro. Escrita: arquivos gerados em pedaços, direto
+# para a resposta. As mesmas funções de validação servem a todos os formatos.
+# openpyxl e pyarrow são importados no primeiro uso (rotas de admin), não na
+# inicialização dos workers.
+import csv
+import enum
+import io
+from datetime import date, datetime
+from itertools import chain
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from app.core.xlsx import XLSX_MEDIA_TYPE, CHUNK_SIZE, ChunkBuffer, stream_xlsx
+
+MAX_REPORTED_ERRORS = 50 # Linhas com erro listadas na resposta
+PARQUET_BATCH_SIZE = 10000 # Linhas por row group/lote no Parquet
+
+Row = Tuple[int, tuple] # (número da linha no arquivo, valores)
+
+# Início de texto que o Excel/LibreOffice interpretam como fórmula ao abrir um CSV
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+class TabularFormat(str, enum.Enum):
+    XLSX = "xlsx"
+    CSV = "csv"
+    PARQUET = "parquet"
+
+MEDIA_TYPES = {
+    TabularFormat.XLSX: XLSX_MEDIA_TYPE,
+    TabularFormat.CSV: "text/csv; charset=utf-8",
+    TabularFormat.PARQUET: "application/vnd.apache.parquet",
+}
+
+def format_from_filename(filename: Optional[str]) -> Optional[TabularFormat]:
+    """Formato pela extensão do arquivo enviado (None se não suportado)."""
+    extension = (filename or "").rsplit(".", 1)[-1].lower()
+    return next((fmt for fmt in TabularFormat if fmt.value == extension), None)
+
+def _require_pyarrow():
+    """
+    Importa o pyarrow (dependência opcional) e retorna (pyarrow, pyarrow.parquet).
+    Sem ele, o formato Parquet responde 501.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet as pyarrow_parquet
+    except ImportError:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Formato Parquet indisponível neste servidor (dependência 'pyarrow' não instalada)."
+        )
+    return pyarrow, pyarrow_parquet
+
+# --------------------------------------------------
+# Leitura
+# --------------------------------------------------
+def iter_xlsx_rows(file, min_row: int = 2) -> Iterator[Row]:
+    """
+    Percorre a primeira planilha de um .xlsx em modo read_only (streaming, sem montar
+    a planilha inteira em memória), ignorando linhas vazias.
+    Levanta ValueError se o arquivo não for uma planilha válida.
+    """
+    import openpyxl
+    try:
+        workbook = openpyxl.load_workbook(file, read_only=True)
+    except Exception as e:
+        raise ValueError(f"Erro ao ler a planilha Excel: {e}. Verifique o formato.")
+    try:
+        for line, row in enumerate(workbook.active.iter_rows(min_row=min_row, values_only=True), start=min_row):
+            if not row or all(cell is None for cell in row):
+                continue
+            yield line, row
+    finally:
+        workbook.close()
+
+def iter_csv_rows(file, min_row: int = 2) -> Iterator[Row]:
+    """
+    Percorre um CSV UTF-8 (separador ',' ou ';', detectado pelo cabeçalho) linha a linha.
+    Células vazias viram None, como no Excel. O apóstrofo que stream_csv põe antes de
+    textos com cara de fórmula é removido, então um CSV exportado volta igual.
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        header = text.readline()
+        delimiter = ";" if header.count(";") > header.count(",") else ","
+        for line, row in enumerate(csv.reader(chain([header], text), delimiter=delimiter), start=1):
+            if line < min_row or not any(cell.strip() for cell in row):
+                continue
+            yield line, tuple(_csv_cell_value(cell.strip()) or None for cell in row)
+    except UnicodeDecodeError:
+        raise ValueError("Erro ao ler o CSV: o arquivo deve estar em UTF-8.")
+    except csv.Error as e:
+        raise ValueError(f"Erro ao ler o CSV: {e}.")
+    finally:
+        text.detach() # Não fecha o arquivo do upload
+
+def _csv_cell_value(cell: str) -> str:
+    return cell[1:] if cell.startswith("'") and cell[1:].startswith(FORMULA_PREFIXES) else cell
+
+def iter_parquet_rows(file) -> Iterator[Row]:
+    """
+    Percorre um arquivo Parquet lote a lote. As colunas são lidas na ordem do arquivo;
+    a numeração das linhas considera o cabeçalho (primeira linha de dados = 2).
+    """
+    _, pyarrow_parquet = _require_pyarrow()
+    try:
+        parquet_file = pyarrow_parquet.ParquetFile(file)
+    except Exception as e:
+        raise ValueError(f"Erro ao ler o arquivo Parquet: {e}. Verifique o formato.")
+    line = 1
+    for batch in parquet_file.iter_batches(batch_size=PARQUET_BATCH_SIZE):
+        for row in zip(*(column.to_pylist() for column in batch.columns)):
+            line += 1
+            if all(cell is None for cell in row):
+                continue
+            yield line, row
+
+def iter_upload_rows(file, fmt: TabularFormat) -> Iterator[Row]:
+    """Linhas de dados (sem o cabeçalho) de um arquivo enviado, no formato informado."""
+    if fmt == TabularFormat.CSV:
+        return iter_csv_rows(file)
+    if fmt == TabularFormat.PARQUET:
+        return iter_parquet_rows(file)
+    return iter_xlsx_rows(file)
+
+def parse_datetime(value: Any) -> datetime:
+    """Converte a célula de data/hora (datetime, número serial do Excel ou texto) em datetime sem fuso."""
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    if isinstance(value, (int, float)):
+        from openpyxl.utils.datetime import from_excel
+        return from_excel(value).replace(tzinfo=None)
+    dt_str = str(value).strip()
+    try:
+        return datetime.fromisoformat(dt_str).replace(tzinfo=None)
+    except ValueError:
+        try:
+            return datetime.strptime(dt_str, '%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            raise ValueError(f"Formato de data/hora desconhecido: '{dt_str}'")
+
+def validate_rows(rows: Iterable[Row], parse_row: Callable[[tuple], Any], errors: List[str]) -> Iterator[Any]:
+    """
+    Gera parse_row(valores) para cada linha válida. Linhas inválidas não interrompem
+    a leitura: a mensagem vai para `errors` (com o número da linha) e a linha é pulada.
+    """
+    for line, row in rows:
+        try:
+            yield parse_row(row)
+        except (ValueError, TypeError, IndexError) as e: # ValidationError do Pydantic é um ValueError
+            errors.append(f"Linha {line}: {e}")
+
+def format_row_errors(errors: List[str]) -> str:
+    """Mensagem única com os erros de todas as linhas (limitada a MAX_REPORTED_ERRORS)."""
+    message = f"{len(errors)} linha(s) com erro: " + " | ".join(errors[:MAX_REPORTED_ERRORS])
+    if len(errors) > MAX_REPORTED_ERRORS:
+        message += f" | ... e mais {len(errors) - MAX_REPORTED_ERRORS}"
+    return message
+
+# --------------------------------------------------
+# Escrita
+# --------------------------------------------------
+def _plain(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+def _csv_cell(value: Any) -> Any:
+    """Valor da célula no CSV; textos com cara de fórmula ganham um apóstrofo na frente."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    value = _plain(value)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+def stream_csv(headers: List[str], rows: Iterable[Iterable[Any]]) -> Iterator[bytes]:
+    """
+    Gera um CSV UTF-8 (separador ',', datas em ISO) em pedaços de ~CHUNK_SIZE bytes.
+    Textos iniciados por =, +, -, @ (ex: nomes de usuário) saem com um apóstrofo na frente
+    para a planilha não executá-los como fórmula.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([_csv_cell(header) for header in headers])
+    for values in rows:
+        writer.writerow([_csv_cell(value) for value in values])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+def _arrow_type(pyarrow, python_type: type):
+    if python_type is bool:
+        return pyarrow.bool_()
+    if python_type is int:
+        return pyarrow.int64()
+    if python_type is float:
+        return pyarrow.float64()
+    if python_type is datetime:
+        return pyarrow.timestamp("us")
+    if python_type is date:
+        return pyarrow.date32()
+    return pyarrow.string() # Textos, enums e colunas sem tipo
+
+def stream_parquet(headers: List[str], types: List[type], rows: Iterable[Iterable[Any]]) -> Iterator[bytes]:
+    """
+    Gera um Parquet com um row group a cada PARQUET_BATCH_SIZE linhas, entregando os
+    bytes de cada lote assim que escrito. `types` são os tipos Python de cada coluna.
+    """
+    pyarrow, pyarrow_parquet = _require_pyarrow()
+    schema = pyarrow.schema([(name, _arrow_type(pyarrow, python_type)) for name, python_type in zip(headers, types)])
+    buffer = ChunkBuffer()
+
+    def column(values, field):
+        if pyarrow.types.is_string(field.type):
+            values = [None if value is None else str(_plain(value)) for value in values]
+        return pyarrow.array(values, type=field.type)
+
+    def write_batch(writer, batch):
+        columns = zip(*batch)
+        writer.write_batch(pyarrow.RecordBatch.from_arrays(
+            [column(values, field) for values, field in zip(columns, schema)], schema=schema
+        ))
+
+    with pyarrow_parquet.ParquetWriter(pyarrow.PythonFile(buffer, mode="w"), schema) as writer:
+        batch = []
+        for values in rows:
+            batch.append(tuple(values))
+            if len(batch) >= PARQUET_BATCH_SIZE:
+                write_batch(writer, batch)
+                batch = []
+                yield buffer.drain()
+        if batch:
+            write_batch(writer, batch)
+    yield buffer.drain()
+
+def export_response(
+    fmt: TabularFormat, name: str, title: str, headers: List[str], types: List[type], rows: Iterable[Iterable[Any]]
+) -> StreamingResponse:
+    """
+    StreamingResponse de download no formato pedido. `name` é o nome do arquivo sem
+    extensão; `title` é o nome da planilha (Excel); `types` são usados no Parquet.
+    """
+    if fmt == TabularFormat.PARQUET:
+        _require_pyarrow() # Antes de iniciar a resposta, para responder 501 em vez de cortar o download
+        content = stream_parquet(headers, types, rows)
+    elif fmt == TabularFormat.CSV:
+        content = stream_csv(headers, rows)
+    else:
+        content = stream_xlsx(title, headers, rows)
+    return StreamingResponse(
+        content,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f"attachment; filename={name}.{fmt.value}"}
+    )
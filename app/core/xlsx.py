@@ -0,0 +1,132 @@
+# app/core/xlsx.py
+# Geração de .xlsx em streaming: o arquivo é produzido em pedaços à medida que as
+# linhas chegam, sem montar a planilha (nem o arquivo inteiro) em memória.
+import enum
+import re
+import zipfile
+from datetime import date, datetime
+from io import RawIOBase
+from typing import Any, Iterable, Iterator, List
+from xml.sax.saxutils import escape
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CHUNK_SIZE = 64 * 1024 # Bytes acumulados antes de entregar um pedaço à resposta
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{title}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_END = '</sheetData></worksheet>'
+
+_ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_ILLEGAL_TITLE_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+class ChunkBuffer(RawIOBase):
+    """
+    Destino não posicionável para escritores de arquivo (zip, parquet): acumula os
+    bytes escritos até serem drenados para a resposta. tell() informa o total já escrito.
+    """
+    def __init__(self):
+        self._buffer = bytearray()
+        self._written = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._written += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._written
+
+    @property
+    def size(self) -> int:
+        """Bytes aguardando serem drenados."""
+        return len(self._buffer)
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+def _column_letter(index: int) -> str:
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+def _cell(reference: str, value: Any) -> str:
+    if isinstance(value, bool):
+        return f'<c r="{reference}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c r="{reference}"><v>{value}</v></c>'
+    if isinstance(value, enum.Enum):
+        value = value.value
+    elif isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    text = escape(_ILLEGAL_XML_CHARS.sub("", str(value)))
+    return f'<c r="{reference}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+def _row(number: int, values: Iterable[Any]) -> str:
+    cells = "".join(
+        _cell(f"{_column_letter(index)}{number}", value)
+        for index, value in enumerate(values) if value is not None
+    )
+    return f'<row r="{number}">{cells}</row>'
+
+def stream_xlsx(title: str, headers: List[str], rows: Iterable[Iterable[Any]]) -> Iterator[bytes]:
+    """
+    Gera um .xlsx com uma única planilha (`title`), cabeçalho e linhas, entregando
+    pedaços de até ~CHUNK_SIZE bytes conforme `rows` é consumido. Strings são gravadas
+    inline (sem tabela de strings compartilhadas), então a memória usada não cresce
+    com o número de linhas. Datas são gravadas como texto ISO.
+    """
+    title = _ILLEGAL_TITLE_CHARS.sub(" ", title)[:31] or "Planilha"
+    buffer = ChunkBuffer()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _ROOT_RELS)
+        archive.writestr("xl/workbook.xml", _WORKBOOK.format(title=escape(title, {'"': "&quot;"})))
+        archive.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(_SHEET_START.encode())
+            sheet.write(_row(1, headers).encode())
+            for number, values in enumerate(rows, start=2):
+                sheet.write(_row(number, values).encode())
+                if buffer.size >= CHUNK_SIZE:
+                    yield buffer.drain()
+            sheet.write(_SHEET_END.encode())
+    yield buffer.drain()
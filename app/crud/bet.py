@@ -1,13 +1,20 @@
 # app/crud/bet.py
-from typing import Optional, List
+from typing import Optional, List, Set, Tuple
 from datetime import datetime, timezone
 from sqlalchemy.orm import Session # Use Session do SQLAlchemy ORM
-from sqlalchemy import select # Use select do SQLAlchemy principal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Row, select, insert, update # Use select do SQLAlchemy principal
 from sqlalchemy import exc # Para lidar com exceções de banco de dados (opcional)
+from sqlalchemy.dialects import mysql, postgresql, sqlite
 
 from app.models.bet import Bet # Importe o modelo Bet
 from app.models.game import Game # Importe o modelo Game (necessário para a query)
-from app.schemas.bet import BetCreate # Importe o schema BetCreate
+from app.schemas.bet import BetCreate, BetRead # Importe os schemas
+from app.core.pagination import Keyset
+from app.core.serialization import schema_columns
+
+BETS_KEYSET = Keyset((Bet.id, False))
+BET_READ_COLUMNS = schema_columns(Bet, BetRead) # Leituras projetadas: linhas com as colunas de BetRead
 
 # Se você tiver um CRUD de usuário, pode importar a função de criação aqui, se necessário.
 # from app.crud.user import get_user_by_id # Exemplo
@@ -29,6 +36,111 @@ def create_bet(bet_create: BetCreate, user_id: int, db: Session) -> Bet:
     db.refresh(db_bet)
     return db_bet
 
+def create_bets_bulk(bets_create: List[BetCreate], user_id: int, db: Session) -> List[Bet]:
+    """
+    Cria várias apostas de um usuário com um único INSERT de múltiplas linhas e um
+    único commit (tudo ou nada). As apostas criadas são lidas de volta com um SELECT,
+    em vez de um refresh por aposta.
+    """
+    if not bets_create:
+        return []
+    now = datetime.now(timezone.utc)
+    db.execute(insert(Bet).values([
+        {
+            "user_id": user_id,
+            "game_id": bet.game_id,
+            "home_score_bet": bet.home_score_bet,
+            "away_score_bet": bet.away_score_bet,
+            "points_awarded": 0,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for bet in bets_create
+    ]))
+    db.commit()
+
+    game_ids = [bet.game_id for bet in bets_create]
+    statement = select(Bet).where(Bet.user_id == user_id, Bet.game_id.in_(game_ids)).order_by(Bet.id)
+    return db.execute(statement).scalars().all()
+
+def upsert_bets(bets_create: List[BetCreate], user_id: int, db: Session) -> List[Bet]:
+    """
+    "Salvar minha rodada": cria as apostas que não existem e atualiza os placares das
+    que já existem, em um único INSERT ... ON DUPLICATE KEY UPDATE (MySQL) /
+    ON CONFLICT DO UPDATE (SQLite/PostgreSQL) sobre a chave única (user_id, game_id);
+    nos demais bancos, trava as apostas existentes e faz um INSERT e um UPDATE em lote.
+    Envios repetidos ou simultâneos não geram duplicatas nem consultas extras.
+    A verificação de que os jogos ainda não começaram fica a cargo de quem chama.
+    """
+    if not bets_create:
+        return []
+    now = datetime.now(timezone.utc)
+    # Se o mesmo jogo vier repetido, vale o último placar enviado
+    rows = list({
+        bet.game_id: {
+            "user_id": user_id,
+            "game_id": bet.game_id,
+            "home_score_bet": bet.home_score_bet,
+            "away_score_bet": bet.away_score_bet,
+            "points_awarded": 0,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for bet in bets_create
+    }.values())
+    game_ids = [row["game_id"] for row in rows]
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        statement = mysql.insert(Bet).values(rows)
+        statement = statement.on_duplicate_key_update(
+            home_score_bet=statement.inserted.home_score_bet,
+            away_score_bet=statement.inserted.away_score_bet,
+            updated_at=statement.inserted.updated_at,
+        )
+    elif dialect in ("sqlite", "postgresql"):
+        statement = (sqlite if dialect == "sqlite" else postgresql).insert(Bet).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=["user_id", "game_id"],
+            set_={
+                "home_score_bet": statement.excluded.home_score_bet,
+                "away_score_bet": statement.excluded.away_score_bet,
+                "updated_at": statement.excluded.updated_at,
+            },
+        )
+    else:
+        statement = None
+    if statement is not None:
+        db.execute(statement)
+    else:
+        _upsert_bets_generic(rows, user_id, game_ids, db)
+    db.commit()
+
+    statement = select(Bet).where(Bet.user_id == user_id, Bet.game_id.in_(game_ids)).order_by(Bet.id)
+    return db.execute(statement).scalars().all()
+
+def _upsert_bets_generic(rows: List[dict], user_id: int, game_ids: List[int], db: Session) -> None:
+    # Sem upsert nativo: SELECT ... FOR UPDATE nas apostas que já existem, depois um INSERT
+    # em lote das novas e um UPDATE em lote (por id) das existentes. Se outro envio
+    # simultâneo criar a mesma aposta antes, a chave única (user_id, game_id) barra o INSERT.
+    existing = dict(db.execute(
+        select(Bet.game_id, Bet.id).where(Bet.user_id == user_id, Bet.game_id.in_(game_ids)).with_for_update()
+    ).all())
+    new_rows = [row for row in rows if row["game_id"] not in existing]
+    if new_rows:
+        db.execute(insert(Bet), new_rows)
+    changed_rows = [
+        {
+            "id": existing[row["game_id"]],
+            "home_score_bet": row["home_score_bet"],
+            "away_score_bet": row["away_score_bet"],
+            "updated_at": row["updated_at"],
+        }
+        for row in rows if row["game_id"] in existing
+    ]
+    if changed_rows:
+        db.execute(update(Bet), changed_rows)
+
 def get_bet_by_id(bet_id: int, db: Session) -> Optional[Bet]:
     """
     Busca uma aposta pelo seu ID.
@@ -42,26 +154,65 @@ def get_user_bet_for_game(user_id: int, game_id: int, db: Session) -> Optional[B
     statement = select(Bet).where(Bet.user_id == user_id, Bet.game_id == game_id)
     return db.execute(statement).scalars().first()
 
-def get_all_bets(db: Session) -> List[Bet]:
+def get_user_bet_game_ids(user_id: int, game_ids: List[int], db: Session) -> Set[int]:
+    """
+    Retorna, com uma única consulta, os jogos (dentre game_ids) em que o usuário já apostou.
+    """
+    statement = select(Bet.game_id).where(Bet.user_id == user_id, Bet.game_id.in_(game_ids))
+    return set(db.execute(statement).scalars().all())
+
+def get_user_bets(user_id: int, db: Session) -> List[Row]:
+    """
+    Retorna todas as apostas de um usuário.
+    """
+    return db.execute(select(*BET_READ_COLUMNS).where(Bet.user_id == user_id)).all()
+
+async def get_user_bets_async(user_id: int, db: AsyncSession) -> List[Row]:
+    """
+    Versão assíncrona de get_user_bets.
+    """
+    return (await db.execute(select(*BET_READ_COLUMNS).where(Bet.user_id == user_id))).all()
+
+async def get_user_bets_page_async(
+    user_id: int, limit: int, cursor: Optional[str], db: AsyncSession
+) -> Tuple[List[Row], Optional[str]]:
+    """
+    Página das apostas de um usuário por cursor (id). Retorna (apostas, cursor da próxima página).
+    """
+    statement = BETS_KEYSET.apply(select(*BET_READ_COLUMNS).where(Bet.user_id == user_id), cursor, limit)
+    bets = (await db.execute(statement)).all()
+    return BETS_KEYSET.page(bets, limit)
+
+def get_all_bets(db: Session) -> List[Row]:
     """
     Retorna todas as apostas no banco de dados (útil para admins).
     """
-    return db.execute(select(Bet)).scalars().all()
+    return db.execute(select(*BET_READ_COLUMNS)).all()
 
 # --------------------------------------------------
 # FUNÇÃO PARA A PÁGINA DE APOSTAS:
 # --------------------------------------------------
-def get_user_bets_by_round(user_id: int, round_number: int, db: Session) -> List[Bet]:
+def get_user_bets_by_round(user_id: int, round_number: int, db: Session) -> List[Row]:
     """
-    Busca todas as apostas feitas por um usuário para uma rodada específica.
+    Busca todas as apostas feitas por um usuário para uma rodada específica (colunas de BetRead).
     """
     # Usamos .join(Game) para poder filtrar e ordenar pela tabela de Game
-    statement = select(Bet).join(Game).where(
+    statement = select(*BET_READ_COLUMNS).join(Game, Game.id == Bet.game_id).where(
         Bet.user_id == user_id,
         Game.round_number == round_number
     ).order_by(Game.game_datetime) # Ordenar pela data/hora do jogo
 
-    return db.execute(statement).scalars().all()
+    return db.execute(statement).all()
+
+async def get_user_bets_by_round_async(user_id: int, round_number: int, db: AsyncSession) -> List[Row]:
+    """
+    Versão assíncrona de get_user_bets_by_round.
+    """
+    statement = select(*BET_READ_COLUMNS).join(Game, Game.id == Bet.game_id).where(
+        Bet.user_id == user_id,
+        Game.round_number == round_number
+    ).order_by(Game.game_datetime)
+    return (await db.execute(statement)).all()
 
 def update_bet_scores(bet_id: int, home_score_bet: int, away_score_bet: int, db: Session) -> Optional[Bet]:
     """
@@ -0,0 +1,106 @@
+# app/crud/data_version.py
+from typing import Dict, Iterable, Optional, Tuple
+from datetime import datetime, timezone
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+from app.core.cache import TTLCache, response_cache
+from app.core.config import settings
+from app.core.database import run_after_commit
+from app.models.data_version import DataVersion
+
+GAMES_SCOPE = "games"
+RANKING_SCOPE = "ranking"
+
+def round_scope(round_number: int) -> str:
+    return f"games:round:{round_number}"
+
+# Versões lidas recentemente (por worker). Dentro do TTL, uma requisição condicional é
+# respondida sem acessar o banco; o worker que altera os dados descarta a entrada no commit.
+version_cache = TTLCache(maxsize=1024, ttl=settings.DATA_VERSION_CACHE_SECONDS)
+
+def bump_data_versions(db: Session, scopes: Iterable[str]) -> Dict[str, int]:
+    """
+    Incrementa a versão dos escopos informados com um único INSERT ... ON DUPLICATE KEY
+    UPDATE / ON CONFLICT, na transação corrente (vale a partir do commit de quem chama);
+    nos demais bancos, com um UPDATE dos escopos existentes e um INSERT dos que faltam.
+    Retorna as novas versões ({escopo: versão}); as linhas ficam bloqueadas por esta
+    transação até o commit, então ninguém mais as altera nesse meio-tempo.
+    """
+    scopes = sorted(set(scopes)) # Ordem fixa: evita deadlock entre transações concorrentes
+    if not scopes:
+        return {}
+    now = datetime.now(timezone.utc)
+    rows = [{"scope": scope, "version": 1, "updated_at": now} for scope in scopes]
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        statement = mysql.insert(DataVersion).values(rows)
+        statement = statement.on_duplicate_key_update(
+            version=DataVersion.version + 1, updated_at=statement.inserted.updated_at
+        )
+    elif dialect in ("sqlite", "postgresql"):
+        statement = (sqlite if dialect == "sqlite" else postgresql).insert(DataVersion).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=["scope"],
+            set_={"version": DataVersion.version + 1, "updated_at": statement.excluded.updated_at},
+        )
+    else:
+        statement = None
+    if statement is not None:
+        db.execute(statement)
+    else:
+        _bump_generic(db, scopes, now)
+    run_after_commit(db, lambda: _invalidate(scopes))
+    return dict(db.execute(select(DataVersion.scope, DataVersion.version).where(DataVersion.scope.in_(scopes))).all())
+
+def _bump_generic(db: Session, scopes, now: datetime) -> None:
+    # Sem upsert nativo: o UPDATE já bloqueia as linhas existentes; os escopos que ainda
+    # não têm linha entram com a versão 1 (um INSERT simultâneo do mesmo escopo é barrado
+    # pela chave primária).
+    db.execute(
+        update(DataVersion).where(DataVersion.scope.in_(scopes))
+        .values(version=DataVersion.version + 1, updated_at=now)
+    )
+    existing = set(db.execute(select(DataVersion.scope).where(DataVersion.scope.in_(scopes))).scalars())
+    missing = [{"scope": scope, "version": 1, "updated_at": now} for scope in scopes if scope not in existing]
+    if missing:
+        db.execute(insert(DataVersion), missing)
+
+def _invalidate(scopes) -> None:
+    # Neste worker a nova versão vale já na próxima requisição; o cache de respostas
+    # é limpo explicitamente (no backend "file", para todos os workers da máquina).
+    for scope in scopes:
+        version_cache.delete(scope)
+        response_cache.invalidate(scope)
+
+def _cache_key(scope: str, db) -> str:
+    # Versões lidas de uma réplica ficam separadas: com atraso de replicação elas podem
+    # estar atrás do principal e não devem valer para leituras no principal. Não são
+    # descartadas no commit (expiram pelo TTL), já que a réplica demora a ver a escrita.
+    return f"{scope}@replica" if db.info.get("replica") else scope
+
+def get_data_version(scope: str, db: Session) -> Tuple[int, Optional[datetime]]:
+    """
+    (versão, última alteração) do escopo; (0, None) se nunca foi alterado.
+    Usa o cache por até DATA_VERSION_CACHE_SECONDS antes de consultar o banco.
+    """
+    key = _cache_key(scope, db)
+    cached = version_cache.get(key)
+    if cached is not None:
+        return cached
+    row = db.execute(select(DataVersion.version, DataVersion.updated_at).where(DataVersion.scope == scope)).first()
+    value = (row.version, row.updated_at) if row else (0, None)
+    version_cache.set(key, value)
+    return value
+
+async def get_data_version_async(scope: str, db: AsyncSession) -> Tuple[int, Optional[datetime]]:
+    """
+    Versão assíncrona de get_data_version (o banco só é acessado se o cache expirou).
+    """
+    cached = version_cache.get(_cache_key(scope, db))
+    if cached is not None:
+        return cached
+    return await db.run_sync(lambda session: get_data_version(scope, session))
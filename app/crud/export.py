@@ -0,0 +1,82 @@
+# app/crud/export.py
+from typing import Iterator, List, Tuple
+from sqlalchemy import select, null
+from sqlalchemy.sql import Select
+
+from app.core.database import SessionLocal
+from app.models.game import Game
+from app.models.bet import Bet
+from app.models.user import User
+from app.models.leaderboard import UserRank
+
+EXPORT_BATCH_SIZE = 1000 # Linhas buscadas por vez do cursor no servidor
+
+Export = Tuple[List[str], Select] # (cabeçalho, consulta)
+
+def stream_rows(statement: Select) -> Iterator[tuple]:
+    """
+    Executa a consulta em uma sessão própria, com cursor no servidor (yield_per), e
+    gera as linhas sob demanda. A sessão fica aberta enquanto a resposta é enviada,
+    independente da sessão da requisição (já encerrada quando o streaming começa).
+    """
+    with SessionLocal() as db:
+        for row in db.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE)):
+            yield tuple(row)
+
+def column_types(statement: Select) -> List[type]:
+    """Tipos Python das colunas da consulta (usados no schema do Parquet)."""
+    types = []
+    for column in statement.selected_columns:
+        try:
+            types.append(column.type.python_type)
+        except NotImplementedError: # Colunas sem tipo, ex: null()
+            types.append(str)
+    return types
+
+def results_template_export(round_number: int) -> Export:
+    """Jogos de uma rodada com colunas vazias para preencher os placares."""
+    headers = ["id_jogo", "rodada", "mandante", "visitante", "data_hora", "placar_mandante", "placar_visitante"]
+    statement = (
+        select(Game.id, Game.round_number, Game.home_team, Game.away_team, Game.game_datetime, null(), null())
+        .where(Game.round_number == round_number)
+        .order_by(Game.game_datetime)
+    )
+    return headers, statement
+
+def round_bets_export(round_number: int) -> Export:
+    """Todas as apostas de uma rodada."""
+    headers = ["id_jogo", "mandante", "visitante", "data_hora", "placar_mandante", "placar_visitante",
+               "usuario", "aposta_mandante", "aposta_visitante", "acertou", "pontos"]
+    statement = (
+        select(Game.id, Game.home_team, Game.away_team, Game.game_datetime, Game.home_score, Game.away_score,
+               User.username, Bet.home_score_bet, Bet.away_score_bet, Bet.is_correct, Bet.points_awarded)
+        .join(Game, Game.id == Bet.game_id)
+        .join(User, User.id == Bet.user_id)
+        .where(Game.round_number == round_number)
+        .order_by(Game.game_datetime, Game.id, User.username)
+    )
+    return headers, statement
+
+def standings_export() -> Export:
+    """Classificação geral de todos os usuários (tabela de ranking materializada)."""
+    headers = ["posicao", "rank", "usuario", "pontos"]
+    statement = (
+        select(UserRank.position, UserRank.rank, User.username, UserRank.points)
+        .join(User, User.id == UserRank.user_id)
+        .order_by(UserRank.position)
+    )
+    return headers, statement
+
+def season_history_export() -> Export:
+    """Histórico da temporada: cada aposta de cada jogo, rodada a rodada."""
+    headers = ["rodada", "id_jogo", "mandante", "visitante", "data_hora", "status", "placar_mandante",
+               "placar_visitante", "usuario", "aposta_mandante", "aposta_visitante", "acertou", "pontos"]
+    statement = (
+        select(Game.round_number, Game.id, Game.home_team, Game.away_team, Game.game_datetime, Game.status,
+               Game.home_score, Game.away_score, User.username, Bet.home_score_bet, Bet.away_score_bet,
+               Bet.is_correct, Bet.points_awarded)
+        .join(Game, Game.id == Bet.game_id)
+        .join(User, User.id == Bet.user_id)
+        .order_by(Game.round_number, Game.game_datetime, Game.id, User.username)
+    )
+    return headers, statement
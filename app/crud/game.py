@@ -1,13 +1,25 @@
 # app/crud/game.py
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timezone # Adicione datetime e timezone
 from sqlalchemy.orm import Session # <<< MUDANÇA: Use Session do SQLAlchemy ORM
-from sqlalchemy import select, desc, delete # <<< MUDANÇA: Use select, desc, delete do SQLAlchemy principal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Row, select, desc, delete, insert, update, case, func, tuple_ # <<< MUDANÇA: Use select, desc, delete do SQLAlchemy principal
 
 from app.models.game import Game, GameStatus # Importe o modelo Game
 from app.models.bet import Bet # Importe o modelo Bet
 from app.models.user import User # Importe o modelo User
-from app.schemas.game import GameCreate, GameUpdateResult # Importe os schemas
+from app.schemas.game import GameCreate, GameRead, GameUpdateResult # Importe os schemas
+from app.crud.scoring import score_games
+from app.crud.data_version import GAMES_SCOPE, bump_data_versions, round_scope
+from app.core.pagination import Keyset
+from app.core.serialization import schema_columns
+from app.core.metrics import timed
+
+# Ordem das listagens de jogos, usada também como chave do cursor de paginação
+GAMES_KEYSET = Keyset((Game.round_number, False), (Game.game_datetime, False), (Game.id, False))
+# Colunas de GameRead: as leituras projetam só essas colunas e retornam linhas (tuplas
+# com acesso por atributo) em vez de objetos do ORM, prontas para o caminho rápido de serialização
+GAME_READ_COLUMNS = schema_columns(Game, GameRead)
 
 def create_game(game_create: GameCreate, db: Session) -> Game:
     """
@@ -16,22 +28,56 @@ def create_game(game_create: GameCreate, db: Session) -> Game:
     # Use model_dump() para Pydantic v2 para converter o schema em dict
     game = Game(**game_create.model_dump())
     db.add(game)
+    bump_data_versions(db, [GAMES_SCOPE, round_scope(game.round_number)])
     db.commit()
     db.refresh(game) # Refresha o objeto para ter o ID gerado pelo DB
     return game
 
+def create_games_bulk(games_create: List[GameCreate], db: Session) -> List[Game]:
+    """
+    Cria vários jogos (ex: importação da temporada) com um único INSERT de múltiplas
+    linhas e um único commit. Os jogos criados são lidos de volta com um SELECT.
+    """
+    if not games_create:
+        return []
+    now = datetime.now(timezone.utc)
+    rows = [
+        {**game.model_dump(), "status": GameStatus.SCHEDULED, "created_at": now, "updated_at": now}
+        for game in games_create
+    ]
+    # MySQL não tem INSERT ... RETURNING: os ids novos são os maiores que o último existente
+    last_id = db.execute(select(func.max(Game.id))).scalar() or 0
+    db.execute(insert(Game).values(rows))
+    bump_data_versions(db, [GAMES_SCOPE] + [round_scope(row["round_number"]) for row in rows])
+    db.commit()
+
+    keys = [(row["round_number"], row["home_team"], row["away_team"], row["game_datetime"]) for row in rows]
+    statement = (
+        select(Game)
+        .where(Game.id > last_id, tuple_(Game.round_number, Game.home_team, Game.away_team, Game.game_datetime).in_(keys))
+        .order_by(Game.id)
+    )
+    return db.execute(statement).scalars().all()
+
 def get_game_by_id(game_id: int, db: Session) -> Optional[Game]:
     """
     Busca um jogo pelo seu ID.
     """
     return db.get(Game, game_id)
 
-def get_games_by_round(round_number: int, db: Session) -> List[Game]:
+def get_games_by_round(round_number: int, db: Session) -> List[Row]:
     """
-    Busca todos os jogos de uma rodada específica.
+    Busca todos os jogos de uma rodada específica (colunas de GameRead).
     """
-    statement = select(Game).where(Game.round_number == round_number).order_by(Game.game_datetime)
-    return db.execute(statement).scalars().all()
+    statement = select(*GAME_READ_COLUMNS).where(Game.round_number == round_number).order_by(Game.game_datetime)
+    return db.execute(statement).all()
+
+async def get_games_by_round_async(round_number: int, db: AsyncSession) -> List[Row]:
+    """
+    Versão assíncrona de get_games_by_round.
+    """
+    statement = select(*GAME_READ_COLUMNS).where(Game.round_number == round_number).order_by(Game.game_datetime)
+    return (await db.execute(statement)).all()
 
 def update_game_result(game_id: int, game_update: GameUpdateResult, db: Session) -> Optional[Game]:
     """
@@ -45,39 +91,120 @@ def update_game_result(game_id: int, game_update: GameUpdateResult, db: Session)
     
     # Pre-check original status to see if it's changing to FINISHED
     original_status = game.status
+    original_round = game.round_number
 
     for key, value in update_data.items():
         setattr(game, key, value)
     
     game.updated_at = datetime.now(timezone.utc)
     db.add(game)
-    db.commit() # Comita as mudanças no jogo
-    db.refresh(game) # Refresha o objeto Game
+    db.flush() # Envia o novo placar/status para o banco, ainda na mesma transação
 
-    # <<< MUDANÇA AQUI: Removido 'GameStatus.COMPLETED' da condição
-    # A lógica deve ser: se o jogo foi finalizado E o status MUDOU para finalizado
-    if (game.status == GameStatus.FINISHED) and \
-       (original_status != GameStatus.FINISHED): # Apenas verifica se o status original NÃO era FINISHED
-        print(f"Jogo {game.id} finalizado. Calculando e distribuindo pontos...")
-        calculate_and_award_points(game, db) # CHAMA A FUNÇÃO AQUI
-        print("Pontos distribuídos com sucesso para o jogo.")
-    
+    # Jogo finalizado agora, placar corrigido de jogo já finalizado, ou jogo que deixou
+    # de estar finalizado: a pontuação é sincronizada por diferença (idempotente).
+    if GameStatus.FINISHED in (original_status, game.status):
+        print(f"Jogo {game.id}: sincronizando pontuação das apostas...")
+        score_games([game.id], db, commit=False)
+
+    bump_data_versions(db, [GAMES_SCOPE, round_scope(original_round), round_scope(game.round_number)])
+    db.commit() # Jogo, apostas e pontos dos usuários em uma única transação
+    db.refresh(game) # Refresha o objeto Game
     return game
 
-def get_all_games(db: Session) -> List[Game]:
+def update_game_results_bulk(results: Dict[int, Tuple[int, int]], db: Session) -> Optional[List[Game]]:
     """
-    Retorna todos os jogos no banco de dados.
+    Grava os placares de vários jogos ({game_id: (mandante, visitante)}) e os finaliza
+    em um único UPDATE ... CASE, pontua todas as apostas desses jogos em um único passo
+    set-based (score_games) e faz um único commit: tudo ou nada.
+    Retorna None (sem alterar nada) se algum dos jogos não existir.
+    A duração de cada etapa vai para as métricas da requisição (Server-Timing e /metrics).
     """
-    statement = select(Game).order_by(Game.round_number, Game.game_datetime)
-    return db.execute(statement).scalars().all()
+    if not results:
+        return []
+    game_ids = list(results)
+    now = datetime.now(timezone.utc)
+
+    try:
+        with timed("results_update"):
+            updated = db.execute(
+                update(Game)
+                .where(Game.id.in_(game_ids))
+                .values(
+                    home_score=case({game_id: score[0] for game_id, score in results.items()}, value=Game.id),
+                    away_score=case({game_id: score[1] for game_id, score in results.items()}, value=Game.id),
+                    status=GameStatus.FINISHED,
+                    updated_at=now
+                )
+                .execution_options(synchronize_session=False)
+            ).rowcount
+        if updated != len(game_ids):
+            db.rollback()
+            return None
+
+        with timed("results_scoring"):
+            score_games(game_ids, db, commit=False)
+
+        rounds = db.execute(select(Game.round_number).where(Game.id.in_(game_ids)).distinct()).scalars().all()
+        bump_data_versions(db, [GAMES_SCOPE] + [round_scope(round_number) for round_number in rounds])
 
-def get_all_games_for_user(db: Session) -> List[Game]:
+        with timed("results_commit"):
+            db.commit() # Jogos, apostas, pontos e rankings em uma única transação
+    except Exception:
+        db.rollback()
+        raise
+
+    with timed("results_reload"):
+        return db.execute(select(Game).where(Game.id.in_(game_ids)).order_by(Game.game_datetime)).scalars().all()
+
+def get_all_games(db: Session) -> List[Row]:
+    """
+    Retorna todos os jogos no banco de dados (colunas de GameRead).
+    """
+    statement = select(*GAME_READ_COLUMNS).order_by(Game.round_number, Game.game_datetime)
+    return db.execute(statement).all()
+
+def get_all_games_for_user(db: Session) -> List[Row]:
     """
     Retorna todos os jogos visíveis para usuários comuns (agendados, finalizados, adiados).
     Exclui jogos cancelados.
     """
-    statement = select(Game).where(Game.status != GameStatus.CANCELED).order_by(Game.round_number, Game.game_datetime)
-    return db.execute(statement).scalars().all()
+    statement = (
+        select(*GAME_READ_COLUMNS)
+        .where(Game.status != GameStatus.CANCELED)
+        .order_by(Game.round_number, Game.game_datetime)
+    )
+    return db.execute(statement).all()
+
+async def get_all_games_async(db: AsyncSession) -> List[Row]:
+    """
+    Versão assíncrona de get_all_games.
+    """
+    statement = select(*GAME_READ_COLUMNS).order_by(Game.round_number, Game.game_datetime)
+    return (await db.execute(statement)).all()
+
+async def get_all_games_for_user_async(db: AsyncSession) -> List[Row]:
+    """
+    Versão assíncrona de get_all_games_for_user.
+    """
+    statement = (
+        select(*GAME_READ_COLUMNS)
+        .where(Game.status != GameStatus.CANCELED)
+        .order_by(Game.round_number, Game.game_datetime)
+    )
+    return (await db.execute(statement)).all()
+
+async def get_games_page_async(
+    db: AsyncSession, limit: int, cursor: Optional[str] = None, include_canceled: bool = True
+) -> Tuple[List[Row], Optional[str]]:
+    """
+    Página de jogos por cursor (rodada, data/hora, id). Retorna (jogos, cursor da próxima página).
+    Usuários comuns não veem jogos cancelados (include_canceled=False).
+    """
+    statement = select(*GAME_READ_COLUMNS)
+    if not include_canceled:
+        statement = statement.where(Game.status != GameStatus.CANCELED)
+    games = (await db.execute(GAMES_KEYSET.apply(statement, cursor, limit))).all()
+    return GAMES_KEYSET.page(games, limit)
 
 def delete_game_by_id(game_id: int, db: Session) -> bool:
     """
@@ -87,6 +214,7 @@ def delete_game_by_id(game_id: int, db: Session) -> bool:
     game = db.get(Game, game_id)
     if game:
         db.delete(game)
+        bump_data_versions(db, [GAMES_SCOPE, round_scope(game.round_number)])
         db.commit()
         return True
     return False
@@ -99,6 +227,8 @@ def delete_games_by_round(round_number: int, db: Session) -> int:
     statement = delete(Game).where(Game.round_number == round_number)
     
     result = db.execute(statement) # Execute a declaração de delete
+    if result.rowcount:
+        bump_data_versions(db, [GAMES_SCOPE, round_scope(round_number)])
     db.commit()
 
     return result.rowcount # Retorne o número de linhas afetadas
@@ -111,41 +241,11 @@ def calculate_and_award_points(game: Game, db: Session):
     """
     Calcula os pontos para todas as apostas de um jogo finalizado
     e atualiza a tabela de apostas e os pontos dos usuários.
-    Regra: 1 ponto por placar exato.
+    Pode ser chamada novamente sem duplicar pontos (ver app/crud/scoring.py).
     """
-    # <<< MUDANÇA AQUI: Removido 'GameStatus.COMPLETED' da condição
     if game.status != GameStatus.FINISHED:
         # Apenas jogos com status FINISHED devem ter pontos calculados
         return
 
-    bets_for_game = db.execute(
-        select(Bet).where(Bet.game_id == game.id)
-    ).scalars().all()
-
-    for bet in bets_for_game:
-        is_correct = False
-        points_awarded = 0
-
-        # Regra de Pontuação: APENAS 1 ponto por Placar Exato
-        if (game.home_score is not None and game.away_score is not None and
-            bet.home_score_bet == game.home_score and bet.away_score_bet == game.away_score):
-            is_correct = True
-            points_awarded = 1 # Apenas 1 ponto por placar exato
-        
-        # Se não for placar exato, is_correct permanece False e points_awarded permanece 0.
-
-        # Atualizar a aposta
-        bet.is_correct = is_correct
-        bet.points_awarded = points_awarded
-        bet.updated_at = datetime.now(timezone.utc)
-        db.add(bet)
-
-        # Atualizar os pontos do usuário (se ganhou pontos)
-        if points_awarded > 0:
-            user = db.get(User, bet.user_id)
-            if user:
-                user.points += points_awarded
-                user.updated_at = datetime.now(timezone.utc)
-                db.add(user) # Adiciona o usuário atualizado à sessão
-
-    db.commit() # Comita todas as atualizações de aposta e usuário
\ No newline at end of file
+    # Pontuação em lote e por diferença: dois UPDATEs set-based
+    score_games([game.id], db)
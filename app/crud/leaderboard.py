@@ -0,0 +1,348 @@
+# app/crud/leaderboard.py
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timezone
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, delete, update, func, literal, distinct, event, DateTime
+
+from app.crud.data_version import RANKING_SCOPE, get_data_version
+from app.models.user import User
+from app.models.leaderboard import UserRank
+from app.schemas.leaderboard import RankingEntry
+
+# --------------------------------------------------
+# Índice de ranking em memória (por worker)
+# --------------------------------------------------
+class LeaderboardIndex:
+    """
+    Ranking ordenado em memória. Mantém:
+    - _keys: lista ordenada de (-pontos, user_id) -> posição em O(log n) via bisect;
+    - _scores: lista ordenada dos valores distintos de -pontos -> rank denso em O(log n).
+    É carregado a partir da tabela user_rank (já ordenada) e atualizado
+    incrementalmente: pelas diferenças de pontos das escritas deste worker e, nas dos
+    demais, pelas linhas de user_rank alteradas desde a versão carregada.
+    `version` é a versão do escopo de ranking (a mesma do ETag das rotas) que o
+    conteúdo reflete; None = recarregar na próxima leitura.
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._keys: List[tuple] = []
+        self._points: Dict[int, int] = {}
+        self._names: Dict[int, str] = {}
+        self._scores: List[int] = []
+        self._score_counts: Dict[int, int] = {}
+        self.version: Optional[int] = None
+
+    def load(self, rows, version: Optional[int] = None) -> None:
+        """Carrega (user_id, username, points) já ordenados por pontos desc, id."""
+        with self._lock:
+            self._keys, self._points, self._names = [], {}, {}
+            self._scores, self._score_counts = [], {}
+            for user_id, username, points in rows:
+                self._keys.append((-points, user_id))
+                self._points[user_id] = points
+                self._names[user_id] = username
+                self._add_score(points)
+            self._keys.sort() # Já vem ordenado do banco: custo linear
+            self.version = version
+
+    def _add_score(self, points: int) -> None:
+        if points not in self._score_counts:
+            insort(self._scores, -points)
+            self._score_counts[points] = 0
+        self._score_counts[points] += 1
+
+    def _remove_score(self, points: int) -> None:
+        self._score_counts[points] -= 1
+        if not self._score_counts[points]:
+            del self._score_counts[points]
+            del self._scores[bisect_left(self._scores, -points)]
+
+    def _set_points(self, user_id: int, points: int) -> None:
+        old = self._points.get(user_id)
+        if old == points:
+            return
+        if old is not None:
+            del self._keys[bisect_left(self._keys, (-old, user_id))]
+            self._remove_score(old)
+        self._points[user_id] = points
+        insort(self._keys, (-points, user_id))
+        self._add_score(points)
+
+    def merge(self, rows, version: int) -> None:
+        """
+        Aplica linhas (user_id, username, points) alteradas em outro worker, com os
+        valores atuais (não diferenças): reaplicar uma linha não muda nada.
+        """
+        with self._lock:
+            if self.version is None:
+                return # Será recarregado por inteiro
+            for user_id, username, points in rows:
+                self._names[user_id] = username
+                self._set_points(user_id, points)
+            self.version = max(self.version, version)
+
+    def apply(self, deltas: Dict[int, int], names: Optional[Dict[int, str]], version: Optional[int]) -> bool:
+        """
+        Aplica diferenças de pontos (e nomes novos/alterados) sem recarregar o ranking,
+        se o índice estiver exatamente na versão anterior a `version`. Caso contrário
+        (outra alteração no meio, ou várias nesta transação), marca para recarregar.
+        """
+        with self._lock:
+            if version is None or self.version != version - 1:
+                self.version = None
+                return False
+            for user_id, username in (names or {}).items():
+                self._names[user_id] = username
+            for user_id, delta in deltas.items():
+                self._set_points(user_id, self._points.get(user_id, 0) + delta)
+            self.version = version
+            return True
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _entry(self, index: int) -> RankingEntry:
+        neg_points, user_id = self._keys[index]
+        return RankingEntry(
+            position=index + 1,
+            rank=bisect_left(self._scores, neg_points) + 1,
+            user_id=user_id,
+            username=self._names.get(user_id, ""),
+            points=-neg_points,
+        )
+
+    def slice(self, offset: int, limit: int) -> List[RankingEntry]:
+        with self._lock:
+            return [self._entry(i) for i in range(offset, min(offset + limit, len(self._keys)))]
+
+    def page(self, offset: int, limit: int) -> Tuple[List[RankingEntry], int]:
+        """Linhas [offset, offset + limit) e o total de usuários, do mesmo estado do índice."""
+        with self._lock:
+            return self.slice(offset, limit), len(self._keys)
+
+    def position_of(self, user_id: int) -> Optional[int]:
+        """Posição (0-based) do usuário, em O(log n)."""
+        with self._lock:
+            points = self._points.get(user_id)
+            if points is None:
+                return None
+            return bisect_left(self._keys, (-points, user_id))
+
+    def dense_rank(self, points: int) -> int:
+        """Rank denso para uma pontuação, em O(log n)."""
+        with self._lock:
+            return bisect_left(self._scores, -points) + 1
+
+    def around(self, user_id: int, neighbours: int) -> Optional[tuple]:
+        with self._lock:
+            index = self.position_of(user_id)
+            if index is None:
+                return None
+            start = max(index - neighbours, 0)
+            entries = self.slice(start, index - start + neighbours + 1)
+            me = entries[index - start]
+            return me, [entry for entry in entries if entry.user_id != user_id]
+
+leaderboard = LeaderboardIndex()
+
+# --------------------------------------------------
+# Tabela de ranking persistida
+# --------------------------------------------------
+def _pending(db: Session) -> dict:
+    """Alterações do ranking aguardando o commit da sessão."""
+    return db.info.setdefault("leaderboard", {"deltas": {}, "names": {}, "version": None, "reload": False})
+
+RANK_COLUMNS = ["user_id", "points", "rank", "position", "updated_at", "version"]
+
+def rebuild_leaderboard(db: Session, commit: bool = True, version: int = 0) -> None:
+    """
+    Reconstrói a tabela user_rank (rank denso e posição) com um único INSERT ... SELECT
+    usando funções de janela. O(usuários): usado pelo recálculo da temporada; a pontuação
+    de jogos usa update_leaderboard. `version`: nova versão do escopo de ranking.
+    """
+    ranked = select(
+        User.id,
+        User.points,
+        func.dense_rank().over(order_by=User.points.desc()),
+        func.row_number().over(order_by=(User.points.desc(), User.id)),
+        literal(datetime.now(timezone.utc), DateTime(timezone=True)),
+        literal(version),
+    )
+    db.execute(delete(UserRank))
+    db.execute(insert(UserRank).from_select(RANK_COLUMNS, ranked))
+    if commit:
+        db.commit()
+
+def update_leaderboard(deltas: Dict[int, int], version: int, db: Session) -> None:
+    """
+    Atualiza user_rank após a pontuação ({user_id: diferença de pontos}, com User.points
+    já atualizado na transação) sem reconstruí-la. Só mudam de lugar as linhas com pontos
+    entre o menor e o maior valor (antes e depois) dos usuários alterados: essa faixa é
+    regravada a partir da sua primeira posição e do seu primeiro rank. Acima dela nada muda;
+    abaixo, só o rank, e apenas se o número de pontuações distintas na faixa mudou.
+    Quem chama já deve ter bloqueado a versão do ranking (bump_data_versions), que é
+    a `version` gravada nas linhas regravadas: duas atualizações não se cruzam.
+    """
+    if not deltas:
+        return
+    user_ids = list(deltas)
+    old_points = dict(db.execute(
+        select(UserRank.user_id, UserRank.points).where(UserRank.user_id.in_(user_ids)).with_for_update()
+    ).all())
+    new_points = dict(db.execute(select(User.id, User.points).where(User.id.in_(user_ids))).all())
+    points = list(old_points.values()) + list(new_points.values())
+    low, high = min(points), max(points)
+
+    block = db.execute(
+        select(UserRank.position, UserRank.rank, UserRank.points)
+        .where(UserRank.points.between(low, high))
+        .with_for_update()
+    ).all()
+    users_in_block = db.execute(select(func.count()).where(User.points.between(low, high))).scalar()
+    if len(old_points) != len(user_ids) or len(block) != users_in_block:
+        print("AVISO: user_rank fora de sincronia com os pontos dos usuários; reconstruindo.")
+        rebuild_leaderboard(db, commit=False, version=version)
+        return
+
+    first_position = min(row.position for row in block)
+    first_rank = min(row.rank for row in block)
+    ranked = select(
+        User.id,
+        User.points,
+        func.dense_rank().over(order_by=User.points.desc()) + (first_rank - 1),
+        func.row_number().over(order_by=(User.points.desc(), User.id)) + (first_position - 1),
+        literal(datetime.now(timezone.utc), DateTime(timezone=True)),
+        literal(version),
+    ).where(User.points.between(low, high))
+    db.execute(delete(UserRank).where(UserRank.points.between(low, high)))
+    db.execute(insert(UserRank).from_select(RANK_COLUMNS, ranked))
+
+    shift = db.execute(
+        select(func.count(distinct(UserRank.points))).where(UserRank.points.between(low, high))
+    ).scalar() - len({row.points for row in block})
+    if shift:
+        db.execute(
+            update(UserRank).where(UserRank.points < low).values(rank=UserRank.rank + shift)
+            .execution_options(synchronize_session=False)
+        )
+
+def add_user_to_leaderboard(user_id: int, version: int, db: Session) -> None:
+    """
+    Inclui um usuário recém-cadastrado no fim da tabela user_rank, sem reconstruí-la.
+    Com 0 pontos e o maior id, ele é sempre o último na ordem (pontos desc, id).
+    A última linha é lida com FOR UPDATE: cadastros simultâneos esperam apenas um pelo
+    outro nesse ponto (sem disputar a chave única de position) até o commit.
+    """
+    last = db.execute(
+        select(UserRank.position, UserRank.points, UserRank.rank)
+        .order_by(UserRank.position.desc())
+        .limit(1)
+        .with_for_update()
+    ).first()
+    if last is None:
+        position, rank = 1, 1
+    else:
+        position = last.position + 1
+        rank = last.rank if last.points == 0 else last.rank + 1 # Empatado com quem também tem 0 pontos
+    db.execute(insert(UserRank).values(
+        user_id=user_id, points=0, rank=rank, position=position, updated_at=datetime.now(timezone.utc), version=version
+    ))
+
+def mark_leaderboard_user_changed(user_id: int, version: int, db: Session) -> None:
+    """Marca a linha do usuário como alterada em `version` (ex: novo nome exibido)."""
+    db.execute(
+        update(UserRank).where(UserRank.user_id == user_id).values(version=version)
+        .execution_options(synchronize_session=False)
+    )
+
+def record_leaderboard_changes(
+    db: Session, deltas: Dict[int, int], names: Optional[Dict[int, str]] = None, version: Optional[int] = None
+) -> None:
+    """
+    Registra diferenças de pontos a aplicar no índice em memória quando a sessão fizer
+    commit. `version` é a nova versão do escopo de ranking (retorno de bump_data_versions);
+    sem ela o índice deste worker é recarregado na próxima leitura.
+    """
+    pending = _pending(db)
+    for user_id, delta in deltas.items():
+        pending["deltas"][user_id] = pending["deltas"].get(user_id, 0) + delta
+    pending["names"].update(names or {})
+    pending["version"] = version
+
+def invalidate_leaderboard(db: Session) -> None:
+    """Força o recarregamento do índice em memória após o commit (ex: recálculo da temporada)."""
+    _pending(db)["reload"] = True
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_changes(session: Session) -> None:
+    pending = session.info.pop("leaderboard", None)
+    if not pending:
+        return
+    if pending["reload"]:
+        leaderboard.version = None # Mudança ampla (ex: recálculo da temporada): recarrega na próxima leitura
+    else:
+        leaderboard.apply(pending["deltas"], pending["names"], pending["version"])
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_changes(session: Session) -> None:
+    session.info.pop("leaderboard", None)
+
+# --------------------------------------------------
+# Leitura do ranking
+# --------------------------------------------------
+def get_leaderboard_rows(db: Session, since: Optional[int] = None) -> list:
+    """
+    (user_id, username, points) de user_rank: todas, na ordem do ranking, ou só as
+    alteradas depois da versão `since` (cadastros, nomes e a faixa regravada pela pontuação).
+    """
+    statement = select(UserRank.user_id, User.username, UserRank.points).join(User, User.id == UserRank.user_id)
+    if since is None:
+        return db.execute(statement.order_by(UserRank.position)).all()
+    return db.execute(statement.where(UserRank.version > since)).all()
+
+def get_leaderboard(db: Session) -> LeaderboardIndex:
+    """
+    Retorna o índice em memória, atualizado quando a versão do escopo de ranking é mais
+    nova que a carregada (alteração feita por outro worker): só as linhas de user_rank
+    alteradas desde então são lidas; o índice inteiro só na primeira leitura ou após uma
+    mudança ampla (recálculo da temporada).
+    A versão vem do mesmo cache do ETag das rotas, então o corpo nunca é mais antigo que
+    o ETag. Uma versão mais antiga (réplica atrasada) não faz o índice voltar no tempo.
+    Somente leitura: a tabela user_rank é mantida pelas escritas e pelas migrações.
+    """
+    version, _ = get_data_version(RANKING_SCOPE, db)
+    loaded = leaderboard.version
+    # Versão lida antes das linhas: o conteúdo é da versão lida ou mais novo
+    if loaded is None:
+        leaderboard.load(get_leaderboard_rows(db), version=version)
+    elif version > loaded:
+        leaderboard.merge(get_leaderboard_rows(db, since=loaded), version)
+    return leaderboard
+
+def get_ranking_top(limit: int, db: Session) -> List[RankingEntry]:
+    """Os `limit` primeiros colocados."""
+    return get_leaderboard(db).slice(0, limit)
+
+def get_ranking_page(page: int, size: int, db: Session) -> Tuple[List[RankingEntry], int]:
+    """Página `page` (1-based) do ranking, com `size` linhas, e o total de usuários."""
+    return get_leaderboard(db).page((page - 1) * size, size)
+
+def get_user_rank(user_id: int, neighbours: int, db: Session) -> Optional[tuple]:
+    """Posição do usuário e os `neighbours` vizinhos acima e abaixo dele."""
+    return get_leaderboard(db).around(user_id, neighbours)
+
+async def get_leaderboard_async(db: AsyncSession) -> LeaderboardIndex:
+    """Versão assíncrona de get_leaderboard (a verificação de versão usa a AsyncSession)."""
+    return await db.run_sync(get_leaderboard)
+
+async def get_ranking_top_async(limit: int, db: AsyncSession) -> List[RankingEntry]:
+    return (await get_leaderboard_async(db)).slice(0, limit)
+
+async def get_ranking_page_async(page: int, size: int, db: AsyncSession) -> Tuple[List[RankingEntry], int]:
+    return (await get_leaderboard_async(db)).page((page - 1) * size, size)
+
+async def get_user_rank_async(user_id: int, neighbours: int, db: AsyncSession) -> Optional[tuple]:
+    return (await get_leaderboard_async(db)).around(user_id, neighbours)
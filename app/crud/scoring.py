@@ -0,0 +1,258 @@
+# app/crud/scoring.py
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+from datetime import datetime, timezone
+from functools import lru_cache
+from sqlalchemy.orm import Session
+from sqlalchemy import select, update, func, case, and_
+
+from app.core.config import settings
+from app.core.database import run_after_commit
+from app.core.security import invalidate_principals
+from app.crud.data_version import RANKING_SCOPE, bump_data_versions
+from app.crud.leaderboard import rebuild_leaderboard, update_leaderboard, record_leaderboard_changes, invalidate_leaderboard
+from app.crud.standing import refresh_standings
+from app.models.game import Game, GameStatus
+from app.models.bet import Bet
+from app.models.user import User
+
+# --------------------------------------------------
+# Regras de pontuação
+# Cada regra é uma condição sobre as colunas de aposta/jogo. O conjunto de regras
+# é compilado em uma única expressão SQL, avaliada pelo banco sobre todas as
+# apostas de uma vez (sem carregar objetos nem ramificar por aposta em Python).
+# --------------------------------------------------
+def _sign(expr):
+    return case((expr > 0, 1), (expr < 0, -1), else_=0)
+
+class ScoringRule(ABC):
+    """Regra base: concede `points` quando `condition()` é verdadeira."""
+    name = ""
+
+    def __init__(self, points: int = 1):
+        self.points = points
+
+    @abstractmethod
+    def condition(self):
+        """Expressão SQL booleana sobre as colunas de Bet e Game."""
+
+class ExactScoreRule(ScoringRule):
+    """Placar exato."""
+    name = "exact_score"
+
+    def condition(self):
+        return and_(Bet.home_score_bet == Game.home_score, Bet.away_score_bet == Game.away_score)
+
+class CorrectWinnerRule(ScoringRule):
+    """Acertou o vencedor (ou o empate)."""
+    name = "correct_winner"
+
+    def condition(self):
+        return _sign(Bet.home_score_bet - Bet.away_score_bet) == _sign(Game.home_score - Game.away_score)
+
+class GoalDifferenceRule(ScoringRule):
+    """Acertou o saldo de gols."""
+    name = "goal_difference"
+
+    def condition(self):
+        return (Bet.home_score_bet - Bet.away_score_bet) == (Game.home_score - Game.away_score)
+
+class HomeGoalsRule(ScoringRule):
+    """Acertou os gols do mandante."""
+    name = "home_goals"
+
+    def condition(self):
+        return Bet.home_score_bet == Game.home_score
+
+class AwayGoalsRule(ScoringRule):
+    """Acertou os gols do visitante."""
+    name = "away_goals"
+
+    def condition(self):
+        return Bet.away_score_bet == Game.away_score
+
+RULES = {rule.name: rule for rule in (ExactScoreRule, CorrectWinnerRule, GoalDifferenceRule, HomeGoalsRule, AwayGoalsRule)}
+
+class RuleSet:
+    """
+    Conjunto de regras de pontuação.
+    - cumulative=False: vale a primeira regra atendida, na ordem da lista (faixas).
+    - cumulative=True: os pontos de todas as regras atendidas são somados.
+    - round_multipliers: multiplicador por rodada (ex: {38: 2}).
+    Placar do jogo nulo gera NULL nas comparações e resulta em 0 pontos.
+    """
+    def __init__(self, rules: List[ScoringRule], cumulative: bool = False, round_multipliers: Optional[Dict[int, int]] = None):
+        if not rules:
+            raise ValueError("O conjunto de regras de pontuação não pode ser vazio.")
+        self.rules = rules
+        self.cumulative = cumulative
+        self.round_multipliers = round_multipliers or {}
+
+    def points_awarded(self):
+        if self.cumulative:
+            points = sum(case((rule.condition(), rule.points), else_=0) for rule in self.rules)
+        else:
+            points = case(*[(rule.condition(), rule.points) for rule in self.rules], else_=0)
+        if self.round_multipliers:
+            points = points * case(self.round_multipliers, value=Game.round_number, else_=1)
+        return points
+
+    def is_correct(self):
+        return case((self.points_awarded() > 0, True), else_=False)
+
+DEFAULT_RULESET = RuleSet([ExactScoreRule(points=1)])
+
+USER_DELTA_CHUNK = 1000 # Usuários por UPDATE ... CASE ao aplicar diferenças de pontos
+
+def parse_ruleset(rules: str, cumulative: bool = False, round_multipliers: str = "") -> RuleSet:
+    """
+    Monta um RuleSet a partir de texto, ex: rules="exact_score=3,correct_winner=1"
+    e round_multipliers="37=2,38=2".
+    """
+    parsed_rules = []
+    for item in filter(None, (part.strip() for part in rules.split(","))):
+        name, _, points = item.partition("=")
+        if name.strip() not in RULES:
+            raise ValueError(f"Regra de pontuação desconhecida: '{name.strip()}'")
+        parsed_rules.append(RULES[name.strip()](points=int(points or 1)))
+
+    multipliers = {}
+    for item in filter(None, (part.strip() for part in round_multipliers.split(","))):
+        round_number, _, factor = item.partition("=")
+        multipliers[int(round_number)] = int(factor)
+
+    return RuleSet(parsed_rules, cumulative=cumulative, round_multipliers=multipliers)
+
+@lru_cache
+def get_active_ruleset() -> RuleSet:
+    """Conjunto de regras configurado em Settings (SCORING_*)."""
+    return parse_ruleset(settings.SCORING_RULES, settings.SCORING_CUMULATIVE, settings.SCORING_ROUND_MULTIPLIERS)
+
+
+# --------------------------------------------------
+# Motor de pontuação em lote (UPDATE ... FROM/JOIN)
+# --------------------------------------------------
+def _score_bets(where, ruleset: RuleSet, db: Session, now: datetime) -> int:
+    """Grava is_correct/points_awarded das apostas filtradas em um único UPDATE bet ... FROM game."""
+    statement = (
+        update(Bet)
+        .where(Bet.game_id == Game.id, Game.status == GameStatus.FINISHED, where)
+        .values(is_correct=ruleset.is_correct(), points_awarded=ruleset.points_awarded(), updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    return db.execute(statement).rowcount
+
+def _apply_user_deltas(deltas: Dict[int, int], db: Session, now: datetime) -> None:
+    """Soma as diferenças em User.points com um UPDATE ... CASE por bloco de usuários."""
+    user_ids = list(deltas)
+    for start in range(0, len(user_ids), USER_DELTA_CHUNK):
+        chunk = {user_id: deltas[user_id] for user_id in user_ids[start:start + USER_DELTA_CHUNK]}
+        db.execute(
+            update(User)
+            .where(User.id.in_(list(chunk)))
+            .values(points=User.points + case(chunk, value=User.id, else_=0), updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+
+def score_games(game_ids: List[int], db: Session, ruleset: Optional[RuleSet] = None, commit: bool = True) -> int:
+    """
+    Sincroniza a pontuação das apostas dos jogos informados com o placar atual.
+    Idempotente e incremental: para cada aposta calcula a diferença entre os pontos
+    já concedidos (bet.points_awarded) e os novos, e aplica somente essa diferença
+    em User.points. Serve tanto para a primeira pontuação quanto para correções de
+    placar de um jogo já finalizado; jogos que deixaram de estar FINISHED têm os
+    pontos estornados. Custo: O(apostas dos jogos), em poucos comandos em lote.
+    Retorna o número de apostas pontuadas.
+    """
+    if not game_ids:
+        return 0
+
+    ruleset = ruleset or get_active_ruleset()
+    now = datetime.now(timezone.utc)
+    finished = Game.status == GameStatus.FINISHED
+    new_points = case((finished, ruleset.points_awarded()), else_=0)
+
+    # 1. Calcula a diferença (novos - já concedidos) por usuário, antes de regravar as apostas
+    deltas = dict(db.execute(
+        select(Bet.user_id, func.sum(new_points - Bet.points_awarded))
+        .where(Bet.game_id == Game.id, Game.id.in_(game_ids))
+        .group_by(Bet.user_id)
+        .having(func.sum(new_points - Bet.points_awarded) != 0)
+    ).all())
+    _apply_user_deltas(deltas, db, now)
+
+    # 2. Regrava todas as apostas dos jogos em um único UPDATE bet ... FROM game
+    bets_stmt = (
+        update(Bet)
+        .where(Bet.game_id == Game.id, Game.id.in_(game_ids))
+        .values(
+            is_correct=case((finished, ruleset.is_correct()), else_=None),
+            points_awarded=new_points,
+            updated_at=now
+        )
+        .execution_options(synchronize_session=False)
+    )
+    scored = db.execute(bets_stmt).rowcount
+
+    # 3. Ranking: a versão (ETag das rotas de ranking) é incrementada primeiro e fica
+    # bloqueada até o commit, serializando as atualizações de user_rank; só a faixa de
+    # pontos afetada é regravada. Índice em memória atualizado após o commit.
+    versions = bump_data_versions(db, [RANKING_SCOPE])
+    if deltas:
+        update_leaderboard(deltas, versions[RANKING_SCOPE], db)
+        changed_users = list(deltas)
+        run_after_commit(db, lambda: invalidate_principals(changed_users))
+    record_leaderboard_changes(db, deltas, version=versions[RANKING_SCOPE])
+
+    # 4. Classificações por rodada e por dia dos jogos pontuados
+    refresh_standings(db, game_ids, commit=False)
+
+    if commit:
+        db.commit()
+    return scored
+
+def score_round(round_number: int, db: Session, ruleset: Optional[RuleSet] = None, commit: bool = True) -> int:
+    """
+    Pontua de uma vez todas as apostas dos jogos finalizados de uma rodada.
+    """
+    game_ids = db.execute(
+        select(Game.id).where(Game.round_number == round_number, Game.status == GameStatus.FINISHED)
+    ).scalars().all()
+    return score_games(list(game_ids), db, ruleset=ruleset, commit=commit)
+
+def rescore_season(db: Session, ruleset: Optional[RuleSet] = None) -> dict:
+    """
+    Recalcula a temporada inteira após uma mudança de regras, em uma única transação.
+    As apostas são regravadas rodada a rodada (um UPDATE por rodada, nada é carregado
+    em memória) e User.points é reconstruído a partir da soma de points_awarded.
+    """
+    ruleset = ruleset or get_active_ruleset()
+    now = datetime.now(timezone.utc)
+    rounds = db.execute(
+        select(Game.round_number).where(Game.status == GameStatus.FINISHED).distinct().order_by(Game.round_number)
+    ).scalars().all()
+
+    try:
+        scored = 0
+        for round_number in rounds:
+            scored += _score_bets(Game.round_number == round_number, ruleset, db, now)
+
+        total_points = (
+            select(func.coalesce(func.sum(Bet.points_awarded), 0))
+            .where(Bet.user_id == User.id)
+            .scalar_subquery()
+        )
+        db.execute(
+            update(User).values(points=total_points, updated_at=now).execution_options(synchronize_session=False)
+        )
+        versions = bump_data_versions(db, [RANKING_SCOPE])
+        rebuild_leaderboard(db, commit=False, version=versions[RANKING_SCOPE])
+        invalidate_leaderboard(db)
+        refresh_standings(db, commit=False)
+        run_after_commit(db, invalidate_principals)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return {"rounds": len(rounds), "bets_scored": scored}
@@ -0,0 +1,114 @@
+# app/crud/standing.py
+from typing import List, Optional, Tuple
+from datetime import date, datetime, timezone
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, delete, func, literal, true, DateTime
+
+from app.models.game import Game, GameStatus
+from app.models.bet import Bet
+from app.models.user import User
+from app.models.standing import RoundStanding, DailyStanding
+from app.schemas.leaderboard import RankingEntry
+
+# --------------------------------------------------
+# Atualização (chamada pelo caminho de pontuação)
+# --------------------------------------------------
+def refresh_standings(db: Session, game_ids: Optional[List[int]] = None, commit: bool = True) -> None:
+    """
+    Recalcula as classificações por rodada e por dia das rodadas/dias dos jogos
+    informados (ou de todos, se game_ids for None). Custo proporcional às apostas
+    dessas rodadas, pago uma vez na pontuação e não a cada leitura.
+    """
+    scope = Game.id.in_(game_ids) if game_ids is not None else true()
+    rounds = select(Game.round_number).where(scope).distinct()
+    game_day = func.date(Game.game_datetime)
+    days = select(game_day).where(scope).distinct()
+
+    round_points = func.sum(Bet.points_awarded)
+    per_round = (
+        select(
+            Game.round_number,
+            Bet.user_id,
+            round_points,
+            func.dense_rank().over(partition_by=Game.round_number, order_by=round_points.desc()),
+            func.row_number().over(partition_by=Game.round_number, order_by=(round_points.desc(), Bet.user_id)),
+            literal(datetime.now(timezone.utc), DateTime(timezone=True)),
+        )
+        .join(Game, Game.id == Bet.game_id)
+        .where(Game.status == GameStatus.FINISHED, Game.round_number.in_(rounds))
+        .group_by(Game.round_number, Bet.user_id)
+    )
+    db.execute(delete(RoundStanding).where(RoundStanding.round_number.in_(rounds)))
+    db.execute(
+        insert(RoundStanding).from_select(
+            ["round_number", "user_id", "points", "rank", "position", "updated_at"], per_round
+        )
+    )
+
+    per_day = (
+        select(game_day, Bet.user_id, func.sum(Bet.points_awarded))
+        .join(Game, Game.id == Bet.game_id)
+        .where(Game.status == GameStatus.FINISHED, game_day.in_(days))
+        .group_by(game_day, Bet.user_id)
+    )
+    db.execute(delete(DailyStanding).where(DailyStanding.day.in_(days)))
+    db.execute(insert(DailyStanding).from_select(["day", "user_id", "points"], per_day))
+
+    if commit:
+        db.commit()
+
+# --------------------------------------------------
+# Leitura paginada
+# --------------------------------------------------
+def get_round_standings(round_number: int, page: int, size: int, db: Session) -> Tuple[int, List[RankingEntry]]:
+    """
+    Página da classificação de uma rodada, lida pelo índice (round_number, position).
+    Retorna (total de participantes, linhas da página).
+    """
+    total = db.execute(
+        select(func.count()).select_from(RoundStanding).where(RoundStanding.round_number == round_number)
+    ).scalar()
+    rows = db.execute(
+        select(RoundStanding.position, RoundStanding.rank, RoundStanding.user_id, User.username, RoundStanding.points)
+        .join(User, User.id == RoundStanding.user_id)
+        .where(RoundStanding.round_number == round_number)
+        .order_by(RoundStanding.position)
+        .offset((page - 1) * size)
+        .limit(size)
+    ).all()
+    return total, [RankingEntry(**row._mapping) for row in rows]
+
+def get_period_standings(start: date, end: date, page: int, size: int, db: Session) -> Tuple[int, List[RankingEntry]]:
+    """
+    Página da classificação entre duas datas (inclusive), somando os pontos diários
+    pré-calculados em vez de agregar a tabela de apostas.
+    Retorna (total de participantes, linhas da página).
+    """
+    period_points = func.sum(DailyStanding.points)
+    ranked = (
+        select(
+            DailyStanding.user_id.label("user_id"),
+            period_points.label("points"),
+            func.dense_rank().over(order_by=period_points.desc()).label("rank"),
+            func.row_number().over(order_by=(period_points.desc(), DailyStanding.user_id)).label("position"),
+        )
+        .where(DailyStanding.day >= start, DailyStanding.day <= end)
+        .group_by(DailyStanding.user_id)
+        .subquery()
+    )
+    total = db.execute(select(func.count()).select_from(ranked)).scalar()
+    rows = db.execute(
+        select(ranked.c.position, ranked.c.rank, ranked.c.user_id, User.username, ranked.c.points)
+        .join(User, User.id == ranked.c.user_id)
+        .order_by(ranked.c.position)
+        .offset((page - 1) * size)
+        .limit(size)
+    ).all()
+    return total, [RankingEntry(**row._mapping) for row in rows]
+
+async def get_round_standings_async(round_number: int, page: int, size: int, db: AsyncSession) -> Tuple[int, List[RankingEntry]]:
+    return await db.run_sync(lambda session: get_round_standings(round_number, page, size, session))
+
+async def get_period_standings_async(start: date, end: date, page: int, size: int, db: AsyncSession) -> Tuple[int, List[RankingEntry]]:
+    return await db.run_sync(lambda session: get_period_standings(start, end, page, size, session))
@@ -1,19 +1,33 @@
 # app/crud/user.py
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from datetime import datetime, timezone # Mantenha datetime e timezone
 from sqlalchemy.orm import Session # <<< MUDANÇA: Use Session do SQLAlchemy ORM
-from sqlalchemy import select, desc # <<< MUDANÇA: Use select, desc do SQLAlchemy principal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Row, select, desc # <<< MUDANÇA: Use select, desc do SQLAlchemy principal
 
 from app.models.user import User # Importe o modelo User
-from app.schemas.user import UserCreate, UserUpdate, UserPasswordUpdate # Importe os schemas
-from app.core.security import get_password_hash # Importe a função de hash de senha
+from app.models.leaderboard import UserRank
+from app.schemas.user import UserCreate, UserRead, UserUpdate, UserPasswordUpdate # Importe os schemas
+from app.core.security import get_password_hash, get_password_hash_async, password_hasher, invalidate_principal # Hash de senha (pool do bcrypt)
+from app.core.database import run_after_commit
+from app.core.pagination import Keyset
+from app.core.serialization import schema_columns
+from app.crud.data_version import RANKING_SCOPE, bump_data_versions
+from app.crud.leaderboard import add_user_to_leaderboard, mark_leaderboard_user_changed, record_leaderboard_changes
+
+# Posição no ranking materializado (user_rank): chave do cursor do ranking, a mesma
+# ordem de /ranking/top
+RANKING_KEYSET = Keyset((UserRank.position, False))
+USERS_KEYSET = Keyset((User.id, False))
+# Colunas de UserRead: as listagens não carregam hashed_password nem montam objetos do ORM
+USER_READ_COLUMNS = schema_columns(User, UserRead)
 
 def create_user(user_create: UserCreate, db: Session) -> User:
     """
     Cria um novo usuário no banco de dados.
     Recebe um UserCreate schema e retorna o objeto User salvo no BD.
     """
-    hashed_password = get_password_hash(user_create.password)
+    hashed_password = password_hasher.run_blocking(get_password_hash, user_create.password)
 
     # <<< MUDANÇA: Crie a instância do modelo diretamente
     user = User(
@@ -25,7 +39,16 @@ def create_user(user_create: UserCreate, db: Session) -> User:
         updated_at=datetime.now(timezone.utc)
     )
 
+    # Versão do ranking antes do INSERT: bloqueada até o commit, ordena este cadastro com
+    # as atualizações de user_rank da pontuação (que também leem os pontos dos usuários)
+    versions = bump_data_versions(db, [RANKING_SCOPE])
     db.add(user)
+    db.flush() # Gera o ID ainda dentro da transação
+
+    # Novo usuário entra no fim do ranking materializado com 0 pontos
+    add_user_to_leaderboard(user.id, versions[RANKING_SCOPE], db)
+    record_leaderboard_changes(db, {user.id: 0}, {user.id: user.username}, version=versions[RANKING_SCOPE])
+
     db.commit()
     db.refresh(user) # Refresha o objeto para ter o ID gerado pelo DB
     return user
@@ -47,6 +70,13 @@ def get_user_by_username(username: str, db: Session) -> Optional[User]:
     user = db.execute(statement).scalars().first()
     return user
 
+async def get_user_by_username_async(username: str, db: AsyncSession) -> Optional[User]:
+    """
+    Versão assíncrona de get_user_by_username.
+    """
+    statement = select(User).where(User.username == username)
+    return (await db.execute(statement)).scalars().first()
+
 # ----------------------------------------------------
 # NOVAS FUNÇÕES CRUD PARA ATUALIZAÇÃO
 # ----------------------------------------------------
@@ -66,6 +96,12 @@ def update_user_profile(user_id: int, user_update: UserUpdate, db: Session) -> O
 
     user.updated_at = datetime.now(timezone.utc) # Atualiza a data de última alteração
     db.add(user) # Adiciona o objeto atualizado de volta à sessão
+    run_after_commit(db, lambda: invalidate_principal(user_id)) # Cache de autenticação
+    # Nome exibido no ranking: neste worker já no commit; nos demais, pela linha de
+    # user_rank marcada com a nova versão do ranking
+    versions = bump_data_versions(db, [RANKING_SCOPE])
+    mark_leaderboard_user_changed(user.id, versions[RANKING_SCOPE], db)
+    record_leaderboard_changes(db, {}, {user.id: user.username}, version=versions[RANKING_SCOPE])
     db.commit() # Salva as mudanças no banco de dados
     db.refresh(user) # Atualiza o objeto 'user' com os dados do BD
     return user
@@ -74,20 +110,85 @@ def update_user_password(user: User, new_password: str, db: Session) -> User:
     """
     Atualiza a senha de um usuário.
     """
-    user.hashed_password = get_password_hash(new_password) # Gera hash da nova senha
+    # O usuário autenticado pode vir de outra sessão (AsyncSession do get_current_user)
+    user = db.get(User, user.id)
+    user.hashed_password = password_hasher.run_blocking(get_password_hash, new_password) # Gera hash da nova senha
     user.updated_at = datetime.now(timezone.utc) # Atualiza a data de última alteração
     db.add(user)
+    user_id = user.id
+    run_after_commit(db, lambda: invalidate_principal(user_id))
     db.commit()
     db.refresh(user)
     return user
 
-def get_users_ranking(db: Session, limit: Optional[int] = None) -> List[User]:
+async def update_user_password_async(user_id: int, new_password: str, db: AsyncSession) -> Optional[User]:
+    """
+    Versão assíncrona de update_user_password: o hash roda no pool do bcrypt.
+    """
+    user = await db.get(User, user_id)
+    if not user:
+        return None
+    user.hashed_password = await get_password_hash_async(new_password)
+    user.updated_at = datetime.now(timezone.utc)
+    run_after_commit(db, lambda: invalidate_principal(user_id))
+    await db.commit()
+    return user
+
+def set_user_active(user_id: int, is_active: bool, db: Session) -> Optional[User]:
     """
-    Busca todos os usuários, ordenados por pontos em ordem decrescente.
+    Ativa ou desativa um usuário (apenas para administradores).
     """
-    # <<< MUDANÇA: Use session.execute(select(...)).scalars().all()
-    statement = select(User).order_by(desc(User.points)) # Ordena por pontos em ordem decrescente
+    user = db.get(User, user_id)
+    if not user:
+        return None
+    user.is_active = is_active
+    user.updated_at = datetime.now(timezone.utc)
+    run_after_commit(db, lambda: invalidate_principal(user_id)) # Desativação vale já na próxima requisição
+    db.commit()
+    db.refresh(user)
+    return user
+
+def get_users_ranking(db: Session, limit: Optional[int] = None, offset: int = 0) -> List[Row]:
+    """
+    Busca os usuários (colunas de UserRead) na ordem do ranking materializado (tabela
+    user_rank), usando o índice de posição em vez de ordenar a tabela de usuários.
+    """
+    statement = (
+        select(*USER_READ_COLUMNS)
+        .join(UserRank, UserRank.user_id == User.id)
+        .order_by(UserRank.position)
+        .offset(offset)
+    )
     if limit:
         statement = statement.limit(limit) # Limita o número de resultados, se especificado
-    users = db.execute(statement).scalars().all()
-    return users
\ No newline at end of file
+    users = db.execute(statement).all()
+    return users
+
+async def get_users_ranking_async(db: AsyncSession, limit: Optional[int] = None, offset: int = 0) -> List[Row]:
+    """
+    Versão assíncrona de get_users_ranking.
+    """
+    return await db.run_sync(lambda session: get_users_ranking(session, limit=limit, offset=offset))
+
+async def get_users_ranking_page_async(db: AsyncSession, limit: int, cursor: Optional[str] = None) -> Tuple[List[Row], Optional[str]]:
+    """
+    Página do ranking por cursor (posição em user_rank, como get_users_ranking).
+    Retorna (usuários, cursor da próxima página). A posição vem depois das colunas de
+    UserRead: serve ao cursor e fica fora do JSON de encode_rows.
+    """
+    statement = select(*USER_READ_COLUMNS, UserRank.position).join(UserRank, UserRank.user_id == User.id)
+    users = (await db.execute(RANKING_KEYSET.apply(statement, cursor, limit))).all()
+    return RANKING_KEYSET.page(users, limit)
+
+async def get_users_page_async(db: AsyncSession, limit: int, cursor: Optional[str] = None) -> Tuple[List[Row], Optional[str]]:
+    """
+    Página de usuários por cursor (id), para administradores. Retorna (usuários, cursor da próxima página).
+    """
+    users = (await db.execute(USERS_KEYSET.apply(select(*USER_READ_COLUMNS), cursor, limit))).all()
+    return USERS_KEYSET.page(users, limit)
+
+async def get_all_users_async(db: AsyncSession) -> List[Row]:
+    """
+    Retorna todos os usuários (apenas para administradores), sem o hash da senha.
+    """
+    return (await db.execute(select(*USER_READ_COLUMNS))).all()
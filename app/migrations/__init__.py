@@ -0,0 +1,74 @@
+# app/migrations/__init__.py
+# Migrações versionadas do schema. Cada módulo vNNNN_descricao.py define upgrade(connection)
+# e é aplicado uma única vez, em ordem, pela etapa de release do deploy
+# (`python -m app.release`), nunca na inicialização dos workers. As versões aplicadas ficam
+# na tabela schema_migration.
+#
+# Regras para novas migrações:
+# - Não edite uma migração já publicada: crie a próxima (vNNNN + 1).
+# - Descreva as tabelas na própria migração (Table/MetaData locais), sem importar os
+#   modelos: o que ela cria não pode mudar quando um modelo mudar.
+# - Ao mudar um modelo (coluna, índice, restrição, tabela), crie a migração correspondente.
+# - No MySQL, DDL não é transacional: uma migração interrompida deve poder ser reexecutada.
+import importlib
+import pkgutil
+import re
+from datetime import datetime, timezone
+from typing import List
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, select, text
+from sqlalchemy.engine import Connection, Engine
+
+MIGRATION_MODULE = re.compile(r"^v\d{4}_\w+$")
+LOCK_NAME = "bolao_schema_migration"
+LOCK_TIMEOUT_SECONDS = 60
+
+# Fora de Base.metadata: controle das migrações, não faz parte do schema da aplicação
+schema_migration = Table(
+    "schema_migration",
+    MetaData(),
+    Column("version", String(100), primary_key=True),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+def available_migrations() -> List[str]:
+    """Nomes dos módulos de migração deste pacote, em ordem de versão."""
+    return sorted(module.name for module in pkgutil.iter_modules(__path__) if MIGRATION_MODULE.match(module.name))
+
+def _applied(connection: Connection) -> set:
+    schema_migration.create(connection, checkfirst=True)
+    return set(connection.execute(select(schema_migration.c.version)).scalars())
+
+def pending_migrations(engine: Engine) -> List[str]:
+    with engine.begin() as connection:
+        applied = _applied(connection)
+    return [name for name in available_migrations() if name not in applied]
+
+def run_migrations(engine: Engine) -> List[str]:
+    """
+    Aplica as migrações pendentes, cada uma em sua transação, e retorna as aplicadas.
+    No MySQL, um lock nomeado impede que dois deploys simultâneos migrem ao mesmo tempo.
+    """
+    applied_now = []
+    with engine.connect() as lock_connection:
+        is_mysql = engine.dialect.name == "mysql"
+        if is_mysql:
+            acquired = lock_connection.execute(
+                text("SELECT GET_LOCK(:name, :timeout)"), {"name": LOCK_NAME, "timeout": LOCK_TIMEOUT_SECONDS}
+            ).scalar()
+            if acquired != 1:
+                raise RuntimeError("Outro processo está aplicando migrações (lock não obtido).")
+        try:
+            for name in pending_migrations(engine): # Relido após o lock: outro deploy pode ter migrado
+                module = importlib.import_module(f"{__name__}.{name}")
+                print(f"INFO: Aplicando migração {name}: {module.DESCRIPTION}")
+                with engine.begin() as connection:
+                    module.upgrade(connection)
+                    connection.execute(schema_migration.insert().values(
+                        version=name, applied_at=datetime.now(timezone.utc)
+                    ))
+                applied_now.append(name)
+        finally:
+            if is_mysql:
+                lock_connection.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": LOCK_NAME})
+    return applied_now
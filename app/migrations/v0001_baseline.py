@@ -0,0 +1,53 @@
+# app/migrations/v0001_baseline.py
+# Schema inicial (usuários, jogos e apostas), como era criado pelo antigo create_all na
+# inicialização. As tabelas são descritas aqui, e não importadas dos modelos, para que
+# esta migração crie sempre o mesmo schema: índices, restrições e tabelas novas vêm das
+# migrações seguintes. Em bancos criados antes das migrações, nada é alterado.
+from sqlalchemy import Boolean, Column, DateTime, Enum, ForeignKey, Integer, MetaData, String, Table
+from sqlalchemy.engine import Connection
+
+DESCRIPTION = "tabelas iniciais: usuários, jogos e apostas"
+
+metadata = MetaData()
+
+Table(
+    "user", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("username", String(50), unique=True, index=True, nullable=False),
+    Column("hashed_password", String(255), nullable=False),
+    Column("role", Enum("USER", "ADMIN", name="user_role_enum"), nullable=False),
+    Column("points", Integer, nullable=False),
+    Column("is_active", Boolean, nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False),
+)
+
+Table(
+    "game", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("round_number", Integer, nullable=False, index=True),
+    Column("home_team", String(100), nullable=False),
+    Column("away_team", String(100), nullable=False),
+    Column("game_datetime", DateTime(timezone=True), nullable=False),
+    Column("home_score", Integer, nullable=True),
+    Column("away_score", Integer, nullable=True),
+    Column("status", Enum("SCHEDULED", "FINISHED", "POSTPONED", "CANCELED", name="game_status_enum"), nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False),
+)
+
+Table(
+    "bet", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("user.id"), index=True, nullable=False),
+    Column("game_id", Integer, ForeignKey("game.id"), index=True, nullable=False),
+    Column("home_score_bet", Integer, nullable=False),
+    Column("away_score_bet", Integer, nullable=False),
+    Column("is_correct", Boolean, nullable=True),
+    Column("points_awarded", Integer, nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False),
+)
+
+def upgrade(connection: Connection) -> None:
+    metadata.create_all(connection, checkfirst=True)
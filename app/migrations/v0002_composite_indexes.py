@@ -0,0 +1,48 @@
+# app/migrations/v0002_composite_indexes.py
+# Índices compostos das consultas mais frequentes (ver os modelos de Game e User), a
+# chave única de apostas em bancos anteriores a ela e a remoção do índice simples de
+# game.round_number, coberto por ix_game_round_datetime.
+# No MySQL (InnoDB) CREATE INDEX é online: leituras e escritas continuam durante a criação.
+# Se a chave única falhar por apostas duplicadas, remova-as e execute o release de novo.
+from sqlalchemy import Index, MetaData, Table, inspect
+from sqlalchemy.engine import Connection
+
+DESCRIPTION = "índices compostos de jogos, ranking e apostas"
+
+# (tabela, nome, colunas, único); "-" antes do nome = coluna em ordem decrescente
+INDEXES = [
+    ("game", "ix_game_round_datetime", ["round_number", "game_datetime", "id"], False),
+    ("game", "ix_game_status_round", ["status", "round_number"], False),
+    ("user", "ix_user_points_id", ["-points", "id"], False),
+    ("bet", "uq_bet_user_game", ["user_id", "game_id"], True),
+]
+REDUNDANT = [
+    ("game", "ix_game_round_number"),
+]
+
+def _existing_names(inspector, table: str) -> set:
+    names = {index["name"] for index in inspector.get_indexes(table)}
+    names |= {constraint["name"] for constraint in inspector.get_unique_constraints(table)}
+    return names
+
+def upgrade(connection: Connection) -> None:
+    inspector = inspect(connection)
+    metadata = MetaData()
+    tables = {name: Table(name, metadata, autoload_with=connection) for name in ("game", "user", "bet")}
+    existing = {name: _existing_names(inspector, name) for name in tables}
+
+    for table, name, columns, unique in INDEXES:
+        if name in existing[table]:
+            continue
+        expressions = [
+            tables[table].c[column[1:]].desc() if column.startswith("-") else tables[table].c[column]
+            for column in columns
+        ]
+        print(f"INFO: Criando {name} em {table}...")
+        Index(name, *expressions, unique=unique).create(connection)
+
+    for table, name in REDUNDANT:
+        index = next((index for index in tables[table].indexes if index.name == name), None)
+        if index is not None:
+            print(f"INFO: Removendo {name} de {table} (coberto por um índice composto)...")
+            index.drop(connection)
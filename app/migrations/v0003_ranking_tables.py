@@ -0,0 +1,51 @@
+# app/migrations/v0003_ranking_tables.py
+# Tabelas derivadas das apostas: ranking materializado (user_rank), classificações por
+# rodada e por dia e as versões dos dados (ETag das rotas de leitura). Descritas aqui,
+# como na baseline, e não importadas dos modelos. São preenchidas pela pontuação;
+# user_rank dos usuários existentes, pela v0004.
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Index, Integer, MetaData, String, Table
+from sqlalchemy.engine import Connection
+
+DESCRIPTION = "ranking materializado, classificações por rodada/dia e versões dos dados"
+
+metadata = MetaData()
+Table("user", metadata, Column("id", Integer, primary_key=True)) # Alvo das chaves estrangeiras (já existe)
+
+Table(
+    "user_rank", metadata,
+    Column("user_id", Integer, ForeignKey("user.id", ondelete="CASCADE"), primary_key=True),
+    Column("points", Integer, nullable=False),
+    Column("rank", Integer, nullable=False),
+    Column("position", Integer, nullable=False, unique=True, index=True),
+    Column("updated_at", DateTime(timezone=True), nullable=False),
+)
+
+Table(
+    "round_standing", metadata,
+    Column("round_number", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("user.id", ondelete="CASCADE"), primary_key=True),
+    Column("points", Integer, nullable=False),
+    Column("rank", Integer, nullable=False),
+    Column("position", Integer, nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False),
+    Index("ix_round_standing_round_position", "round_number", "position"),
+)
+
+Table(
+    "daily_standing", metadata,
+    Column("day", Date, primary_key=True),
+    Column("user_id", Integer, ForeignKey("user.id", ondelete="CASCADE"), primary_key=True),
+    Column("points", Integer, nullable=False),
+)
+
+Table(
+    "data_version", metadata,
+    Column("scope", String(50), primary_key=True),
+    Column("version", Integer, nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False),
+)
+
+TABLES = ["user_rank", "round_standing", "daily_standing", "data_version"]
+
+def upgrade(connection: Connection) -> None:
+    metadata.create_all(connection, tables=[metadata.tables[name] for name in TABLES], checkfirst=True)
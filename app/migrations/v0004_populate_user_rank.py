@@ -0,0 +1,30 @@
+# app/migrations/v0004_populate_user_rank.py
+# Preenche o ranking materializado (user_rank) em bancos que já tinham usuários quando
+# a tabela foi criada. As rotas de ranking só leem user_rank (inclusive nas réplicas,
+# somente leitura); a partir daqui ele é mantido pelo cadastro e pela pontuação.
+from datetime import datetime, timezone
+
+from sqlalchemy import MetaData, Table, func, insert, literal, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.types import DateTime
+
+DESCRIPTION = "ranking materializado dos usuários existentes"
+
+def upgrade(connection: Connection) -> None:
+    metadata = MetaData()
+    user = Table("user", metadata, autoload_with=connection)
+    user_rank = Table("user_rank", metadata, autoload_with=connection)
+    if connection.execute(select(func.count()).select_from(user_rank)).scalar():
+        return # Já preenchido (release reexecutado)
+
+    ranked = select(
+        user.c.id,
+        user.c.points,
+        func.dense_rank().over(order_by=user.c.points.desc()),
+        func.row_number().over(order_by=(user.c.points.desc(), user.c.id)),
+        literal(datetime.now(timezone.utc), DateTime(timezone=True)),
+    )
+    rows = connection.execute(
+        insert(user_rank).from_select(["user_id", "points", "rank", "position", "updated_at"], ranked)
+    ).rowcount
+    print(f"INFO: {rows} usuário(s) incluído(s) em user_rank.")
@@ -0,0 +1,14 @@
+# app/migrations/v0005_user_rank_points_index.py
+# Índice de pontos do ranking materializado: a pontuação de um jogo regrava apenas a
+# faixa de pontos afetada de user_rank (e ajusta o rank das linhas abaixo dela), em vez
+# de reconstruir a tabela inteira.
+from sqlalchemy import Index, MetaData, Table, inspect
+from sqlalchemy.engine import Connection
+
+DESCRIPTION = "índice de pontos em user_rank"
+
+def upgrade(connection: Connection) -> None:
+    if "ix_user_rank_points" in {index["name"] for index in inspect(connection).get_indexes("user_rank")}:
+        return # Release reexecutado após falha
+    user_rank = Table("user_rank", MetaData(), autoload_with=connection)
+    Index("ix_user_rank_points", user_rank.c.points).create(connection)
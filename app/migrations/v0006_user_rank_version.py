@@ -0,0 +1,17 @@
+# app/migrations/v0006_user_rank_version.py
+# Versão por linha do ranking materializado: cada escrita marca as linhas de user_rank
+# que alterou com a nova versão do escopo de ranking, e os workers atualizam o índice em
+# memória lendo só as linhas mais novas que ele, em vez de recarregar a tabela inteira.
+# Linhas existentes ficam com 0 (já refletidas no primeiro carregamento de cada worker).
+from sqlalchemy import Index, MetaData, Table, inspect, text
+from sqlalchemy.engine import Connection
+
+DESCRIPTION = "versão por linha em user_rank"
+
+def upgrade(connection: Connection) -> None:
+    inspector = inspect(connection)
+    if "version" not in {column["name"] for column in inspector.get_columns("user_rank")}:
+        connection.execute(text("ALTER TABLE user_rank ADD COLUMN version INTEGER NOT NULL DEFAULT 0"))
+    if "ix_user_rank_version" not in {index["name"] for index in inspector.get_indexes("user_rank")}:
+        user_rank = Table("user_rank", MetaData(), autoload_with=connection)
+        Index("ix_user_rank_version", user_rank.c.version).create(connection)
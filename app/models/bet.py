@@ -3,7 +3,7 @@ from __future__ import annotations # DEVE SER A PRIMEIRA LINHA REAL DE CÓDIGO
 from typing import Optional, TYPE_CHECKING
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Boolean, UniqueConstraint
 from sqlalchemy.orm import relationship, Mapped
 
 from app.core.database import Base # Importar a Base declarativa
@@ -16,7 +16,7 @@ class Bet(Base):
     __tablename__ = "bet"
 
     id: Mapped[int] = Column(Integer, primary_key=True, index=True)
-    user_id: Mapped[int] = Column(Integer, ForeignKey("user.id"), index=True, nullable=False)
+    user_id: Mapped[int] = Column(Integer, ForeignKey("user.id"), index=True, nullable=False) # (user_id, id): apostas do usuário em ordem de id
     game_id: Mapped[int] = Column(Integer, ForeignKey("game.id"), index=True, nullable=False)
 
     home_score_bet: Mapped[int] = Column(Integer, nullable=False)
@@ -32,5 +32,10 @@ class Bet(Base):
     user: Mapped["User"] = relationship("User", back_populates="bets")
     game: Mapped["Game"] = relationship("Game", back_populates="bets")
 
+    __table_args__ = (
+        # Uma aposta por usuário e jogo, garantida pelo banco (base do upsert de apostas)
+        UniqueConstraint("user_id", "game_id", name="uq_bet_user_game"),
+    )
+
     def __repr__(self):
         return f"<Bet(id={self.id}, user_id={self.user_id}, game_id={self.game_id})>"
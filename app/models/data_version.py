@@ -0,0 +1,23 @@
+# app/models/data_version.py
+from __future__ import annotations # DEVE SER A PRIMEIRA LINHA REAL DE CÓDIGO
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.orm import Mapped
+
+from app.core.database import Base # Importar a Base declarativa
+
+class DataVersion(Base):
+    """
+    Versão de um conjunto de dados lido pelos clientes (ex: "games", "games:round:5",
+    "ranking"). Incrementada na mesma transação que altera os dados; base dos
+    cabeçalhos ETag/Last-Modified das rotas de leitura.
+    """
+    __tablename__ = "data_version"
+
+    scope: Mapped[str] = Column(String(50), primary_key=True)
+    version: Mapped[int] = Column(Integer, nullable=False, default=1)
+    updated_at: Mapped[datetime] = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    def __repr__(self):
+        return f"<DataVersion(scope={self.scope}, version={self.version})>"
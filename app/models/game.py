@@ -44,7 +44,7 @@ from typing import Optional, List, TYPE_CHECKING
 from datetime import datetime, timezone
 import enum
 
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index
 from sqlalchemy import Enum as SQLAlchemyEnum
 from sqlalchemy.orm import relationship, Mapped
 
@@ -63,7 +63,7 @@ class Game(Base):
     __tablename__ = "game"
 
     id: Mapped[int] = Column(Integer, primary_key=True, index=True)
-    round_number: Mapped[int] = Column(Integer, nullable=False, index=True)
+    round_number: Mapped[int] = Column(Integer, nullable=False) # Indexado em ix_game_round_datetime
     home_team: Mapped[str] = Column(String(100), nullable=False)
     away_team: Mapped[str] = Column(String(100), nullable=False)
     game_datetime: Mapped[datetime] = Column(DateTime(timezone=True), nullable=False)
@@ -78,5 +78,12 @@ class Game(Base):
     # Relacionamento com Bet
     bets: Mapped[List["Bet"]] = relationship("Bet", back_populates="game")
 
+    __table_args__ = (
+        # Jogos de uma rodada por data/hora e listagens/cursor em (rodada, data/hora, id), sem ordenação extra
+        Index("ix_game_round_datetime", "round_number", "game_datetime", "id"),
+        # Pontuação e classificações: jogos finalizados, por rodada
+        Index("ix_game_status_round", "status", "round_number"),
+    )
+
     def __repr__(self):
         return f"<Game(id={self.id}, home_team='{self.home_team}', away_team='{self.away_team}')>"
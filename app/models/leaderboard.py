@@ -0,0 +1,33 @@
+# app/models/leaderboard.py
+from __future__ import annotations # DEVE SER A PRIMEIRA LINHA REAL DE CÓDIGO
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from sqlalchemy.orm import Mapped
+
+from app.core.database import Base # Importar a Base declarativa
+
+class UserRank(Base):
+    """
+    Classificação materializada: mantida pelo caminho de pontuação (só a faixa de pontos
+    afetada é regravada), lida pelas rotas de ranking sem ordenar a tabela de usuários.
+    """
+    __tablename__ = "user_rank"
+
+    user_id: Mapped[int] = Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), primary_key=True)
+    points: Mapped[int] = Column(Integer, nullable=False)
+    rank: Mapped[int] = Column(Integer, nullable=False) # Rank denso: empates dividem a mesma posição
+    position: Mapped[int] = Column(Integer, nullable=False, unique=True, index=True) # Ordem 1..n (pontos desc, id)
+    updated_at: Mapped[datetime] = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    # Versão do escopo de ranking em que a linha (pontos ou nome) mudou pela última vez:
+    # os workers carregam só as linhas mais novas que o seu índice em memória
+    version: Mapped[int] = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # Atualização incremental: linhas de uma faixa de pontos e as abaixo dela
+        Index("ix_user_rank_points", "points"),
+        Index("ix_user_rank_version", "version"),
+    )
+
+    def __repr__(self):
+        return f"<UserRank(user_id={self.user_id}, position={self.position}, rank={self.rank})>"
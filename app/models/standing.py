@@ -0,0 +1,37 @@
+# app/models/standing.py
+from __future__ import annotations # DEVE SER A PRIMEIRA LINHA REAL DE CÓDIGO
+from datetime import date, datetime, timezone
+
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, Index
+from sqlalchemy.orm import Mapped
+
+from app.core.database import Base # Importar a Base declarativa
+
+class RoundStanding(Base):
+    """Classificação pré-calculada de uma rodada (pontos obtidos apenas nos jogos dela)."""
+    __tablename__ = "round_standing"
+
+    round_number: Mapped[int] = Column(Integer, primary_key=True)
+    user_id: Mapped[int] = Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), primary_key=True)
+    points: Mapped[int] = Column(Integer, nullable=False)
+    rank: Mapped[int] = Column(Integer, nullable=False) # Rank denso dentro da rodada
+    position: Mapped[int] = Column(Integer, nullable=False) # Ordem 1..n dentro da rodada
+    updated_at: Mapped[datetime] = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    __table_args__ = (
+        Index("ix_round_standing_round_position", "round_number", "position"),
+    )
+
+    def __repr__(self):
+        return f"<RoundStanding(round_number={self.round_number}, user_id={self.user_id}, points={self.points})>"
+
+class DailyStanding(Base):
+    """Pontos de cada usuário por dia de jogo (UTC); base dos rankings por período."""
+    __tablename__ = "daily_standing"
+
+    day: Mapped[date] = Column(Date, primary_key=True)
+    user_id: Mapped[int] = Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), primary_key=True)
+    points: Mapped[int] = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<DailyStanding(day={self.day}, user_id={self.user_id}, points={self.points})>"
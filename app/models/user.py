@@ -4,7 +4,7 @@ from typing import Optional, List, TYPE_CHECKING
 from datetime import datetime, timezone
 import enum
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index
 from sqlalchemy import Enum as SQLAlchemyEnum
 from sqlalchemy.orm import relationship, Mapped
 
@@ -31,5 +31,10 @@ class User(Base):
 
     bets: Mapped[List["Bet"]] = relationship("Bet", back_populates="user")
 
+    __table_args__ = (
+        # Reconstrução da classificação (user_rank): ORDER BY points DESC, id
+        Index("ix_user_points_id", points.desc(), id),
+    )
+
     def __repr__(self):
         return f"<User(id={self.id}, username='{self.username}')>"
@@ -0,0 +1,64 @@
+# app/release.py
+# Etapa de release do deploy (uma vez por versão, antes de subir os workers):
+# aplica as migrações pendentes, garante o usuário administrador padrão e exibe o
+# diagnóstico de configuração (banco e CORS).
+# Uso: python -m app.release
+import os
+import sys
+
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.core.cors import cors_origins
+from app.core.database import SessionLocal, engine
+from app.crud.user import create_user, get_user_by_username
+from app.migrations import run_migrations
+# Todos os modelos, para os relacionamentos do User resolverem mesmo sem migração pendente
+from app.models.user import User, UserRole
+from app.models.game import Game
+from app.models.bet import Bet
+from app.models.leaderboard import UserRank
+from app.models.standing import RoundStanding, DailyStanding
+from app.models.data_version import DataVersion
+from app.schemas.user import UserCreate
+
+ADMIN_USERNAME = "ADMIN" # Usuário admin padrão
+
+def ensure_admin_user() -> None:
+    """Cria o usuário ADMIN (senha em ADMIN_PASSWORD) se ele ainda não existir."""
+    with SessionLocal() as db:
+        existing_admin_user = get_user_by_username(ADMIN_USERNAME, db)
+        if existing_admin_user:
+            print(f"INFO: Usuário '{existing_admin_user.username}' (ID: {existing_admin_user.id}) já existe. Não criando novamente.")
+            return
+
+        print(f"INFO: Usuário '{ADMIN_USERNAME}' não encontrado. Tentando criar...")
+        admin_password = os.getenv("ADMIN_PASSWORD")
+        if not admin_password:
+            default_unsafe_password = "DefaultChangeThisPassword123!"
+            print(f"AVISO CRÍTICO: ADMIN_PASSWORD não definida! Usando senha padrão insegura: '{default_unsafe_password}'")
+            admin_password = default_unsafe_password
+
+        admin_user_data = UserCreate(username=ADMIN_USERNAME, password=admin_password, role=UserRole.ADMIN)
+        created_admin = create_user(db=db, user_create=admin_user_data)
+        print(f"INFO: Usuário '{created_admin.username}' (ID: {created_admin.id}, Role: {created_admin.role.value}) CRIADO com sucesso.")
+
+def print_diagnostics() -> None:
+    url = make_url(settings.DATABASE_URL)
+    location = f"{url.host}:{url.port}" if url.host else url.database
+    print(f"INFO: DATABASE_URL aponta para ({url.get_backend_name()}): {location}")
+    print(cors_origins()[1])
+
+def main() -> int:
+    print_diagnostics()
+    try:
+        applied = run_migrations(engine)
+        print(f"INFO: {len(applied)} migração(ões) aplicada(s)." if applied else "INFO: Schema já atualizado.")
+        ensure_admin_user()
+    except Exception as e:
+        print(f"ERRO CRÍTICO: Falha na etapa de release: {e}")
+        return 1 # Código de saída != 0 interrompe o deploy antes de subir a nova versão
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
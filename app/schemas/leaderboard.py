@@ -0,0 +1,24 @@
+# app/schemas/leaderboard.py
+from typing import List
+
+from pydantic import BaseModel
+
+# Linha do ranking: posição (ordem única) e rank denso (empates dividem o rank)
+class RankingEntry(BaseModel):
+    position: int
+    rank: int
+    user_id: int
+    username: str
+    points: int
+
+# Posição do usuário logado e seus vizinhos no ranking
+class UserRankRead(BaseModel):
+    me: RankingEntry
+    neighbours: List[RankingEntry]
+
+# Página do ranking
+class RankingPage(BaseModel):
+    page: int
+    size: int
+    total: int
+    entries: List[RankingEntry]
@@ -0,0 +1,62 @@
+# scripts/_bench.py
+# Utilitários compartilhados pelos benchmarks: banco SQLite temporário e dados de exemplo.
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Settings exige essas variáveis na importação de app.core.config
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "bdl_bench_default.db"))
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "10")
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.core.database import Base  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.models.game import Game, GameStatus  # noqa: E402
+from app.models.bet import Bet  # noqa: E402
+from app.models.leaderboard import UserRank  # noqa: E402
+from app.models.standing import RoundStanding, DailyStanding  # noqa: E402
+from app.models.data_version import DataVersion  # noqa: E402
+
+
+def make_sessionmaker():
+    """Cria um banco SQLite novo em arquivo temporário e retorna (engine, sessionmaker)."""
+    fd, path = tempfile.mkstemp(prefix="bdl_bench_", suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def seed(db, n_users: int, n_games: int, round_number: int = 1, bets_per_user: int = None):
+    """Insere usuários, jogos de uma rodada e uma aposta por usuário/jogo."""
+    now = datetime.now(timezone.utc)
+    db.execute(insert(User), [
+        {"username": f"user{i}", "hashed_password": "x", "role": UserRole.USER, "points": 0,
+         "is_active": True, "created_at": now, "updated_at": now}
+        for i in range(n_users)
+    ])
+    db.execute(insert(Game), [
+        {"round_number": round_number, "home_team": f"Casa {g}", "away_team": f"Fora {g}",
+         "game_datetime": now + timedelta(days=1, minutes=g), "status": GameStatus.SCHEDULED,
+         "created_at": now, "updated_at": now}
+        for g in range(n_games)
+    ])
+    db.commit()
+    user_ids = [row[0] for row in db.execute(User.__table__.select().with_only_columns(User.id))]
+    game_ids = [row[0] for row in db.execute(Game.__table__.select().with_only_columns(Game.id))]
+    rows = []
+    for u in user_ids:
+        for g in game_ids[:len(game_ids) if bets_per_user is None else bets_per_user]:
+            rows.append({"user_id": u, "game_id": g, "home_score_bet": (u + g) % 4,
+                         "away_score_bet": (u * g) % 3, "points_awarded": 0,
+                         "created_at": now, "updated_at": now})
+    if rows:
+        db.execute(insert(Bet), rows)
+        db.commit()
+    return user_ids, game_ids
@@ -0,0 +1,55 @@
+# scripts/bench_bet_submission.py
+# Compara o envio de apostas de uma rodada antigo (consulta + commit + refresh por aposta)
+# com o caminho em lote (uma consulta, um INSERT de várias linhas e um commit).
+# Uso: python scripts/bench_bet_submission.py [n_envios] [jogos_por_rodada]
+import sys
+import time
+
+from _bench import make_sessionmaker, seed
+from sqlalchemy import event
+
+from app.crud.bet import create_bet, create_bets_bulk, get_user_bet_for_game, get_user_bet_game_ids
+from app.schemas.bet import BetCreate
+
+
+def legacy_submit(user_id, bets, db):
+    """Cópia do fluxo anterior do endpoint: N consultas de existência e um commit por aposta."""
+    for bet in bets:
+        if get_user_bet_for_game(user_id, bet.game_id, db):
+            raise ValueError("aposta duplicada")
+    return [create_bet(bet, user_id, db) for bet in bets]
+
+
+def bulk_submit(user_id, bets, db):
+    if get_user_bet_game_ids(user_id, [bet.game_id for bet in bets], db):
+        raise ValueError("aposta duplicada")
+    return create_bets_bulk(bets, user_id, db)
+
+
+def measure(label, submit, n_submissions, n_games):
+    engine, Session = make_sessionmaker()
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(1))
+    with Session() as db:
+        user_ids, game_ids = seed(db, n_users=n_submissions, n_games=n_games, bets_per_user=0)
+    bets = [BetCreate(game_id=g, home_score_bet=1, away_score_bet=0) for g in game_ids]
+
+    statements.clear()
+    start = time.perf_counter()
+    for user_id in user_ids:
+        with Session() as db:
+            created = submit(user_id, bets, db)
+            assert len(created) == n_games
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<12} {elapsed:8.3f}s  {n_submissions / elapsed:10,.0f} envios/s  "
+          f"{len(statements) / n_submissions:5.1f} comandos SQL por envio")
+    return elapsed
+
+
+if __name__ == "__main__":
+    n_submissions = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    n_games = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    print(f"{n_submissions} envios de {n_games} apostas")
+    legacy = measure("antigo", legacy_submit, n_submissions, n_games)
+    bulk = measure("em lote", bulk_submit, n_submissions, n_games)
+    print(f"  ganho: {legacy / bulk:.1f}x")
@@ -0,0 +1,59 @@
+# scripts/bench_scoring.py
+# Compara o loop antigo de calculate_and_award_points com o motor set-based.
+# Uso: python scripts/bench_scoring.py [n_usuarios]
+import sys
+import time
+from datetime import datetime, timezone
+
+from _bench import make_sessionmaker, seed, Bet, Game, GameStatus, User
+from sqlalchemy import select, update
+
+from app.crud.scoring import score_games
+
+
+def legacy_calculate_and_award_points(game, db):
+    """Cópia da implementação anterior (uma aposta por vez, db.get por acerto)."""
+    bets_for_game = db.execute(select(Bet).where(Bet.game_id == game.id)).scalars().all()
+    for bet in bets_for_game:
+        is_correct = False
+        points_awarded = 0
+        if (game.home_score is not None and game.away_score is not None and
+            bet.home_score_bet == game.home_score and bet.away_score_bet == game.away_score):
+            is_correct = True
+            points_awarded = 1
+        bet.is_correct = is_correct
+        bet.points_awarded = points_awarded
+        bet.updated_at = datetime.now(timezone.utc)
+        db.add(bet)
+        if points_awarded > 0:
+            user = db.get(User, bet.user_id)
+            if user:
+                user.points += points_awarded
+                user.updated_at = datetime.now(timezone.utc)
+                db.add(user)
+    db.commit()
+
+
+def run(n_users: int):
+    _, Session = make_sessionmaker()
+    with Session() as db:
+        _, game_ids = seed(db, n_users=n_users, n_games=2)
+        db.execute(update(Game).values(home_score=1, away_score=0, status=GameStatus.FINISHED))
+        db.commit()
+        legacy_game, engine_game = (db.get(Game, gid) for gid in game_ids)
+
+        start = time.perf_counter()
+        legacy_calculate_and_award_points(legacy_game, db)
+        legacy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        scored = score_games([engine_game.id], db)
+        engine = time.perf_counter() - start
+
+    print(f"{n_users} apostas por jogo")
+    print(f"  loop antigo : {legacy:8.3f}s  {n_users / legacy:12,.0f} apostas/s")
+    print(f"  set-based   : {engine:8.3f}s  {scored / engine:12,.0f} apostas/s  ({legacy / engine:.1f}x)")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
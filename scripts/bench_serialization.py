@@ -0,0 +1,63 @@
+# scripts/bench_serialization.py
+# Compara a serialização de uma listagem de jogos pelo caminho do response_model
+# (objetos do ORM validados em GameRead com from_attributes, como o FastAPI faz) com o
+# caminho rápido (somente as colunas de GameRead como tuplas, direto para bytes JSON).
+# Uso: python scripts/bench_serialization.py [linhas ...]   (padrão: 1000 10000)
+import asyncio
+import json
+import sys
+import time
+from typing import List
+
+from _bench import make_sessionmaker, seed
+from sqlalchemy import select
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.core import serialization
+from app.core.serialization import encode_rows
+from app.crud.game import GAME_READ_COLUMNS
+from app.models.game import Game
+from app.schemas.game import GameRead
+
+RESPONSE_FIELD = create_response_field(name="Response_bench", type_=List[GameRead], mode="serialization")
+
+
+def response_model_path(db):
+    """Fluxo anterior da rota: objetos do ORM -> response_model -> JSONResponse."""
+    games = db.execute(select(Game).order_by(Game.id)).scalars().all()
+    content = asyncio.run(serialize_response(field=RESPONSE_FIELD, response_content=games))
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def fast_path(db):
+    rows = db.execute(select(*GAME_READ_COLUMNS).order_by(Game.id)).all()
+    return encode_rows(GameRead, rows)
+
+
+def measure(label, build, Session, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        with Session() as db:
+            start = time.perf_counter()
+            body = build(db)
+            best = min(best, time.perf_counter() - start)
+    print(f"  {label:<16} {best * 1000:9.1f} ms")
+    return best, body
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000]
+    encoder = "orjson" if serialization.orjson is not None else "json (biblioteca padrão)"
+    print(f"Codificador do caminho rápido: {encoder}")
+    for size in sizes:
+        engine, Session = make_sessionmaker()
+        with Session() as db:
+            seed(db, n_users=1, n_games=size, bets_per_user=0)
+        repeat = 5 if size <= 10000 else 2
+        print(f"{size} jogos (melhor de {repeat})")
+        legacy, legacy_body = measure("response_model", response_model_path, Session, repeat)
+        fast, fast_body = measure("caminho rápido", fast_path, Session, repeat)
+        assert json.loads(legacy_body) == json.loads(fast_body), "As respostas diferem"
+        print(f"  ganho: {legacy / fast:.1f}x  ({len(fast_body) / 1024:,.0f} KiB)")
+        engine.dispose()
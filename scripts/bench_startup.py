@@ -0,0 +1,114 @@
+# scripts/bench_startup.py
+# Inicialização de um worker: perfil do tempo de importação de app.main por pacote
+# (python -X importtime) e tempo até a primeira resposta de um processo uvicorn recém-
+# iniciado (GET / e a primeira rota com banco), como um worker do gunicorn ao subir.
+# Uso: python scripts/bench_startup.py [execucoes]
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import defaultdict
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+fd, DB_PATH = tempfile.mkstemp(prefix="bdl_startup_", suffix=".db")
+os.close(fd)
+ENV = {
+    **os.environ,
+    "DATABASE_URL": f"sqlite:///{DB_PATH}",
+    "SECRET_KEY": os.environ.get("SECRET_KEY", "bench-secret"),
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "10",
+    "PYTHONPATH": ROOT,
+}
+# Carregados só no primeiro uso (rotas de admin/login): não devem aparecer na inicialização
+LAZY_PACKAGES = ("openpyxl", "pyarrow", "passlib", "numpy")
+
+
+def import_profile(top: int = 15):
+    """Tempo próprio de importação somado por pacote (app.* por módulo)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=ROOT, env=ENV, capture_output=True, text=True, check=True,
+    )
+    by_package = defaultdict(int)
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+        name = name.strip()
+        package = name if name.startswith("app.") else name.split(".")[0]
+        by_package[package] += int(self_us)
+        if name == "app.main":
+            total = int(cumulative_us)
+    print(f"Importação de app.main: {total / 1000:.0f}ms (tempo próprio por pacote, maiores {top}):")
+    for package, micros in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {package:<40} {micros / 1000:7.1f}ms")
+    loaded = [package for package in LAZY_PACKAGES if package in by_package]
+    print(f"  Carregados na inicialização (deveriam ser sob demanda): {', '.join(loaded) or 'nenhum'}")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url: str, headers: dict, deadline: float) -> None:
+    request = urllib.request.Request(url, headers=headers)
+    while True:
+        try:
+            with urllib.request.urlopen(request, timeout=1) as response:
+                json.load(response)
+                return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"Sem resposta de {url}")
+            time.sleep(0.005)
+
+
+def time_to_first_request(token: str):
+    """(segundos até GET / responder, segundos até a primeira rota com banco responder)."""
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=ENV, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for(f"http://127.0.0.1:{port}/", {}, start + 30)
+        ready = time.perf_counter() - start
+        wait_for(f"http://127.0.0.1:{port}/api/v1/games/all", {"Authorization": f"Bearer {token}"}, start + 30)
+        first_db = time.perf_counter() - start
+    finally:
+        process.terminate()
+        process.wait()
+    return ready, first_db
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    # Schema e usuário ADMIN, como na etapa de release do deploy
+    subprocess.run([sys.executable, "-m", "app.release"], cwd=ROOT, env=ENV, capture_output=True, check=True)
+    token = subprocess.run(
+        [sys.executable, "-c", "from app.core.security import create_access_token as t; print(t({'sub': 'ADMIN'}))"],
+        cwd=ROOT, env=ENV, capture_output=True, text=True, check=True,
+    ).stdout.strip()
+
+    import_profile()
+    time_to_first_request(token) # Aquecimento (bytecode compilado, cache do sistema de arquivos)
+    samples = [time_to_first_request(token) for _ in range(runs)]
+    ready = [sample[0] * 1000 for sample in samples]
+    first_db = [sample[1] * 1000 for sample in samples]
+    print(f"Tempo até a primeira resposta ({runs} execuções, mediana / mínimo):")
+    print(f"  GET /                    {statistics.median(ready):7.0f}ms / {min(ready):.0f}ms")
+    print(f"  GET /api/v1/games/all    {statistics.median(first_db):7.0f}ms / {min(first_db):.0f}ms")
+    os.remove(DB_PATH)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# scripts/check_query_plans.py
+# Regressão de planos de consulta: executa as consultas mais frequentes das rotas (pelas
+# próprias funções de CRUD) em um banco SQLite temporário com dados de exemplo, roda
+# EXPLAIN em cada comando SQL emitido e falha se algum fizer varredura completa de tabela
+# ou ordenação fora de índice (filesort / temp b-tree).
+# Uso: python scripts/check_query_plans.py [url_do_banco]
+# Com uma URL (ex: cópia de homologação em MySQL, já populada), as consultas rodam nela
+# sem inserir dados. Apenas leituras são executadas.
+import asyncio
+import os
+import re
+import sys
+from contextlib import contextmanager
+from datetime import timedelta
+
+DATABASE_URL = sys.argv[1] if len(sys.argv) > 1 else None
+if DATABASE_URL:
+    os.environ["DATABASE_URL"] = DATABASE_URL
+
+from _bench import Game, GameStatus, User, make_sessionmaker, seed  # noqa: E402
+
+from sqlalchemy import create_engine, event, insert, select, update  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.core.database import get_async_database_url  # noqa: E402
+from app.crud.bet import get_user_bet_game_ids, get_user_bets_by_round, get_user_bets_page_async  # noqa: E402
+from app.crud.data_version import get_data_version, round_scope  # noqa: E402
+from app.crud.game import get_games_by_round, get_games_page_async  # noqa: E402
+from app.crud.leaderboard import get_leaderboard, get_leaderboard_rows, rebuild_leaderboard  # noqa: E402
+from app.crud.scoring import score_round  # noqa: E402
+from app.crud.standing import get_round_standings  # noqa: E402
+from app.crud.user import get_user_by_username, get_users_page_async, get_users_ranking, get_users_ranking_page_async  # noqa: E402
+
+ROUNDS = 38
+GAMES_PER_ROUND = 10
+USERS = 300
+PAGE = 50
+SEEK_SUFFIX = ", página 2" # Consultas com cursor: devem buscar no índice
+
+# SQLite: "SCAN tabela" sem índice = leitura na ordem da chave primária; "USE TEMP B-TREE" =
+# ordenação/agrupamento fora de índice. Sem ordenação extra e com LIMIT, a leitura para
+# no limite (ex: primeira página por id); sem LIMIT, é varredura completa.
+# Páginas seguintes de um cursor (seek=True) devem buscar a posição no índice (SEARCH):
+# qualquer SCAN, mesmo "USING INDEX", lê o índice desde o início até chegar à página.
+SQLITE_FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+def sqlite_problems(connection, statement, parameters, seek: bool) -> list:
+    details = [row[-1] for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+    problems = [detail for detail in details if "USE TEMP B-TREE" in detail]
+    if seek:
+        problems += [f"{detail}: cursor sem busca no índice" for detail in details if detail.startswith("SCAN ")]
+    elif " LIMIT " not in statement.upper():
+        problems += [detail for detail in details if SQLITE_FULL_SCAN.match(detail)]
+    return problems, details
+
+
+def mysql_problems(connection, statement, parameters, seek: bool) -> list:
+    plan = connection.exec_driver_sql("EXPLAIN " + statement, parameters).mappings().all()
+    problems = []
+    for row in plan:
+        extra = row["Extra"] or ""
+        if row["type"] == "ALL":
+            problems.append(f"{row['table']}: varredura completa (type=ALL)")
+        if seek and row["type"] == "index":
+            problems.append(f"{row['table']}: cursor sem busca no índice (type=index)")
+        if "Using filesort" in extra or "Using temporary" in extra:
+            problems.append(f"{row['table']}: {extra}")
+    return problems, [f"{row['table']} type={row['type']} key={row['key']} {row['Extra'] or ''}" for row in plan]
+
+
+def hot_queries(db: Session, user_id: int, username: str) -> list:
+    """(descrição, função síncrona) das leituras das rotas mais acessadas."""
+    return [
+        ("jogos da rodada", lambda: get_games_by_round(1, db)),
+        ("versão dos dados", lambda: get_data_version(round_scope(1), db)),
+        ("apostas do usuário na rodada", lambda: get_user_bets_by_round(user_id, 1, db)),
+        ("apostas existentes no envio", lambda: get_user_bet_game_ids(user_id, [1, 2, 3], db)),
+        ("usuário por nome (login)", lambda: get_user_by_username(username, db)),
+        ("ranking por posição", lambda: get_users_ranking(db, limit=PAGE)),
+        ("ranking: linhas alteradas (outro worker)", lambda: get_leaderboard_rows(db, since=get_leaderboard(db).version)),
+        ("classificação da rodada", lambda: get_round_standings(1, 1, PAGE, db)),
+    ]
+
+
+async def hot_pages(db: AsyncSession, user_id: int) -> list:
+    """(descrição, corrotina) das listagens por cursor: primeira e segunda páginas."""
+    queries = []
+    for label, page in (
+        ("jogos por cursor (usuários)", lambda cursor: get_games_page_async(db, PAGE, cursor, include_canceled=False)),
+        ("jogos por cursor (admin)", lambda cursor: get_games_page_async(db, PAGE, cursor)),
+        ("apostas do usuário por cursor", lambda cursor: get_user_bets_page_async(user_id, PAGE, cursor, db)),
+        ("ranking por cursor", lambda cursor: get_users_ranking_page_async(db, PAGE, cursor)),
+        ("usuários por cursor (admin)", lambda cursor: get_users_page_async(db, PAGE, cursor)),
+    ):
+        _, cursor = await page(None)
+        queries.append((label, lambda page=page: page(None)))
+        queries.append((label + SEEK_SUFFIX, lambda page=page, cursor=cursor: page(cursor)))
+    return queries
+
+
+def populate(db: Session) -> None:
+    """Temporada com ROUNDS rodadas, apostas de todos os usuários e a rodada 1 pontuada."""
+    user_ids, game_ids = seed(db, n_users=USERS, n_games=GAMES_PER_ROUND, round_number=1)
+    now = db.execute(select(Game.game_datetime).limit(1)).scalar()
+    db.execute(insert(Game), [
+        {"round_number": round_number, "home_team": f"Casa {g}", "away_team": f"Fora {g}",
+         "game_datetime": now + timedelta(days=7 * round_number, minutes=g), "status": GameStatus.SCHEDULED,
+         "created_at": now, "updated_at": now}
+        for round_number in range(2, ROUNDS + 1) for g in range(GAMES_PER_ROUND)
+    ])
+    db.execute(update(Game).where(Game.id.in_(game_ids)).values(status=GameStatus.FINISHED, home_score=1, away_score=0))
+    db.commit()
+    score_round(1, db)
+    rebuild_leaderboard(db)
+
+
+class Recorder:
+    """Guarda, por consulta, os comandos SELECT emitidos dentro de capture(label)."""
+    def __init__(self):
+        self.current = None
+        self.results = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.current is not None and statement.lstrip().upper().startswith("SELECT"):
+            self.current.append((statement, parameters))
+
+    @contextmanager
+    def capture(self, label: str):
+        self.current = []
+        try:
+            yield
+        finally:
+            self.results.append((label, self.current))
+            self.current = None
+
+
+def main():
+    if DATABASE_URL:
+        engine = create_engine(DATABASE_URL)
+    else:
+        engine, Session_ = make_sessionmaker()
+        with Session_() as db:
+            populate(db)
+    database_url = engine.url.render_as_string(hide_password=False)
+    async_engine = create_async_engine(get_async_database_url(database_url))
+
+    recorder = Recorder()
+    event.listen(engine, "before_cursor_execute", recorder)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", recorder)
+    explain = sqlite_problems if engine.dialect.name == "sqlite" else mysql_problems
+
+    with Session(engine) as db:
+        user = db.execute(select(User.id, User.username).order_by(User.id).limit(1)).one()
+        get_leaderboard(db) # Carregado por worker só quando a versão do ranking muda, fora do caminho das requisições
+        for label, run in hot_queries(db, user.id, user.username):
+            with recorder.capture(label):
+                run()
+
+    async def run_pages():
+        async with AsyncSession(async_engine) as db:
+            for label, page in await hot_pages(db, user.id):
+                with recorder.capture(label):
+                    await page()
+        await async_engine.dispose()
+    asyncio.run(run_pages())
+
+    failures = 0
+    with engine.connect() as connection:
+        for label, statements in recorder.results:
+            for statement, parameters in statements:
+                problems, plan = explain(connection, statement, parameters, seek=label.endswith(SEEK_SUFFIX))
+                status = "FALHOU" if problems else "ok"
+                failures += bool(problems)
+                print(f"  [{status}] {label}: {' | '.join(plan)}")
+                for problem in problems:
+                    print(f"           -> {problem}")
+    print(f"{sum(len(statements) for _, statements in recorder.results)} comandos verificados, {failures} com problema.")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# scripts/check_replica_routing.py
+# Verifica o roteamento de leituras para réplicas com dois bancos SQLite locais: um faz
+# o papel do principal e o outro da réplica (com dados diferentes, para saber de onde
+# veio cada resposta). Leituras de jogos devem vir da réplica e as apostas do próprio
+# usuário, do principal; após um resultado lançado pelo admin, as leituras do mesmo
+# cliente voltam ao principal enquanto o cookie de read-your-writes valer.
+# Uso: python scripts/check_replica_routing.py
+import os
+import tempfile
+
+PATHS = []
+for name in ("primary", "replica"):
+    fd, path = tempfile.mkstemp(prefix=f"bdl_{name}_", suffix=".db")
+    os.close(fd)
+    PATHS.append(path)
+os.environ["DATABASE_URL"] = f"sqlite:///{PATHS[0]}"
+# Réplica somente leitura, como no MySQL (read_only): qualquer escrita nela falha
+os.environ["DATABASE_REPLICA_URLS"] = f"sqlite:///file:{PATHS[1]}?mode=ro&uri=true"
+
+from datetime import datetime, timezone  # noqa: E402
+
+from _bench import Base, DataVersion, Game, User, UserRole, seed  # noqa: E402
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import create_engine, update  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.core.database import READ_PRIMARY_COOKIE, ReplicaSessionLocals  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.crud.leaderboard import rebuild_leaderboard  # noqa: E402
+
+
+def prepare(path: str, home_prefix: str, version: int) -> list:
+    """
+    Cria o banco com jogos da rodada 1 (user1 é admin) e o ranking materializado, como
+    após as migrações; `version` simula o quanto a réplica está atrasada.
+    """
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        _, game_ids = seed(db, n_users=2, n_games=3, bets_per_user=0)
+        db.execute(update(Game).values(home_team=home_prefix + " " + Game.away_team))
+        db.execute(update(User).where(User.username == "user1").values(role=UserRole.ADMIN))
+        db.add(DataVersion(scope="games:round:1", version=version, updated_at=datetime.now(timezone.utc)))
+        rebuild_leaderboard(db)
+    engine.dispose()
+    return game_ids
+
+
+def source(response) -> str:
+    return response.json()[0]["home_team"].split()[0]
+
+
+def check(label: str, ok: bool) -> None:
+    print(f"  [{'ok' if ok else 'FALHOU'}] {label}")
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    game_ids = prepare(PATHS[0], "Principal", version=2)
+    prepare(PATHS[1], "Replica", version=1)
+    assert len(ReplicaSessionLocals) == 1
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "user0", "role": "USER"})}
+    admin = {"Authorization": "Bearer " + create_access_token({"sub": "user1", "role": "ADMIN"})}
+
+    with TestClient(app) as client:
+        print("Principal e réplica em SQLite temporários")
+        response = client.get("/api/v1/games/games/1", headers=headers)
+        check("jogos da rodada lidos da réplica", response.status_code == 200 and source(response) == "Replica")
+        response = client.get("/api/v1/users/ranking/top")
+        check("ranking lido da réplica somente leitura, sem escrever nela", response.status_code == 200)
+
+        bets = [{"game_id": game_id, "home_score_bet": 1, "away_score_bet": 0} for game_id in game_ids]
+        response = client.post("/api/v1/bets/", json={"bets": bets}, headers=headers)
+        check("envio de apostas gravado no principal", response.status_code == 201)
+        response = client.get("/api/v1/bets/", headers=headers)
+        check("apostas recém-feitas aparecem sem cookie (principal)", len(response.json()) == len(bets))
+        response = client.get("/api/v1/bets/my-bets-by-round/1", headers=headers)
+        check("apostas da rodada lidas do principal", len(response.json()) == len(bets))
+        response = client.get("/api/v1/users/ranking/me", headers=headers)
+        check("posição no ranking lida do principal", response.status_code == 200)
+
+        result = {"home_score": 1, "away_score": 0, "status": "finished"}
+        response = client.put(f"/api/v1/games/admin/games/{game_ids[0]}/result", json=result, headers=admin)
+        check("resultado do admin gravado no principal", response.status_code == 200)
+        cookie = response.cookies.get(READ_PRIMARY_COOKIE)
+        check("resultado define o cookie de read-your-writes", cookie is not None)
+
+        # O cookie é Secure: o cliente de teste (http) não o reenvia sozinho
+        sticky = {**admin, "Cookie": f"{READ_PRIMARY_COOKIE}={cookie}"}
+        response = client.get("/api/v1/games/games/1", headers=sticky)
+        check("com o cookie, jogos lidos do principal", source(response) == "Principal")
+        response = client.get("/api/v1/games/games/1", headers=admin)
+        check("sem o cookie, leitura volta para a réplica", source(response) == "Replica")
+        expired = {**headers, "Cookie": f"{READ_PRIMARY_COOKIE}=0"}
+        response = client.get("/api/v1/games/games/1", headers=expired)
+        check("cookie expirado não força o principal", source(response) == "Replica")
+
+    for path in PATHS:
+        os.remove(path)
@@ -0,0 +1,95 @@
+# scripts/load_test.py
+# Teste de carga local: latência (p50/p99) de GET /games/all sob requisições concorrentes,
+# comparando a rota assíncrona (AsyncSession) com o padrão antigo
+# (`async def` + Session síncrona, que bloqueia o event loop durante a consulta).
+# A latência de rede do MySQL é simulada em cada comando SQL, na thread que o executa.
+# Uso: python scripts/load_test.py [requisicoes] [concorrencia] [latencia_ms]
+# Obs: com concorrência acima do pool (5 + 10 overflow) a rota antiga trava: o event loop
+# fica bloqueado esperando uma conexão que só ele mesmo poderia devolver ao pool.
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import List
+
+fd, DB_PATH = tempfile.mkstemp(prefix="bdl_load_", suffix=".db")
+os.close(fd)
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from _bench import Base, seed  # noqa: E402
+
+import httpx  # noqa: E402
+from fastapi import Depends  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.core.database import engine, async_engine, SessionLocal, get_session  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.crud.game import get_all_games_for_user  # noqa: E402
+from app.schemas.game import GameRead  # noqa: E402
+
+LATENCY = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.01
+engine.echo = False
+
+
+def _simulate_network(sqlite_connection):
+    # Executado pelo SQLite na mesma thread que roda o comando
+    sqlite_connection.set_trace_callback(lambda statement: time.sleep(LATENCY))
+
+
+@event.listens_for(engine, "connect")
+def _sync_connect(dbapi_connection, connection_record):
+    _simulate_network(dbapi_connection)
+
+
+@event.listens_for(async_engine.sync_engine, "connect")
+def _async_connect(dbapi_connection, connection_record):
+    _simulate_network(dbapi_connection._connection._conn)
+
+
+@app.get("/legacy/games/all", response_model=List[GameRead])
+async def legacy_read_all_games(db: Session = Depends(get_session)):
+    """Padrão anterior: rota async executando SQL síncrono no event loop."""
+    return get_all_games_for_user(db)
+
+
+async def run(path: str, total: int, concurrency: int, headers: dict) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.text
+        await asyncio.gather(*(one() for _ in range(total)))
+    return sorted(latencies)
+
+
+def report(label: str, latencies: list, elapsed: float):
+    p = lambda q: latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000  # noqa: E731
+    print(f"  {label:<28} p50 {p(0.50):7.1f}ms  p99 {p(0.99):7.1f}ms  {len(latencies) / elapsed:7.1f} req/s")
+
+
+async def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        seed(db, n_users=50, n_games=38, bets_per_user=1)
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "user0", "role": "USER"})}
+
+    print(f"{total} requisições, concorrência {concurrency}, latência simulada {LATENCY * 1000:.0f}ms por comando")
+    for label, path in (("async def + Session (antigo)", "/legacy/games/all"), ("AsyncSession", "/api/v1/games/all")):
+        start = time.perf_counter()
+        latencies = await run(path, total, concurrency, headers)
+        report(label, latencies, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
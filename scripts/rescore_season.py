@@ -0,0 +1,28 @@
+# scripts/rescore_season.py
+# Recalcula a temporada inteira com as regras de pontuação configuradas (SCORING_*).
+# Uso: python scripts/rescore_season.py ["exact_score=3,correct_winner=1"]
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.database import SessionLocal  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.crud.scoring import rescore_season, parse_ruleset, get_active_ruleset  # noqa: E402
+
+
+def main():
+    if len(sys.argv) > 1:
+        ruleset = parse_ruleset(sys.argv[1], settings.SCORING_CUMULATIVE, settings.SCORING_ROUND_MULTIPLIERS)
+    else:
+        ruleset = get_active_ruleset()
+    db = SessionLocal()
+    try:
+        result = rescore_season(db, ruleset=ruleset)
+    finally:
+        db.close()
+    print(f"{result['bets_scored']} apostas recalculadas em {result['rounds']} rodada(s).")
+
+
+if __name__ == "__main__":
+    main()